@@ -1,5 +1,29 @@
+from fastapi import Request
+from typing import Optional
 from app.services.airtable_services import AirtableService
-from app.core.settings import settings
+from app.services.airtable_async_services import AsyncAirtableService
+from app.services.change_feed import ChangeFeed
+from app.services.write_behind import WriteBehind
+from app.utils.rate_limiter import RateLimiter
+from app.utils.response_cache import ResponseCache
 
-def get_airtable_service():
-    return AirtableService(api_key=settings.AIRTABLE_API_KEY)
+# Services are created once per application in the lifespan handler (app.main)
+
+def get_airtable_service(request: Request) -> AirtableService:
+    return request.app.state.airtable_service
+
+def get_async_airtable_service(request: Request) -> AsyncAirtableService:
+    return request.app.state.async_airtable_service
+
+def get_response_cache(request: Request) -> ResponseCache:
+    return request.app.state.response_cache
+
+def get_change_feed(request: Request) -> ChangeFeed:
+    return request.app.state.change_feed
+
+def get_rate_limiter(request: Request) -> RateLimiter:
+    return request.app.state.rate_limiter
+
+def get_write_behind(request: Request) -> Optional[WriteBehind]:
+    """The write-behind queue, or None when mutations are sent synchronously."""
+    return request.app.state.write_behind
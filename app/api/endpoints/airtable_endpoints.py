@@ -1,119 +1,453 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 import logging
-from typing import Optional
+from typing import Awaitable, Callable, Hashable, List, Literal, Optional
+from app.core.errors import http_error
+from app.core.instrumentation import TimedJSONResponse, TimedRoute
+from app.core.logging import SAMPLED, RecordSummary
 from app.core.settings import settings
-from app.api.dependencies.airtable_dependencies import get_airtable_service
-from app.services.airtable_services import AirtableService
-from app.schemas.airtable_schemas import AirtableTableResponse, AirtableRecord, AirtableRecordCreate
+from app.api.dependencies.airtable_dependencies import (
+    get_airtable_service,
+    get_async_airtable_service,
+    get_change_feed,
+    get_response_cache,
+    get_write_behind,
+)
+from app.services.airtable_async_services import AsyncAirtableService
+from app.services.airtable_services import AirtableService, build_spt_formula, spt_filters
+from app.services.change_feed import ChangeFeed
+from app.services.join import JoinTable, fetch_and_join, shape_rows
+from app.services.query import Predicate
+from app.services.spt_aggregates import SPT_TABLE
+from app.services.write_behind import WriteBehind
+from app.schemas.airtable_schemas import (
+    AirtableBatchDelete,
+    AirtableBatchRequest,
+    AirtableBatchResponse,
+    AirtableJoinRequest,
+    AirtableJoinResponse,
+    AirtableQuery,
+    AirtableRecord,
+    AirtableRecordCreate,
+    AirtableTablePage,
+    AirtableWriteStatus,
+)
+from app.utils.cursor import InvalidCursorError
+from app.utils.export import export_response, format_available
+from app.utils.response_cache import MIN_COMPRESS_BYTES, ResponseCache
+from app.utils.serialization import shape_page
+from app.utils.streaming import ndjson_response, sse_response
 
-# Setup logging to file
-logging.basicConfig(filename='airtable_debug.log', level=logging.DEBUG, 
-                    format='%(asctime)s - %(pathname)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("app")
 
-router = APIRouter()
+router = APIRouter(route_class=TimedRoute, default_response_class=TimedJSONResponse)
 
-@router.get("/geo/spt/filtered-sorted", response_model=AirtableTableResponse)
-def get_filtered_sorted_records_geo_spt(
+# Airtable's maximum page size, used when only a cursor is given
+DEFAULT_PAGE_SIZE = 100
+
+def change_stream(
+    change_feed: ChangeFeed, base_id: str, table_name: str, filters: Optional[dict] = None
+) -> StreamingResponse:
+    """
+    Subscribe to a table's change feed and stream it as server-sent events:
+    a ``snapshot`` of the matching records, then ``changes`` deltas.
+    """
+    subscription = change_feed.subscribe(base_id, table_name, filters)
+
+    async def events():
+        try:
+            async for event in subscription.events(settings.CHANGE_FEED_HEARTBEAT_SECONDS):
+                yield event
+        finally:
+            change_feed.unsubscribe(subscription)
+
+    return sse_response(events())
+
+def cache_control(version: Optional[Hashable]) -> str:
+    """Clients may reuse versioned data for the cache TTL; anything else must be revalidated."""
+    if version is None:
+        return "no-cache"
+    return f"max-age={int(settings.AIRTABLE_CACHE_TTL_SECONDS)}"
+
+async def records_response(
+    request: Request,
+    response_cache: ResponseCache,
+    version: Optional[Hashable],
+    key: Hashable,
+    read: Callable[[], Awaitable[List[dict]]],
+) -> Response:
+    """
+    Serve a full record list with an ETag, reusing the serialized body while
+    the table's data version is unchanged.
+    """
+    cached = response_cache.get(key, version)
+    if cached is None:
+        data = await read()
+        cached = response_cache.set(key, version, TimedJSONResponse(shape_page(data)).body)
+    if len(cached.body) >= MIN_COMPRESS_BYTES:
+        # The first compression of a large body is CPU-bound; keep it off the event loop
+        return await run_in_threadpool(cached.respond, request.headers, cache_control(version))
+    return cached.respond(request.headers, cache_control(version))
+
+@router.get("/geo/spt/filtered-sorted", response_model=AirtableTablePage)
+async def get_filtered_sorted_records_geo_spt(
+    request: Request,
     point_id: Optional[str] = Query(None),
     zone: Optional[str] = Query(None),
     sort_by: Optional[str] = Query("Material"),
-    airtable_service: AirtableService = Depends(get_airtable_service),
+    live: bool = Query(False, description="Read from Airtable instead of the local replica"),
+    stream: bool = Query(False, description="Stream records as NDJSON, one page at a time"),
+    page_size: Optional[int] = Query(None, ge=1, le=100, description="Return a single page of this many records"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    fields: Optional[List[str]] = Query(None, description="Only return these fields"),
+    airtable_service: AsyncAirtableService = Depends(get_async_airtable_service),
+    response_cache: ResponseCache = Depends(get_response_cache),
 ):
     base_id = "app4p8WX4X6BRjei8"
     table_name = "Field_SPT"
-    logging.debug(f"Entering get_filtered_sorted_records endpoint for base_id: {base_id}, table_name: {table_name}")
+    logger.debug("Entering get_filtered_sorted_records endpoint for base_id: %s, table_name: %s", base_id, table_name, extra=SAMPLED)
+    query = {
+        "formula": build_spt_formula(point_id, zone),
+        "sort": [sort_by] if sort_by else [],
+        "fields": fields,
+        "live": live,
+        "filters": spt_filters(point_id, zone),
+    }
+    try:
+        if stream:
+            return await ndjson_response(airtable_service.iterate_pages(base_id, table_name, **query))
+        if page_size or cursor:
+            data, next_cursor = await airtable_service.get_page(
+                base_id, table_name, page_size or DEFAULT_PAGE_SIZE, cursor, **query
+            )
+            return TimedJSONResponse(shape_page(data, next_cursor))
+        return await records_response(
+            request,
+            response_cache,
+            airtable_service.data_version(base_id, table_name, live),
+            ("spt", point_id, zone, sort_by, tuple(fields or ())),
+            lambda: airtable_service.get_filtered_sorted_records(
+                base_id, table_name, point_id, zone, sort_by, live=live, fields=fields
+            ),
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error in get_filtered_sorted_records endpoint: %s", e)
+        raise http_error(e)
+
+@router.get("/geo/spt/changes")
+async def stream_spt_changes(
+    point_id: Optional[str] = Query(None),
+    zone: Optional[str] = Query(None),
+    change_feed: ChangeFeed = Depends(get_change_feed),
+):
+    logger.debug("Entering stream_spt_changes endpoint for point_id: %s, zone: %s", point_id, zone, extra=SAMPLED)
+    return change_stream(change_feed, "app4p8WX4X6BRjei8", "Field_SPT", spt_filters(point_id, zone))
+
+# Declared before the /{base_id}/{table_name} routes so "writes" is not read as a base id
+@router.get("/writes/{tracking_id}", response_model=AirtableWriteStatus)
+async def get_write_status(
+    tracking_id: str,
+    write_behind: Optional[WriteBehind] = Depends(get_write_behind),
+):
+    if write_behind is None:
+        raise HTTPException(status_code=404, detail="Write-behind mode is not enabled")
+    status = await write_behind.status(tracking_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown tracking id")
+    return TimedJSONResponse(status)
+
+@router.get("/geo/spt/summary")
+async def get_spt_summary(
+    point_id: Optional[str] = Query(None),
+    zone: Optional[str] = Query(None),
+    group_by: Optional[Literal["POINT_ID", "Zone"]] = Query(None, description="Summarize each value of this field"),
+    live: bool = Query(False, description="Read from Airtable instead of the local replica"),
+    airtable_service: AsyncAirtableService = Depends(get_async_airtable_service),
+):
+    logger.debug("Entering get_spt_summary endpoint for point_id: %s, zone: %s, group_by: %s", point_id, zone, group_by, extra=SAMPLED)
     try:
-        data = airtable_service.get_filtered_sorted_records(base_id, table_name, point_id, zone, sort_by)
-        return {"records": data}
+        return await airtable_service.get_spt_summary(*SPT_TABLE, point_id, zone, group_by, live=live)
     except Exception as e:
-        logging.error(f"Error in get_filtered_sorted_records endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error("Error in get_spt_summary endpoint: %s", e)
+        raise http_error(e)
 
-@router.get("/{base_id}/{table_name}", response_model=AirtableTableResponse)
-def get_table(
+@router.post("/{base_id}/join", response_model=AirtableJoinResponse)
+async def join_tables(
+    base_id: str,
+    join: AirtableJoinRequest,
+    airtable_service: AsyncAirtableService = Depends(get_async_airtable_service),
+):
+    logger.debug("Entering join_tables endpoint for base_id: %s with %d tables", base_id, len(join.tables), extra=SAMPLED)
+    tables = [
+        JoinTable(
+            base_id=table.base_id or base_id,
+            table_name=table.table_name,
+            alias=table.alias or table.table_name,
+            on=table.on,
+            key=table.key,
+            predicates=[Predicate(item.field, item.op, item.value) for item in table.filters],
+            fields=table.fields,
+        )
+        for table in join.tables
+    ]
+    try:
+        rows = await fetch_and_join(airtable_service, tables, join.how, join.live, join.limit)
+        return TimedJSONResponse(shape_rows(rows))
+    except Exception as e:
+        logger.error("Error in join_tables endpoint: %s", e)
+        raise http_error(e)
+
+@router.get("/{base_id}/{table_name}", response_model=AirtableTablePage)
+async def get_table(
+    request: Request,
     base_id: str,
     table_name: str,
-    airtable_service: AirtableService = Depends(get_airtable_service),
+    live: bool = Query(False, description="Read from Airtable instead of the local replica"),
+    stream: bool = Query(False, description="Stream records as NDJSON, one page at a time"),
+    page_size: Optional[int] = Query(None, ge=1, le=100, description="Return a single page of this many records"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
+    fields: Optional[List[str]] = Query(None, description="Only return these fields"),
+    airtable_service: AsyncAirtableService = Depends(get_async_airtable_service),
+    response_cache: ResponseCache = Depends(get_response_cache),
+):
+    logger.debug("Entering get_table endpoint for base_id: %s, table_name: %s", base_id, table_name, extra=SAMPLED)
+    try:
+        if stream:
+            return await ndjson_response(
+                airtable_service.iterate_pages(base_id, table_name, fields=fields, live=live)
+            )
+        if page_size or cursor:
+            data, next_cursor = await airtable_service.get_page(
+                base_id, table_name, page_size or DEFAULT_PAGE_SIZE, cursor, fields=fields, live=live
+            )
+            return TimedJSONResponse(shape_page(data, next_cursor))
+        return await records_response(
+            request,
+            response_cache,
+            airtable_service.data_version(base_id, table_name, live),
+            ("table", base_id, table_name, tuple(fields or ())),
+            lambda: airtable_service.get_table(base_id, table_name, live=live, fields=fields),
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error("Error in get_table endpoint: %s", e)
+        raise http_error(e)
+
+def batch_response(results: List[dict]) -> dict:
+    succeeded = sum(1 for result in results if result["success"])
+    return {"results": results, "succeeded": succeeded, "failed": len(results) - succeeded}
+
+# Batch routes are declared before the /{record_id} routes so "batch" is not read as a record id
+@router.post("/{base_id}/{table_name}/batch", response_model=AirtableBatchResponse)
+async def batch_create_records(
+    base_id: str,
+    table_name: str,
+    batch: AirtableBatchRequest,
+    airtable_service: AsyncAirtableService = Depends(get_async_airtable_service),
+):
+    logger.debug("Entering batch_create_records endpoint for base_id: %s, table_name: %s with %d records", base_id, table_name, len(batch.records), extra=SAMPLED)
+    try:
+        results = await airtable_service.batch_create(
+            base_id, table_name, [record.fields for record in batch.records]
+        )
+        return batch_response(results)
+    except Exception as e:
+        logger.error("Error in batch_create_records endpoint: %s", e)
+        raise http_error(e)
+
+@router.patch("/{base_id}/{table_name}/batch", response_model=AirtableBatchResponse)
+async def batch_update_records(
+    base_id: str,
+    table_name: str,
+    batch: AirtableBatchRequest,
+    airtable_service: AsyncAirtableService = Depends(get_async_airtable_service),
+):
+    logger.debug("Entering batch_update_records endpoint for base_id: %s, table_name: %s with %d records", base_id, table_name, len(batch.records), extra=SAMPLED)
+    try:
+        records = [
+            {"id": record.id, "fields": {k: v for k, v in record.fields.items() if v is not None}}
+            for record in batch.records
+        ]
+        results = await airtable_service.batch_update(base_id, table_name, records)
+        return batch_response(results)
+    except Exception as e:
+        logger.error("Error in batch_update_records endpoint: %s", e)
+        raise http_error(e)
+
+@router.delete("/{base_id}/{table_name}/batch", response_model=AirtableBatchResponse)
+async def batch_delete_records(
+    base_id: str,
+    table_name: str,
+    batch: AirtableBatchDelete,
+    airtable_service: AsyncAirtableService = Depends(get_async_airtable_service),
+):
+    logger.debug("Entering batch_delete_records endpoint for base_id: %s, table_name: %s with %d records", base_id, table_name, len(batch.ids), extra=SAMPLED)
+    try:
+        results = await airtable_service.batch_delete(base_id, table_name, batch.ids)
+        return batch_response(results)
+    except Exception as e:
+        logger.error("Error in batch_delete_records endpoint: %s", e)
+        raise http_error(e)
+
+@router.post("/{base_id}/{table_name}/query", response_model=AirtableTablePage)
+async def query_records(
+    base_id: str,
+    table_name: str,
+    query: AirtableQuery,
+    airtable_service: AsyncAirtableService = Depends(get_async_airtable_service),
+):
+    logger.debug("Entering query_records endpoint for base_id: %s, table_name: %s with %d filters", base_id, table_name, len(query.filters), extra=SAMPLED)
+    try:
+        data = await airtable_service.query_records(
+            base_id,
+            table_name,
+            [Predicate(item.field, item.op, item.value) for item in query.filters],
+            sort=[("-" if item.direction == "desc" else "") + item.field for item in query.sort],
+            fields=query.fields,
+            limit=query.limit,
+            live=query.live,
+        )
+        return TimedJSONResponse(shape_page(data))
+    except Exception as e:
+        logger.error("Error in query_records endpoint: %s", e)
+        raise http_error(e)
+
+# Declared before the /{record_id} routes so "export" is not read as a record id
+@router.get("/{base_id}/{table_name}/export", response_class=StreamingResponse)
+async def export_table(
+    base_id: str,
+    table_name: str,
+    export_format: Literal["csv", "arrow", "parquet"] = Query("csv", alias="format", description="CSV, Arrow IPC stream or Parquet"),
+    fields: Optional[List[str]] = Query(None, description="Only export these fields, in this column order"),
+    live: bool = Query(False, description="Read from Airtable instead of the local replica"),
+    airtable_service: AsyncAirtableService = Depends(get_async_airtable_service),
 ):
-    logging.debug(f"Entering get_table endpoint for base_id: {base_id}, table_name: {table_name}")
+    logger.debug("Entering export_table endpoint for base_id: %s, table_name: %s as %s", base_id, table_name, export_format, extra=SAMPLED)
+    if not format_available(export_format):
+        raise HTTPException(status_code=501, detail=f"{export_format} export needs pyarrow installed")
     try:
-        data = airtable_service.get_table(base_id, table_name)
-        return {"records": data}
+        return await export_response(
+            airtable_service.iterate_pages(base_id, table_name, fields=fields, live=live), export_format, table_name, fields
+        )
     except Exception as e:
-        logging.error(f"Error in get_table endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error("Error in export_table endpoint: %s", e)
+        raise http_error(e)
+
+# Declared before the /{record_id} routes so "changes" is not read as a record id
+@router.get("/{base_id}/{table_name}/changes")
+async def stream_table_changes(
+    base_id: str,
+    table_name: str,
+    change_feed: ChangeFeed = Depends(get_change_feed),
+):
+    logger.debug("Entering stream_table_changes endpoint for base_id: %s, table_name: %s", base_id, table_name, extra=SAMPLED)
+    return change_stream(change_feed, base_id, table_name)
 
 @router.get("/{base_id}/{table_name}/{record_id}", response_model=AirtableRecord)
-def read_record(
+async def read_record(
     base_id: str,
     table_name: str,
     record_id: str,
-    airtable_service: AirtableService = Depends(get_airtable_service),
+    airtable_service: AsyncAirtableService = Depends(get_async_airtable_service),
 ):
-    logging.debug(f"Entering read_record endpoint for base_id: {base_id}, table_name: {table_name}, record_id: {record_id}")
+    logger.debug("Entering read_record endpoint for base_id: %s, table_name: %s, record_id: %s", base_id, table_name, record_id, extra=SAMPLED)
     try:
-        data = airtable_service.read_record(base_id, table_name, record_id)
+        data = await airtable_service.read_record(base_id, table_name, record_id)
         return data
     except Exception as e:
-        logging.error(f"Error in read_record endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error("Error in read_record endpoint: %s", e)
+        raise http_error(e)
 
-@router.post("/{base_id}/{table_name}/create", response_model=AirtableRecord)
-def create_record(
+@router.post(
+    "/{base_id}/{table_name}/create",
+    response_model=AirtableRecord,
+    responses={202: {"model": AirtableWriteStatus, "description": "Queued (write-behind mode)"}},
+)
+async def create_record(
     base_id: str,
     table_name: str,
     record: AirtableRecordCreate,
-    airtable_service: AirtableService = Depends(get_airtable_service),
+    airtable_service: AsyncAirtableService = Depends(get_async_airtable_service),
+    write_behind: Optional[WriteBehind] = Depends(get_write_behind),
 ):
-    logging.debug(f"Entering create_record endpoint for base_id: {base_id}, table_name: {table_name} with data: {record}")
+    logger.debug("Entering create_record endpoint for base_id: %s, table_name: %s with %s", base_id, table_name, RecordSummary(record), extra=SAMPLED)
     try:
-        data = airtable_service.create_record(base_id, table_name, record.model_dump())
+        if write_behind is not None:
+            status = await write_behind.submit(base_id, table_name, "create", record.model_dump())
+            return TimedJSONResponse(status, status_code=202)
+        data = await airtable_service.create_record(base_id, table_name, record.model_dump())
         return data
     except Exception as e:
-        logging.error(f"Error in create_record endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error("Error in create_record endpoint: %s", e)
+        raise http_error(e)
 
-@router.patch("/{base_id}/{table_name}/{record_id}", response_model=AirtableRecord)
-def update_record(
+@router.patch(
+    "/{base_id}/{table_name}/{record_id}",
+    response_model=AirtableRecord,
+    responses={202: {"model": AirtableWriteStatus, "description": "Queued (write-behind mode)"}},
+)
+async def update_record(
     base_id: str,
     table_name: str,
     record_id: str,
     record: AirtableRecord,
-    airtable_service: AirtableService = Depends(get_airtable_service),
+    airtable_service: AsyncAirtableService = Depends(get_async_airtable_service),
+    write_behind: Optional[WriteBehind] = Depends(get_write_behind),
 ):
-    logging.debug(f"Entering update_record endpoint for base_id: {base_id}, table_name: {table_name}, record_id: {record_id} with data: {record}")
+    logger.debug("Entering update_record endpoint for base_id: %s, table_name: %s, record_id: %s with %s", base_id, table_name, record_id, RecordSummary(record), extra=SAMPLED)
     try:
         update_data = {k: v for k, v in record.fields.items() if v is not None}
-        data = airtable_service.update_record(base_id, table_name, record_id, update_data)
+        if write_behind is not None:
+            status = await write_behind.submit(base_id, table_name, "update", update_data, record_id)
+            return TimedJSONResponse(status, status_code=202)
+        data = await airtable_service.update_record(base_id, table_name, record_id, update_data)
         return data
     except Exception as e:
-        logging.error(f"Error in update_record endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error("Error in update_record endpoint: %s", e)
+        raise http_error(e)
 
 @router.delete("/{base_id}/{table_name}/{record_id}")
-def delete_record(
+async def delete_record(
     base_id: str,
     table_name: str,
     record_id: str,
-    airtable_service: AirtableService = Depends(get_airtable_service),
+    airtable_service: AsyncAirtableService = Depends(get_async_airtable_service),
 ):
-    logging.debug(f"Entering delete_record endpoint for base_id: {base_id}, table_name: {table_name}, record_id: {record_id}")
+    logger.debug("Entering delete_record endpoint for base_id: %s, table_name: %s, record_id: %s", base_id, table_name, record_id, extra=SAMPLED)
     try:
-        airtable_service.delete_record(base_id, table_name, record_id)
+        await airtable_service.delete_record(base_id, table_name, record_id)
         return {"message": "Record deleted successfully"}
     except Exception as e:
-        logging.error(f"Error in delete_record endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error("Error in delete_record endpoint: %s", e)
+        raise http_error(e)
 
 @router.get("/check-connection")
-async def check_airtable_connection():
-    logging.debug(f"Entering check_airtable_connection endpoint")
+async def check_airtable_connection(
+    airtable_service: AsyncAirtableService = Depends(get_async_airtable_service),
+):
+    logger.debug("Entering check_airtable_connection endpoint", extra=SAMPLED)
 
     try:
-        airtable_service = AirtableService(api_key=settings.AIRTABLE_API_KEY)
-        airtable_service.get_table(settings.AIRTABLE_BASE_ID, settings.AIRTABLE_TABLE_NAME)
+        await airtable_service.check_connection(settings.AIRTABLE_BASE_ID, settings.AIRTABLE_TABLE_NAME)
         return {"success": True, "message": "Connection successful"}
     except Exception as e:
-        logging.error(f"Connection failed: {str(e)}")
+        logger.error("Connection failed: %s", e)
         return {"success": False, "message": "Connection failed", "error": str(e)}
 
+@router.get("/pool-stats")
+async def get_pool_stats(
+    airtable_service: AirtableService = Depends(get_airtable_service),
+    async_airtable_service: AsyncAirtableService = Depends(get_async_airtable_service),
+):
+    return {
+        "sync": airtable_service.pool_stats(),
+        "async": async_airtable_service.pool_stats(),
+    }
+
+@router.get("/rate-limit-stats")
+async def get_rate_limit_stats(request: Request):
+    return request.app.state.rate_limiter.stats()
@@ -0,0 +1,112 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Response
+from fastapi.concurrency import run_in_threadpool
+
+from app.api.dependencies.airtable_dependencies import (
+    get_airtable_service,
+    get_async_airtable_service,
+    get_change_feed,
+    get_rate_limiter,
+    get_response_cache,
+    get_write_behind,
+)
+from app.services.airtable_async_services import AsyncAirtableService
+from app.services.airtable_services import AirtableService
+from app.services.change_feed import ChangeFeed
+from app.services.write_behind import WriteBehind
+from app.utils.metrics import CONTENT_TYPE, format_metric, registry
+from app.utils.rate_limiter import RateLimiter
+from app.utils.response_cache import ResponseCache
+
+router = APIRouter()
+
+
+def service_metrics(airtable_service: AirtableService, async_airtable_service: AsyncAirtableService) -> List[str]:
+    """Cache and single-flight counters read from the live services at scrape time."""
+    caches = {id(service.cache): service.cache for service in (airtable_service, async_airtable_service)}
+    hits = sum(cache.hits for cache in caches.values())
+    misses = sum(cache.misses for cache in caches.values())
+    lines = format_metric("airtable_cache_hits_total", "counter", "Table cache hits.", [("", {}, hits)])
+    lines += format_metric("airtable_cache_misses_total", "counter", "Table cache misses.", [("", {}, misses)])
+    lines += format_metric(
+        "airtable_cache_hit_ratio", "gauge", "Share of table cache lookups served from the cache.",
+        [("", {}, hits / (hits + misses) if hits + misses else 0.0)],
+    )
+    flights = [("sync", airtable_service.flights), ("async", async_airtable_service.flights)]
+    lines += format_metric(
+        "airtable_single_flight_shared_total", "counter", "Reads that joined an identical in-flight fetch.",
+        [("", {"service": name}, flight.shared) for name, flight in flights],
+    )
+    return lines
+
+
+def response_cache_metrics(response_cache: ResponseCache) -> List[str]:
+    lines = format_metric(
+        "response_cache_hits_total", "counter", "List responses served from a cached body.",
+        [("", {}, response_cache.hits)],
+    )
+    lines += format_metric(
+        "response_cache_misses_total", "counter", "List responses that had to be serialized.",
+        [("", {}, response_cache.misses)],
+    )
+    return lines
+
+
+def rate_limiter_metrics(rate_limiter: RateLimiter) -> List[str]:
+    """Per-base queue, wait, timeout and retry figures of the shared rate limiter."""
+    bases = rate_limiter.stats()["bases"]
+    lines = format_metric(
+        "airtable_rate_limit_queue_depth", "gauge", "Calls waiting for a rate limit token.",
+        [("", {"base": base_id}, base["queue_depth"]) for base_id, base in bases.items()],
+    )
+    lines += format_metric(
+        "airtable_rate_limit_acquired_total", "counter", "Calls that got a rate limit token.",
+        [("", {"base": base_id}, base["acquired"]) for base_id, base in bases.items()],
+    )
+    lines += format_metric(
+        "airtable_rate_limit_timeouts_total", "counter", "Calls that gave up waiting for a rate limit token.",
+        [("", {"base": base_id}, base["timeouts"]) for base_id, base in bases.items()],
+    )
+    lines += format_metric(
+        "airtable_rate_limit_wait_seconds_total", "counter", "Time calls spent waiting for a rate limit token.",
+        [("", {"base": base_id}, base["wait_seconds_total"]) for base_id, base in bases.items()],
+    )
+    lines += format_metric(
+        "airtable_rate_limit_wait_seconds_max", "gauge", "Longest wait for a rate limit token.",
+        [("", {"base": base_id}, base["wait_seconds_max"]) for base_id, base in bases.items()],
+    )
+    lines += format_metric(
+        "airtable_rate_limit_retries_total", "counter", "Upstream calls retried, by the status that caused it.",
+        [
+            ("", {"base": base_id, "status": status}, count)
+            for base_id, base in bases.items()
+            for status, count in base["retries"].items()
+        ],
+    )
+    return lines
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(
+    airtable_service: AirtableService = Depends(get_airtable_service),
+    async_airtable_service: AsyncAirtableService = Depends(get_async_airtable_service),
+    response_cache: ResponseCache = Depends(get_response_cache),
+    change_feed: ChangeFeed = Depends(get_change_feed),
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+    write_behind: Optional[WriteBehind] = Depends(get_write_behind),
+):
+    lines = registry.render() + service_metrics(airtable_service, async_airtable_service)
+    lines += response_cache_metrics(response_cache)
+    lines += rate_limiter_metrics(rate_limiter)
+    lines += format_metric(
+        "change_feed_subscribers", "gauge", "Open change feed subscriptions per table.",
+        [("", {"table": table}, count) for table, count in change_feed.stats().items()],
+    )
+    if write_behind is not None:
+        counts = await run_in_threadpool(write_behind.outbox.counts)
+        lines += format_metric(
+            "write_behind_mutations", "gauge", "Outbox mutations by status.",
+            [("", {"status": status}, counts.get(status, 0)) for status in ("pending", "done", "failed")],
+        )
+    return Response("\n".join(lines) + "\n", media_type=CONTENT_TYPE)
@@ -0,0 +1,26 @@
+import httpx
+import requests
+from fastapi import HTTPException
+from app.utils.rate_limiter import RateLimitTimeout
+
+
+def upstream_status(e: Exception):
+    """Return the Airtable HTTP status behind an exception, if there is one."""
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code
+    if isinstance(e, requests.HTTPError) and e.response is not None:
+        return e.response.status_code
+    return None
+
+
+def http_error(e: Exception) -> HTTPException:
+    """
+    Map a service-layer exception to the HTTPException returned to clients.
+
+    Throttling (our own scheduler deadline or Airtable 429s that outlasted the
+    retries) becomes 503 with Retry-After so clients back off; anything else
+    stays a 500.
+    """
+    if isinstance(e, RateLimitTimeout) or upstream_status(e) == 429:
+        return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    return HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,174 @@
+import functools
+import inspect
+import time
+from typing import Any, Callable, Dict
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+from app.core.settings import settings
+from app.utils.serialization import dumps
+from app.utils.metrics import (
+    REQUEST_DURATION,
+    REQUEST_PHASE_DURATION,
+    RESPONSE_BYTES,
+    add_timing,
+    request_timings,
+)
+
+# Request header that opts a single request into a Server-Timing breakdown
+PROFILE_HEADER = b"x-profile"
+
+def timing_phases(timings: Dict[str, float]) -> Dict[str, float]:
+    """
+    Derive per-phase durations (seconds) from the raw request timings.
+
+    ``handler`` covers the endpoint, response model validation and encoding,
+    so validation is whatever remains once the other two are taken out.
+    ``endpoint`` includes the ``airtable`` round-trips it waited on.
+    """
+    phases = {name: timings[name] for name in ("endpoint", "airtable", "encode") if name in timings}
+    if "handler" in timings:
+        phases["validate"] = max(0.0, timings["handler"] - timings.get("endpoint", 0.0) - timings.get("encode", 0.0))
+    return phases
+
+
+def server_timing(timings: Dict[str, float], total: float) -> str:
+    """Format the request timings as a ``Server-Timing`` header value (milliseconds)."""
+    entries = []
+    for name, seconds in timing_phases(timings).items():
+        entry = f"{name};dur={seconds * 1000:.2f}"
+        if name == "airtable":
+            entry += f';desc="{int(timings.get("airtable_calls", 0))} calls"'
+        entries.append(entry)
+    entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+def route_template(scope: Dict[str, Any]) -> str:
+    """
+    Path template of the route that handled the request, e.g.
+    ``/api/{base_id}/{table_name}``, so metrics are labelled per route rather
+    than per URL.
+    """
+    # Routers included with a prefix record the full path on FastAPI's
+    # effective route context; plain routes only set scope["route"]
+    effective = scope.get("fastapi", {}).get("effective_route_context")
+    path = getattr(effective, "path", None) or getattr(scope.get("route"), "path", None)
+    return path or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that records per-route latency and response size, and
+    returns a ``Server-Timing`` breakdown when the request sends
+    ``X-Profile: 1``.
+
+    Written against raw ASGI rather than BaseHTTPMiddleware so it adds no
+    extra task or body buffering to the request path.
+    """
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = request_timings.set(timings)
+        profile = settings.PROFILING_ENABLED and any(
+            name == PROFILE_HEADER and value not in (b"", b"0", b"false") for name, value in scope["headers"]
+        )
+        started = time.perf_counter()
+        status = 500
+        body_bytes = 0
+
+        async def send_with_metrics(message: Dict[str, Any]) -> None:
+            nonlocal status, body_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile:
+                    header = server_timing(timings, time.perf_counter() - started)
+                    message = {
+                        **message,
+                        "headers": [*message.get("headers", []), (b"server-timing", header.encode())],
+                    }
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            request_timings.reset(token)
+            route = route_template(scope)
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started, method=scope["method"], route=route, status=status
+            )
+            RESPONSE_BYTES.inc(body_bytes, route=route)
+            for phase, seconds in timing_phases(timings).items():
+                REQUEST_PHASE_DURATION.observe(seconds, route=route, phase=phase)
+
+
+class TimedJSONResponse(JSONResponse):
+    """
+    JSONResponse that encodes with orjson (byte-identical to JSONResponse's
+    json.dumps output) and records how long encoding the body took.
+    """
+
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter()
+        body = dumps(content)
+        add_timing("encode", time.perf_counter() - started)
+        return body
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    if getattr(endpoint, "__timed__", False):
+        return endpoint
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                add_timing("endpoint", time.perf_counter() - started)
+        async_wrapper.__timed__ = True
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            add_timing("endpoint", time.perf_counter() - started)
+    wrapper.__timed__ = True
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """
+    APIRoute that times the endpoint function and the whole route handler,
+    so the middleware can split a request into endpoint, validation and
+    encoding time.
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs: Any):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            started = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                add_timing("handler", time.perf_counter() - started)
+
+        return timed_handler
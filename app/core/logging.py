@@ -1,50 +1,108 @@
+import itertools
 import logging
-import logging.config
+import logging.handlers
+import queue
 from pathlib import Path
+from typing import Any, Optional
 
-# Ensure log directory exists
-LOG_DIR = Path("./logs")
-LOG_DIR.mkdir(exist_ok=True)
-
-LOG_FILE = LOG_DIR / "application.log"
-
-# Configure the logging settings
-logging_config = {
-    "version": 1,
-    "disable_existing_loggers": False,
-    "formatters": {
-        "standard": {
-            "format": "%(asctime)s - %(pathname)s - %(name)s - %(levelname)s - %(message)s",
-            "datefmt": "%Y-%m-%d %H:%M:%S",
-        }
-    },
-    "handlers": {
-        "file": {
-            "level": "DEBUG",
-            "class": "logging.handlers.RotatingFileHandler",
-            "formatter": "standard",
-            "filename": LOG_FILE,
-            "mode": "a",
-            "maxBytes": 10 * 1024 * 1024,  # 10 MB
-            "backupCount": 5,  # Keep 5 backups
-        },
-        "console": {
-            "level": "INFO",
-            "class": "logging.StreamHandler",
-            "formatter": "standard",
-        },
-    },
-    "loggers": {
-        "": {  # Root logger
-            "handlers": ["file", "console"],
-            "level": "DEBUG",
-            "propagate": True,
-        }
-    },
-}
-
-# Apply the configuration
-logging.config.dictConfig(logging_config)
+from app.core.settings import settings
+
+LOG_FORMAT = "%(asctime)s - %(pathname)s - %(name)s - %(levelname)s - %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Pass as ``extra=SAMPLED`` on high-volume DEBUG events; only a fraction of
+# them (LOG_DEBUG_SAMPLE_RATE) are kept.
+SAMPLED = {"sampled": True}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
 
 # Create a logger instance for use
 logger = logging.getLogger("app")
+
+
+class SamplingFilter(logging.Filter):
+    """Keep every ``1 / rate``-th DEBUG record marked as sampled; pass everything else."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or not getattr(record, "sampled", False):
+            return True
+        if not self.every:
+            return False
+        return next(self._counter) % self.every == 0
+
+
+class RecordSummary:
+    """
+    Log argument that summarizes a record payload as counts.
+
+    Only cheap facts are reported: the payload is never serialized, since
+    ``QueueHandler`` formats the message on the emitting thread.
+    """
+
+    __slots__ = ("payload",)
+
+    def __init__(self, payload: Any):
+        self.payload = payload
+
+    def __str__(self) -> str:
+        payload = self.payload
+        if hasattr(payload, "model_dump"):
+            payload = payload.model_dump()
+        if isinstance(payload, list):
+            return f"{len(payload)} records"
+        if isinstance(payload, dict) and isinstance(payload.get("fields"), dict):
+            return f"record {payload.get('id')} with {len(payload['fields'])} fields"
+        return type(payload).__name__
+
+
+def setup_logging(level: Optional[str] = None) -> None:
+    """
+    Route all logging through a queue so file and console I/O happen on a
+    background listener thread instead of the request path.
+
+    Safe to call more than once; later calls only update the level.
+    """
+    global _listener, _queue_handler
+    root = logging.getLogger()
+    root.setLevel((level or settings.LOG_LEVEL).upper())
+    if _listener is not None:
+        return
+
+    formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+    log_file = Path(settings.LOG_FILE)
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, mode="a", maxBytes=10 * 1024 * 1024, backupCount=5  # 10 MB, keep 5 backups
+    )
+    file_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    _queue_handler.addFilter(SamplingFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+    root.addHandler(_queue_handler)
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _queue_handler = None
@@ -7,5 +7,77 @@ class Settings:
     AIRTABLE_API_KEY: str = os.getenv("AIRTABLE_API_KEY")
     AIRTABLE_BASE_ID: str = os.getenv("AIRTABLE_BASE_ID")
     AIRTABLE_TABLE_NAME: str = os.getenv("AIRTABLE_TABLE_NAME")
+    AIRTABLE_API_URL: str = os.getenv("AIRTABLE_API_URL", "https://api.airtable.com/v0")
+
+    # Logging
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FILE: str = os.getenv("LOG_FILE", "./logs/application.log")
+    # Fraction of sampled high-volume DEBUG events that are kept
+    LOG_DEBUG_SAMPLE_RATE: float = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))
+
+    # Metrics
+    # Allow clients to request a Server-Timing breakdown with "X-Profile: 1"
+    PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "true").lower() == "true"
+
+    # Shared async HTTP connection pool
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    HTTP_TIMEOUT_SECONDS: float = float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+
+    # Per-base Airtable rate limiting and retries
+    AIRTABLE_RATE_LIMIT_PER_SECOND: float = float(os.getenv("AIRTABLE_RATE_LIMIT_PER_SECOND", "5"))
+    AIRTABLE_RATE_LIMIT_BURST: float = float(os.getenv("AIRTABLE_RATE_LIMIT_BURST", "5"))
+    AIRTABLE_REQUEST_DEADLINE_SECONDS: float = float(os.getenv("AIRTABLE_REQUEST_DEADLINE_SECONDS", "15"))
+    AIRTABLE_MAX_RETRIES: int = int(os.getenv("AIRTABLE_MAX_RETRIES", "4"))
+    AIRTABLE_RETRY_BASE_SECONDS: float = float(os.getenv("AIRTABLE_RETRY_BASE_SECONDS", "0.5"))
+    AIRTABLE_RETRY_MAX_SECONDS: float = float(os.getenv("AIRTABLE_RETRY_MAX_SECONDS", "8"))
+
+    # Maximum number of 10-record batch calls in flight per bulk request
+    AIRTABLE_BATCH_CONCURRENCY: int = int(os.getenv("AIRTABLE_BATCH_CONCURRENCY", "5"))
+
+    # Read-through table cache (0 disables caching)
+    AIRTABLE_CACHE_TTL_SECONDS: float = float(os.getenv("AIRTABLE_CACHE_TTL_SECONDS", "60"))
+    AIRTABLE_CACHE_MAX_ENTRIES: int = int(os.getenv("AIRTABLE_CACHE_MAX_ENTRIES", "256"))
+    # Table reads shared by every worker on the host through a SQLite file and
+    # kept across restarts. Reads older than the cache TTL are served while
+    # they are refreshed in the background, up to the maximum age.
+    SNAPSHOTS_ENABLED: bool = os.getenv("SNAPSHOTS_ENABLED", "true").lower() == "true"
+    SNAPSHOT_DB_PATH: str = os.getenv("SNAPSHOT_DB_PATH", "./data/snapshots.sqlite3")
+    SNAPSHOT_MAX_AGE_SECONDS: float = float(os.getenv("SNAPSHOT_MAX_AGE_SECONDS", "86400"))
+    # Memory budget for serialized (and compressed) list responses
+    RESPONSE_CACHE_MAX_BYTES: int = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+    # Change feed (server-sent events)
+    CHANGE_FEED_POLL_SECONDS: float = float(os.getenv("CHANGE_FEED_POLL_SECONDS", "5"))
+    CHANGE_FEED_HEARTBEAT_SECONDS: float = float(os.getenv("CHANGE_FEED_HEARTBEAT_SECONDS", "15"))
+    CHANGE_FEED_QUEUE_SIZE: int = int(os.getenv("CHANGE_FEED_QUEUE_SIZE", "100"))
+
+    # Write-behind mode: record creates and updates are acknowledged once they
+    # are in a durable local outbox and sent to Airtable in the background
+    WRITE_BEHIND_ENABLED: bool = os.getenv("WRITE_BEHIND_ENABLED", "false").lower() == "true"
+    OUTBOX_DB_PATH: str = os.getenv("OUTBOX_DB_PATH", "./data/outbox.sqlite3")
+    WRITE_BEHIND_FLUSH_SECONDS: float = float(os.getenv("WRITE_BEHIND_FLUSH_SECONDS", "1"))
+    WRITE_BEHIND_BATCH_SIZE: int = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "100"))
+    WRITE_BEHIND_MAX_ATTEMPTS: int = int(os.getenv("WRITE_BEHIND_MAX_ATTEMPTS", "5"))
+    # How long completed or failed mutations can still be polled
+    OUTBOX_RETENTION_SECONDS: float = float(os.getenv("OUTBOX_RETENTION_SECONDS", "86400"))
+
+    # Local SQLite replica, kept in sync in the background. Tables are given
+    # as a comma separated list of "base_id/table_name"; empty disables sync.
+    REPLICA_DB_PATH: str = os.getenv("REPLICA_DB_PATH", "./data/replica.sqlite3")
+    REPLICA_TABLES: str = os.getenv("REPLICA_TABLES", "app4p8WX4X6BRjei8/Field_SPT")
+    REPLICA_SYNC_INTERVAL_SECONDS: float = float(os.getenv("REPLICA_SYNC_INTERVAL_SECONDS", "30"))
+    REPLICA_FULL_SYNC_EVERY: int = int(os.getenv("REPLICA_FULL_SYNC_EVERY", "20"))
+    # How often each worker applies replica writes made by other workers
+    REPLICA_REFRESH_SECONDS: float = float(os.getenv("REPLICA_REFRESH_SECONDS", "1"))
+    # In-memory indexes over replicated tables (comma separated field names)
+    REPLICA_INDEX_FIELDS: str = os.getenv("REPLICA_INDEX_FIELDS", "POINT_ID,Zone")
+    REPLICA_SORT_FIELDS: str = os.getenv("REPLICA_SORT_FIELDS", "Material")
+
+    # Field_SPT summary statistics, kept up to date from the replica
+    SPT_N_FIELD: str = os.getenv("SPT_N_FIELD", "N_Value")
+    SPT_DEPTH_FIELD: str = os.getenv("SPT_DEPTH_FIELD", "Depth")
+    # Width of the depth bands N values are grouped into
+    SPT_DEPTH_BIN: float = float(os.getenv("SPT_DEPTH_BIN", "1.0"))
 
 settings = Settings()
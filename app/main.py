@@ -1,25 +1,123 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from app.api.endpoints import airtable_endpoints
+from app.api.endpoints import airtable_endpoints, metrics_endpoints
+from app.core.instrumentation import MetricsMiddleware
+from app.core.logging import setup_logging, shutdown_logging
 from app.core.settings import settings
+from app.services.airtable_async_services import AsyncAirtableService
+from app.services.airtable_services import AirtableService
+from app.services.change_feed import ChangeFeed
+from app.services.replica_store import ReplicaStore
+from app.services.spt_aggregates import SPT_TABLE, create_spt_aggregates
+from app.services.sync_engine import ReplicaSyncEngine, parse_replica_tables
+from app.services.write_behind import Outbox, WriteBehind
+from app.utils.file_lock import FileLock
+from app.utils.http_client import create_async_client, create_rate_limiter
+from app.utils.response_cache import ResponseCache
+from app.utils.snapshot_store import SnapshotStore
 from dotenv import load_dotenv
 import logging
 
 load_dotenv()
 
-# Configure the logging settings
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(pathname)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("app.log"),
-        logging.StreamHandler()
-    ]
-)
+# Queue-based logging; file and console I/O happen off the request path
+setup_logging()
 
-app = FastAPI()
+def split_fields(value: str):
+    return [field.strip() for field in (value or "").split(",") if field.strip()]
+
+def worker_lock(db_path: str):
+    """Lock picking the one worker that runs a database's background job; None for in-memory databases."""
+    return FileLock(db_path + ".lock") if db_path != ":memory:" else None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging()
+    replica_tables = parse_replica_tables(settings.REPLICA_TABLES)
+    replica_store = None
+    if replica_tables:
+        replica_store = ReplicaStore(
+            settings.REPLICA_DB_PATH,
+            index_fields=split_fields(settings.REPLICA_INDEX_FIELDS),
+            sort_fields=split_fields(settings.REPLICA_SORT_FIELDS),
+        )
+        if SPT_TABLE in replica_tables:
+            replica_store.add_aggregates(*SPT_TABLE, create_spt_aggregates())
+    app.state.replica_store = replica_store
+
+    # One service of each kind per application, sharing their connection pools
+    # and one per-base rate limit budget
+    app.state.rate_limiter = create_rate_limiter()
+    app.state.airtable_service = AirtableService(
+        api_key=settings.AIRTABLE_API_KEY, replica=replica_store, limiter=app.state.rate_limiter
+    )
+    snapshots = None
+    if settings.SNAPSHOTS_ENABLED:
+        snapshots = SnapshotStore(settings.SNAPSHOT_DB_PATH)
+        snapshots.prune(settings.SNAPSHOT_MAX_AGE_SECONDS)
+    app.state.async_airtable_service = AsyncAirtableService(
+        create_async_client(settings.AIRTABLE_API_KEY, limiter=app.state.rate_limiter),
+        replica=replica_store,
+        snapshots=snapshots,
+        snapshot_max_age_seconds=settings.SNAPSHOT_MAX_AGE_SECONDS,
+    )
+
+    app.state.change_feed = ChangeFeed(
+        app.state.async_airtable_service,
+        interval_seconds=settings.CHANGE_FEED_POLL_SECONDS,
+        queue_size=settings.CHANGE_FEED_QUEUE_SIZE,
+    )
+    app.state.response_cache = ResponseCache(
+        ttl_seconds=settings.AIRTABLE_CACHE_TTL_SECONDS, max_bytes=settings.RESPONSE_CACHE_MAX_BYTES
+    )
+
+    app.state.write_behind = None
+    if settings.WRITE_BEHIND_ENABLED:
+        app.state.write_behind = WriteBehind(
+            app.state.async_airtable_service,
+            Outbox(settings.OUTBOX_DB_PATH),
+            interval_seconds=settings.WRITE_BEHIND_FLUSH_SECONDS,
+            batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+            max_attempts=settings.WRITE_BEHIND_MAX_ATTEMPTS,
+            retention_seconds=settings.OUTBOX_RETENTION_SECONDS,
+            lock=worker_lock(settings.OUTBOX_DB_PATH),
+        )
+        app.state.write_behind.start()
+
+    sync_engine = None
+    if replica_store is not None:
+        sync_engine = ReplicaSyncEngine(
+            app.state.airtable_service.api,
+            replica_store,
+            replica_tables,
+            interval_seconds=settings.REPLICA_SYNC_INTERVAL_SECONDS,
+            full_sync_every=settings.REPLICA_FULL_SYNC_EVERY,
+            lock=worker_lock(settings.REPLICA_DB_PATH),
+            refresh_seconds=settings.REPLICA_REFRESH_SECONDS,
+        )
+        sync_engine.start()
+    yield
+    if sync_engine is not None:
+        sync_engine.stop()
+    await app.state.change_feed.close()
+    if app.state.write_behind is not None:
+        # Unsent mutations stay in the outbox and are sent after the next start
+        await app.state.write_behind.stop()
+        app.state.write_behind.outbox.close()
+    await app.state.async_airtable_service.close()
+    app.state.airtable_service.close()
+    if snapshots is not None:
+        snapshots.close()
+    if replica_store is not None:
+        replica_store.close()
+    shutdown_logging()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 # Include routes
 app.include_router(airtable_endpoints.router, prefix="/api", tags=["Airtable"])
+app.include_router(metrics_endpoints.router, tags=["Metrics"])
 
 # ...existing code...
 
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, Any, List, Literal, Optional, Union
 
 class AirtableRecordCreate(BaseModel):
     name: str
@@ -12,3 +12,82 @@ class AirtableRecord(BaseModel):
 
 class AirtableTableResponse(BaseModel):
     records: List[AirtableRecord]
+
+class AirtableTablePage(AirtableTableResponse):
+    next_cursor: Optional[str] = None
+
+class AirtableBatchRequest(BaseModel):
+    records: List[AirtableRecord]
+
+class AirtableBatchDelete(BaseModel):
+    ids: List[str]
+
+class AirtableBatchResult(BaseModel):
+    index: int
+    id: Optional[str] = None
+    success: bool
+    record: Optional[AirtableRecord] = None
+    error: Optional[str] = None
+
+class AirtableBatchResponse(BaseModel):
+    results: List[AirtableBatchResult]
+    succeeded: int
+    failed: int
+
+class AirtableWriteStatus(BaseModel):
+    tracking_id: str
+    status: Literal["pending", "done", "failed"]
+    record_id: Optional[str] = None
+    attempts: int = 0
+    error: Optional[str] = None
+
+Scalar = Union[bool, int, float, str]
+
+class AirtableQueryFilter(BaseModel):
+    field: str
+    op: Literal["eq", "ne", "lt", "lte", "gt", "gte", "in", "contains"] = "eq"
+    value: Union[Scalar, List[Scalar]]
+
+    @model_validator(mode="after")
+    def check_value(self):
+        if (self.op == "in") != isinstance(self.value, list):
+            raise ValueError("'in' takes a list of values; other operators take a single value")
+        return self
+
+class AirtableQuerySort(BaseModel):
+    field: str
+    direction: Literal["asc", "desc"] = "asc"
+
+class AirtableQuery(BaseModel):
+    filters: List[AirtableQueryFilter] = []
+    sort: List[AirtableQuerySort] = []
+    fields: Optional[List[str]] = None
+    limit: Optional[int] = Field(None, ge=1)
+    live: bool = False
+
+class AirtableJoinTable(BaseModel):
+    table_name: str
+    base_id: Optional[str] = None
+    alias: Optional[str] = None
+    on: Optional[str] = None
+    key: str = "id"
+    filters: List[AirtableQueryFilter] = []
+    fields: Optional[List[str]] = None
+
+class AirtableJoinRequest(BaseModel):
+    tables: List[AirtableJoinTable] = Field(min_length=2)
+    how: Literal["inner", "left"] = "inner"
+    limit: Optional[int] = Field(None, ge=1)
+    live: bool = False
+
+    @model_validator(mode="after")
+    def check_tables(self):
+        if any(table.on is None for table in self.tables[1:]):
+            raise ValueError("every table after the first needs 'on', a field of the first table")
+        aliases = [table.alias or table.table_name for table in self.tables]
+        if len(set(aliases)) != len(aliases):
+            raise ValueError("tables joined more than once need distinct aliases")
+        return self
+
+class AirtableJoinResponse(BaseModel):
+    rows: List[Dict[str, Optional[AirtableRecord]]]
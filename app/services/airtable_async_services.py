@@ -0,0 +1,659 @@
+import asyncio
+import httpx
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from app.core.logging import SAMPLED
+from app.core.settings import settings
+from urllib.parse import quote
+from app.services.airtable_services import build_spt_formula, project_fields, spt_filters, table_cache
+from app.services.query import Predicate, compile_formula, equality_filters, run_query
+from app.services.replica_store import ReplicaStore
+from app.services.spt_aggregates import create_spt_aggregates
+from app.utils.cursor import InvalidCursorError, decode_cursor, encode_cursor
+from app.utils.http_client import PoolStats
+from app.utils.metrics import observe_upstream, timed
+from app.utils.rate_limiter import Priority, request_priority, was_not_applied
+from app.utils.single_flight import AsyncSingleFlight
+from app.utils.snapshot_store import SnapshotStore
+from app.utils.table_cache import CacheKey, TableCache, make_cache_key
+
+logger = logging.getLogger("app")
+
+# Airtable accepts at most 10 records per create/update/delete call
+BATCH_SIZE = 10
+# How long one process may spend refreshing a stale snapshot before another may try
+SNAPSHOT_REFRESH_LEASE_SECONDS = 30
+
+class AsyncAirtableService:
+    """
+    asyncio-native counterpart of AirtableService.
+
+    Talks to the Airtable REST API through a shared, pooled ``httpx.AsyncClient``
+    so in-flight calls do not hold a threadpool worker. Shares the table cache
+    and local replica with the sync service.
+
+    With ``snapshots``, table reads are also stored in a SnapshotStore shared
+    with the other workers on the host. A read younger than the cache TTL is
+    served from it as if cached; an older one, up to
+    ``snapshot_max_age_seconds``, is served while it is refreshed from
+    Airtable in the background.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        cache: Optional[TableCache] = None,
+        replica: Optional[ReplicaStore] = None,
+        snapshots: Optional[SnapshotStore] = None,
+        snapshot_max_age_seconds: float = 86400,
+    ):
+        self.client = client
+        self.cache = cache if cache is not None else table_cache
+        self.replica = replica
+        self.snapshots = snapshots
+        self.snapshot_max_age_seconds = snapshot_max_age_seconds
+        self._refreshes: Set[asyncio.Task] = set()
+        self.stats = PoolStats()
+        self._batch_limit = asyncio.Semaphore(settings.AIRTABLE_BATCH_CONCURRENCY)
+        self.flights = AsyncSingleFlight()
+
+    def pool_stats(self) -> Dict:
+        return self.stats.snapshot()
+
+    async def close(self) -> None:
+        for task in list(self._refreshes):
+            task.cancel()
+        await self.client.aclose()
+
+    def _use_replica(self, base_id: str, table_name: str, live: bool) -> bool:
+        return not live and self.replica is not None and self.replica.is_synced(base_id, table_name)
+
+    def data_version(self, base_id: str, table_name: str, live: bool = False) -> Optional[Tuple]:
+        """
+        Token for the data that non-live reads of a table currently return.
+
+        It changes whenever the replica or cached reads of the table change,
+        so anything built from a read can be reused while it stays the same.
+        Returns None when reads are not versioned (live reads, or no replica
+        and caching disabled).
+        """
+        if live:
+            return None
+        if self._use_replica(base_id, table_name, live):
+            return ("replica", self.replica.generation(base_id, table_name))
+        if self.cache.enabled:
+            return ("cache", self.cache.generation(base_id, table_name))
+        return None
+
+    @staticmethod
+    def _table_url(base_id: str, table_name: str, record_id: Optional[str] = None) -> str:
+        url = f"/{base_id}/{quote(table_name, safe='')}"
+        if record_id:
+            url += f"/{record_id}"
+        return url
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> Dict:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, extensions={"trace": self.stats.trace}, **kwargs)
+        except Exception:
+            observe_upstream(method, "error", time.perf_counter() - started)
+            raise
+        observe_upstream(method, response.status_code, time.perf_counter() - started, len(response.content))
+        response.raise_for_status()
+        return response.json()
+
+    async def list_page(
+        self,
+        base_id: str,
+        table_name: str,
+        formula: Optional[str] = None,
+        sort: Optional[List[str]] = None,
+        page_size: Optional[int] = None,
+        offset: Optional[str] = None,
+        max_records: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Fetch a single page of records.
+
+        Returns:
+            Tuple[List[Dict], Optional[str]]: The page's records and the Airtable
+            offset of the next page, or None on the last page.
+        """
+        params: List[Tuple[str, Any]] = []
+        if formula:
+            params.append(("filterByFormula", formula))
+        for position, field_name in enumerate(sort or []):
+            # pyairtable's convention: a leading "-" sorts descending
+            if field_name.startswith("-"):
+                params.append((f"sort[{position}][field]", field_name[1:]))
+                params.append((f"sort[{position}][direction]", "desc"))
+            else:
+                params.append((f"sort[{position}][field]", field_name))
+        for field_name in fields or []:
+            params.append(("fields[]", field_name))
+        if page_size:
+            params.append(("pageSize", page_size))
+        if max_records:
+            params.append(("maxRecords", max_records))
+        if offset:
+            params.append(("offset", offset))
+        data = await self._request("GET", self._table_url(base_id, table_name), params=params)
+        return data.get("records", []), data.get("offset")
+
+    async def list_records(
+        self,
+        base_id: str,
+        table_name: str,
+        formula: Optional[str] = None,
+        sort: Optional[List[str]] = None,
+        fields: Optional[List[str]] = None,
+        max_records: Optional[int] = None,
+    ) -> List[Dict]:
+        """Fetch every record matching ``formula``, following Airtable's offset pagination."""
+        records: List[Dict] = []
+        offset = None
+        while True:
+            page, offset = await self.list_page(
+                base_id, table_name, formula, sort, offset=offset, max_records=max_records, fields=fields
+            )
+            records.extend(page)
+            if not offset:
+                return records
+
+    @timed("read_records")
+    async def read_records(
+        self,
+        base_id: str,
+        table_name: str,
+        formula: Optional[str] = None,
+        sort: Optional[List[str]] = None,
+        fields: Optional[List[str]] = None,
+        live: bool = False,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> List[Dict]:
+        """
+        Read every matching record from the cheapest source available.
+
+        The local replica is used when it can answer the query, then the table
+        cache, then the shared snapshots, and finally Airtable itself, whose
+        result is cached. ``live`` skips the replica, cache and snapshots.
+
+        Args:
+            base_id (str): The base ID.
+            table_name (str): The table name.
+            formula (Optional[str]): Airtable filter formula.
+            sort (Optional[List[str]]): Fields to sort by, ``-field`` for descending.
+            fields (Optional[List[str]]): Only return these fields.
+            live (bool): Read from Airtable even if the data is held locally.
+            filters (Optional[Dict[str, str]]): Field-equality form of ``formula``
+                that lets the replica answer the read.
+
+        Returns:
+            List[Dict]: Matching records.
+        """
+        local = self._local_records(base_id, table_name, formula, sort, fields, live, filters)
+        if local is not None:
+            return local
+        cache_key = make_cache_key(base_id, table_name, formula, sort, fields)
+
+        async def fetch() -> List[Dict]:
+            # A write landing during the read must not be undone by caching the read
+            write_version = self.cache.write_version(base_id, table_name)
+            snapshot_version = None
+            if self._use_snapshots():
+                snapshot_version = await asyncio.to_thread(self.snapshots.version, base_id, table_name)
+            try:
+                records = await self.list_records(base_id, table_name, formula, sort, fields)
+            except httpx.HTTPStatusError as e:
+                logger.error("Error retrieving records: %s", e)
+                logger.error("Response content: %s", e.response.content)
+                raise
+            logger.debug("Retrieved %d records from table %s", len(records), table_name)
+            self.cache.set(cache_key, records, write_version=write_version)
+            if self._use_snapshots():
+                await asyncio.to_thread(self.snapshots.put, cache_key, records, snapshot_version)
+            return records
+
+        if not live and self._use_snapshots():
+            snapshot = await self.flights.do(("snapshot", cache_key), lambda: self._read_snapshot(cache_key, fetch))
+            if snapshot is not None:
+                return snapshot
+        # Identical concurrent reads share one upstream fetch
+        return await self.flights.do(cache_key, fetch)
+
+    def _use_snapshots(self) -> bool:
+        return self.snapshots is not None and self.cache.enabled
+
+    async def _read_snapshot(
+        self, cache_key: CacheKey, fetch: Callable[[], Awaitable[List[Dict]]]
+    ) -> Optional[List[Dict]]:
+        """Serve a read from the shared snapshots, refreshing it in the background if it is stale."""
+        write_version = self.cache.write_version(cache_key[0], cache_key[1])
+        snapshot = await asyncio.to_thread(self.snapshots.get, cache_key)
+        if snapshot is None:
+            return None
+        age, records = snapshot
+        if age > self.snapshot_max_age_seconds:
+            return None
+        if age < self.cache.ttl_seconds:
+            self.cache.set(cache_key, records, ttl_seconds=self.cache.ttl_seconds - age, write_version=write_version)
+            return records
+        # Look again soon, in case another worker has refreshed the snapshot by then
+        self.cache.set(
+            cache_key,
+            records,
+            ttl_seconds=min(self.cache.ttl_seconds, SNAPSHOT_REFRESH_LEASE_SECONDS),
+            write_version=write_version,
+        )
+        task = asyncio.create_task(self._refresh_snapshot(cache_key, fetch))
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+        return records
+
+    async def _refresh_snapshot(self, cache_key: CacheKey, fetch: Callable[[], Awaitable[List[Dict]]]) -> None:
+        request_priority.set(Priority.BULK)
+        if not await asyncio.to_thread(self.snapshots.claim_refresh, cache_key, SNAPSHOT_REFRESH_LEASE_SECONDS):
+            return
+        try:
+            await self.flights.do(cache_key, fetch)
+        except Exception as e:
+            logger.warning("Background refresh of %s/%s failed: %s", cache_key[0], cache_key[1], e)
+
+    async def _invalidate_snapshots(self, base_id: str, table_name: str) -> None:
+        if self.snapshots is not None:
+            await asyncio.to_thread(self.snapshots.invalidate_table, base_id, table_name)
+
+    @timed("get_page")
+    async def get_page(
+        self,
+        base_id: str,
+        table_name: str,
+        page_size: int,
+        cursor: Optional[str] = None,
+        formula: Optional[str] = None,
+        sort: Optional[List[str]] = None,
+        fields: Optional[List[str]] = None,
+        live: bool = False,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Read one page of records and the cursor for the next one.
+
+        Data held locally is paged by position; otherwise the cursor wraps
+        Airtable's own offset so each page is a single upstream request.
+
+        Returns:
+            Tuple[List[Dict], Optional[str]]: The page and the next cursor, or
+            None on the last page.
+
+        Raises:
+            InvalidCursorError: If a position cursor is passed once the data is
+            no longer held locally (``live``, or the copy expired); the client
+            has to start again from the first page.
+        """
+        position = decode_cursor(cursor)
+        if "offset" not in position:
+            local = self._local_records(base_id, table_name, formula, sort, fields, live, filters)
+            if local is None and "index" in position:
+                # Serving it would mean a full upstream read for every page
+                raise InvalidCursorError("Cursor is no longer valid; restart from the first page")
+            if local is not None:
+                start = position.get("index", 0)
+                end = start + page_size
+                next_cursor = encode_cursor({"index": end}) if end < len(local) else None
+                return local[start:end], next_cursor
+        records, offset = await self.list_page(
+            base_id, table_name, formula, sort, page_size=page_size, offset=position.get("offset"), fields=fields
+        )
+        return records, encode_cursor({"offset": offset}) if offset else None
+
+    async def iterate_pages(
+        self,
+        base_id: str,
+        table_name: str,
+        formula: Optional[str] = None,
+        sort: Optional[List[str]] = None,
+        fields: Optional[List[str]] = None,
+        live: bool = False,
+        filters: Optional[Dict[str, str]] = None,
+        page_size: int = 100,
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Yield records one page at a time, like pyairtable's ``table.iterate()``.
+
+        Live pages are forwarded as Airtable returns them and are not added to
+        the table cache, so memory stays bounded at about one page. Records that
+        are already held locally (replica or cache) are sliced into pages.
+        """
+        local = self._local_records(base_id, table_name, formula, sort, fields, live, filters)
+        if local is not None:
+            for start in range(0, len(local), page_size):
+                yield local[start:start + page_size]
+            return
+        offset = None
+        while True:
+            page, offset = await self.list_page(
+                base_id, table_name, formula, sort, page_size=page_size, offset=offset, fields=fields
+            )
+            yield page
+            if not offset:
+                return
+
+    def _local_records(
+        self,
+        base_id: str,
+        table_name: str,
+        formula: Optional[str],
+        sort: Optional[List[str]],
+        fields: Optional[List[str]],
+        live: bool,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> Optional[List[Dict]]:
+        """Return matching records from the replica or cache, or None if neither holds them."""
+        if live:
+            return None
+        replica_can_answer = (
+            (filters is not None or not formula)
+            and len(sort or []) <= 1
+            and not any(field_name.startswith("-") for field_name in sort or [])
+        )
+        if replica_can_answer and self._use_replica(base_id, table_name, live):
+            sort_by = sort[0] if sort else None
+            records = self.replica.get_records(base_id, table_name, filters=filters, sort_by=sort_by)
+            return project_fields(records, fields)
+        cached = self.cache.get(make_cache_key(base_id, table_name, formula, sort, fields))
+        if cached is None and fields:
+            # A cached read of every field can serve any projection
+            cached = self.cache.get(make_cache_key(base_id, table_name, formula, sort))
+            return project_fields(cached, fields) if cached is not None else None
+        return cached
+
+    @timed("query_records")
+    async def query_records(
+        self,
+        base_id: str,
+        table_name: str,
+        predicates: List[Predicate],
+        sort: Optional[List[str]] = None,
+        fields: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        live: bool = False,
+    ) -> List[Dict]:
+        """
+        Run a structured query on the cheapest layer that holds the table.
+
+        A synced replica or a cached read of the whole table is filtered,
+        sorted and limited in process; text equality predicates are looked up
+        in the replica's indexes first. Otherwise the predicates are compiled
+        into an escaped formula and Airtable does the work. Unlimited upstream
+        queries are cached like any other read.
+
+        Args:
+            base_id (str): The base ID.
+            table_name (str): The table name.
+            predicates (List[Predicate]): Conditions that every record must meet.
+            sort (Optional[List[str]]): Fields to sort by, ``-field`` for descending.
+            fields (Optional[List[str]]): Only return these fields.
+            limit (Optional[int]): Return at most this many records.
+            live (bool): Read from Airtable even if the data is held locally.
+
+        Returns:
+            List[Dict]: Matching records.
+        """
+        if self._use_replica(base_id, table_name, live):
+            records = self.replica.get_records(base_id, table_name, filters=equality_filters(predicates))
+            return project_fields(run_query(records, predicates, sort, limit), fields)
+        cached = None if live else self.cache.get(make_cache_key(base_id, table_name))
+        if cached is not None:
+            return project_fields(run_query(cached, predicates, sort, limit), fields)
+        formula = compile_formula(predicates)
+        if limit:
+            return await self.list_records(base_id, table_name, formula, sort, fields, max_records=limit)
+        return await self.read_records(base_id, table_name, formula, sort, fields, live)
+
+    @timed("get_table")
+    async def get_table(
+        self, base_id: str, table_name: str, live: bool = False, fields: Optional[List[str]] = None
+    ):
+        logger.debug("Entering async get_table for table %s", table_name, extra=SAMPLED)
+        return await self.read_records(base_id, table_name, fields=fields, live=live)
+
+    @timed("read_record")
+    async def read_record(self, base_id: str, table_name: str, record_id: str):
+        return await self._request("GET", self._table_url(base_id, table_name, record_id))
+
+    @timed("create_record")
+    async def create_record(self, base_id: str, table_name: str, record: dict):
+        response = await self._request("POST", self._table_url(base_id, table_name), json={"fields": record})
+        self.cache.upsert_record(base_id, table_name, response)
+        await self._invalidate_snapshots(base_id, table_name)
+        if self._use_replica(base_id, table_name, live=False):
+            self.replica.upsert_records(base_id, table_name, [response])
+        return response
+
+    @timed("update_record")
+    async def update_record(self, base_id: str, table_name: str, record_id: str, record: dict):
+        response = await self._request(
+            "PATCH", self._table_url(base_id, table_name, record_id), json={"fields": record}
+        )
+        self.cache.upsert_record(base_id, table_name, response)
+        await self._invalidate_snapshots(base_id, table_name)
+        if self._use_replica(base_id, table_name, live=False):
+            self.replica.upsert_records(base_id, table_name, [response])
+        return response
+
+    @timed("delete_record")
+    async def delete_record(self, base_id: str, table_name: str, record_id: str):
+        response = await self._request("DELETE", self._table_url(base_id, table_name, record_id))
+        self.cache.remove_record(base_id, table_name, record_id)
+        await self._invalidate_snapshots(base_id, table_name)
+        if self._use_replica(base_id, table_name, live=False):
+            self.replica.delete_records(base_id, table_name, [record_id])
+        return response
+
+    @timed("batch_create")
+    async def batch_create(self, base_id: str, table_name: str, records: List[Dict]) -> List[Dict]:
+        """
+        Create records in 10-record batch calls.
+
+        Args:
+            records (List[Dict]): Field values of each record to create.
+
+        Returns:
+            List[Dict]: One result per input record, in input order.
+        """
+        async def send(chunk: List[Dict]) -> List[Dict]:
+            data = await self._request(
+                "POST", self._table_url(base_id, table_name), json={"records": [{"fields": f} for f in chunk]}
+            )
+            return data["records"]
+
+        results = await self._run_batches(list(enumerate(records)), send)
+        self._apply_batch_results(base_id, table_name, results)
+        if any(result["success"] for result in results):
+            await self._invalidate_snapshots(base_id, table_name)
+        return results
+
+    @timed("batch_update")
+    async def batch_update(self, base_id: str, table_name: str, records: List[Dict]) -> List[Dict]:
+        """
+        Update records in 10-record batch calls.
+
+        Args:
+            records (List[Dict]): ``{"id": ..., "fields": {...}}`` for each record.
+
+        Returns:
+            List[Dict]: One result per input record, in input order.
+        """
+        async def send(chunk: List[Dict]) -> List[Dict]:
+            data = await self._request(
+                "PATCH", self._table_url(base_id, table_name), json={"records": chunk}
+            )
+            return data["records"]
+
+        missing = [
+            {"index": index, "success": False, "error": "Missing record id"}
+            for index, record in enumerate(records)
+            if not record.get("id")
+        ]
+        valid = [(index, record) for index, record in enumerate(records) if record.get("id")]
+        results = await self._run_batches(valid, send)
+        self._apply_batch_results(base_id, table_name, results)
+        if any(result["success"] for result in results):
+            await self._invalidate_snapshots(base_id, table_name)
+        return sorted(results + missing, key=lambda result: result["index"])
+
+    @timed("batch_delete")
+    async def batch_delete(self, base_id: str, table_name: str, record_ids: List[str]) -> List[Dict]:
+        """
+        Delete records in 10-record batch calls.
+
+        Returns:
+            List[Dict]: One result per input record id, in input order.
+        """
+        async def send(chunk: List[str]) -> List[Dict]:
+            data = await self._request(
+                "DELETE",
+                self._table_url(base_id, table_name),
+                params=[("records[]", record_id) for record_id in chunk],
+            )
+            return data["records"]
+
+        results = await self._run_batches(list(enumerate(record_ids)), send)
+        for result in results:
+            if result["success"]:
+                self.cache.remove_record(base_id, table_name, result["id"])
+        if any(result["success"] for result in results):
+            await self._invalidate_snapshots(base_id, table_name)
+        if self._use_replica(base_id, table_name, live=False):
+            self.replica.delete_records(base_id, table_name, [r["id"] for r in results if r["success"]])
+        return results
+
+    async def _run_batches(
+        self,
+        items: List[Tuple[int, Any]],
+        send: Callable[[List[Any]], Awaitable[List[Dict]]],
+    ) -> List[Dict]:
+        """
+        Send ``items`` in chunks of BATCH_SIZE, with up to AIRTABLE_BATCH_CONCURRENCY
+        chunks in flight. A failed chunk fails only its own records; their
+        results say whether the call certainly had no effect (``not_applied``).
+        """
+        async def run_chunk(chunk: List[Tuple[int, Any]]) -> List[Dict]:
+            # Each chunk runs in its own task, so this only affects the chunk's requests
+            request_priority.set(Priority.BULK)
+            async with self._batch_limit:
+                try:
+                    records = await send([payload for _, payload in chunk])
+                except Exception as e:
+                    logger.error("Batch of %d records failed: %s", len(chunk), e)
+                    not_applied = was_not_applied(e)
+                    return [
+                        {"index": index, "success": False, "error": str(e), "not_applied": not_applied}
+                        for index, _ in chunk
+                    ]
+            return [
+                {
+                    "index": index,
+                    "id": record.get("id"),
+                    "success": True,
+                    "record": record if "fields" in record else None,
+                }
+                for (index, _), record in zip(chunk, records)
+            ]
+
+        chunks = [items[start:start + BATCH_SIZE] for start in range(0, len(items), BATCH_SIZE)]
+        chunk_results = await asyncio.gather(*(run_chunk(chunk) for chunk in chunks))
+        return [result for results in chunk_results for result in results]
+
+    def _apply_batch_results(self, base_id: str, table_name: str, results: List[Dict]) -> None:
+        records = [result["record"] for result in results if result["success"] and result.get("record")]
+        for record in records:
+            self.cache.upsert_record(base_id, table_name, record)
+        if records and self._use_replica(base_id, table_name, live=False):
+            self.replica.upsert_records(base_id, table_name, records)
+
+    @timed("get_filtered_sorted_records")
+    async def get_filtered_sorted_records(
+        self,
+        base_id: str,
+        table_name: str,
+        point_id: Optional[str] = None,
+        zone: Optional[str] = None,
+        sort_by: Optional[str] = "Material",
+        live: bool = False,
+        fields: Optional[List[str]] = None,
+    ) -> List[Dict]:
+        """
+        Retrieve all records from a specified table with optional filtering and sorting.
+
+        Args:
+            base_id (str): The base ID.
+            table_name (str): The table name.
+            point_id (Optional[str]): Filter records by POINT_ID (optional).
+            zone (Optional[str]): Filter records by Zone (optional).
+            sort_by (Optional[str]): Sort records by a field (default: Material).
+            live (bool): Read from Airtable even if the table is replicated locally.
+            fields (Optional[List[str]]): Only return these fields.
+
+        Returns:
+            List[Dict]: List of filtered and sorted records.
+        """
+        records = await self.read_records(
+            base_id,
+            table_name,
+            formula=build_spt_formula(point_id, zone),
+            sort=[sort_by] if sort_by else [],
+            fields=fields,
+            live=live,
+            filters=spt_filters(point_id, zone),
+        )
+        return list(records)
+
+    @timed("get_spt_summary")
+    async def get_spt_summary(
+        self,
+        base_id: str,
+        table_name: str,
+        point_id: Optional[str] = None,
+        zone: Optional[str] = None,
+        group_by: Optional[str] = None,
+        live: bool = False,
+    ) -> Dict:
+        """
+        SPT summary statistics for the records matching ``point_id`` and ``zone``.
+
+        Replicated tables answer from rollups the replica keeps up to date;
+        otherwise the matching records are read and rolled up on demand.
+
+        Args:
+            base_id (str): The base ID.
+            table_name (str): The table name.
+            point_id (Optional[str]): Only summarize this POINT_ID.
+            zone (Optional[str]): Only summarize this Zone.
+            group_by (Optional[str]): Summarize each value of this field
+                (POINT_ID or Zone) separately.
+            live (bool): Read from Airtable even if the table is replicated locally.
+
+        Returns:
+            Dict: A summary, or ``{"groups": {value: summary}}`` when grouped.
+        """
+        filters = spt_filters(point_id, zone)
+        aggregates = None
+        if self._use_replica(base_id, table_name, live):
+            aggregates = self.replica.get_aggregates(base_id, table_name)
+        if aggregates is None:
+            aggregates = create_spt_aggregates()
+            aggregates.load(await self.read_records(
+                base_id, table_name, formula=build_spt_formula(point_id, zone), live=live, filters=filters
+            ))
+        if group_by:
+            return {"groups": aggregates.groups(group_by, filters)}
+        return aggregates.summary(filters)
+
+    async def check_connection(self, base_id: str, table_name: str) -> None:
+        """Raise if the table cannot be read; fetches a single record."""
+        await self.list_page(base_id, table_name, page_size=1, max_records=1)
@@ -1,54 +1,155 @@
 from pyairtable import Api, Table
+from app.core.logging import SAMPLED, RecordSummary
 from app.core.settings import settings
+from app.services.query import escape_field, escape_value
+from app.services.replica_store import ReplicaStore
+from app.utils.table_cache import TableCache, make_cache_key
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from app.utils.http_client import instrument_session, mount_rate_limiter, session_pool_stats
+from app.utils.rate_limiter import RateLimiter
+from app.utils.metrics import timed
+from app.utils.single_flight import SingleFlight
 
 logger = logging.getLogger("app")
 
+# Shared across service instances so reads are cached between requests
+table_cache = TableCache(
+    ttl_seconds=settings.AIRTABLE_CACHE_TTL_SECONDS,
+    max_entries=settings.AIRTABLE_CACHE_MAX_ENTRIES,
+)
+
+def spt_filters(point_id: Optional[str], zone: Optional[str]) -> Dict[str, str]:
+    """Equality filters for the SPT endpoint, keyed by field name."""
+    filters = {}
+    if point_id:
+        filters["POINT_ID"] = point_id
+    if zone:
+        filters["Zone"] = zone
+    return filters
+
+def project_fields(records: List[Dict], fields: Optional[List[str]]) -> List[Dict]:
+    """Keep only the requested fields of each record; returns new record dicts."""
+    if not fields:
+        return records
+    return [
+        {**record, "fields": {k: v for k, v in record.get("fields", {}).items() if k in fields}}
+        for record in records
+    ]
+
+def build_spt_formula(point_id: Optional[str], zone: Optional[str]) -> Optional[str]:
+    """Build the Airtable filter formula for the SPT endpoint."""
+    filters = [f"{escape_field(field)} = {escape_value(value)}" for field, value in spt_filters(point_id, zone).items()]
+    return "AND(" + ", ".join(filters) + ")" if filters else None
+
 class AirtableService:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        cache: Optional[TableCache] = None,
+        replica: Optional[ReplicaStore] = None,
+        limiter: Optional[RateLimiter] = None,
+    ):
         self.api_key = api_key
-        self.api = Api(api_key)
-
-    def get_table(self, base_id: str, table_name: str):
-        logger.debug(f"Entering get_table for table {table_name}")
-        table = self.api.table(base_id, table_name)
-        response = table.all()
-        logger.debug(f"Response from get_table: {response}")
-        logger.debug(f"Exiting get_table for table {table_name}")
+        if limiter is not None:
+            # The limiter's adapter does its own retries
+            self.api = Api(api_key, retry_strategy=None)
+            mount_rate_limiter(self.api.session, limiter)
+        else:
+            self.api = Api(api_key)
+        instrument_session(self.api.session)
+        self.cache = cache if cache is not None else table_cache
+        self.replica = replica
+        self._tables: Dict[Tuple[str, str], Table] = {}
+        self.flights = SingleFlight()
+
+    def _table(self, base_id: str, table_name: str) -> Table:
+        """Return a cached Table handle; all handles share this service's HTTP session."""
+        key = (base_id, table_name)
+        table = self._tables.get(key)
+        if table is None:
+            table = self._tables[key] = self.api.table(base_id, table_name)
+        return table
+
+    def pool_stats(self) -> Dict:
+        return {"tables": len(self._tables), **session_pool_stats(self.api.session)}
+
+    def close(self) -> None:
+        self.api.session.close()
+
+    def _use_replica(self, base_id: str, table_name: str, live: bool) -> bool:
+        return not live and self.replica is not None and self.replica.is_synced(base_id, table_name)
+
+    @timed("get_table")
+    def get_table(self, base_id: str, table_name: str, live: bool = False):
+        logger.debug("Entering get_table for table %s", table_name, extra=SAMPLED)
+        if self._use_replica(base_id, table_name, live):
+            logger.debug("Serving get_table for table %s from replica", table_name, extra=SAMPLED)
+            return self.replica.get_records(base_id, table_name)
+        cache_key = make_cache_key(base_id, table_name)
+        cached = self.cache.get(cache_key) if not live else None
+        if cached is not None:
+            logger.debug("Cache hit in get_table for table %s", table_name, extra=SAMPLED)
+            return cached
+        table = self._table(base_id, table_name)
+
+        def fetch() -> List[Dict]:
+            write_version = self.cache.write_version(base_id, table_name)
+            records = table.all()
+            self.cache.set(cache_key, records, write_version=write_version)
+            return records
+
+        # Identical concurrent reads share one upstream fetch
+        response = self.flights.do(cache_key, fetch)
+        logger.debug("Response from get_table: %s", RecordSummary(response), extra=SAMPLED)
         return response
 
+    @timed("read_record")
     def read_record(self, base_id: str, table_name: str, record_id: str):
-        table = self.api.table(base_id, table_name)
+        table = self._table(base_id, table_name)
         response = table.get(record_id)
-        logger.debug(f"Response from read_record: {response}")
+        logger.debug("Response from read_record: %s", RecordSummary(response), extra=SAMPLED)
         return response
 
+    @timed("create_record")
     def create_record(self, base_id: str, table_name: str, record: dict):
-        table = self.api.table(base_id, table_name)
+        table = self._table(base_id, table_name)
         response = table.create(record)
-        logger.debug(f"Response from create_record: {response}")
+        logger.debug("Response from create_record: %s", RecordSummary(response), extra=SAMPLED)
+        self.cache.upsert_record(base_id, table_name, response)
+        if self._use_replica(base_id, table_name, live=False):
+            self.replica.upsert_records(base_id, table_name, [response])
         return response
 
+    @timed("update_record")
     def update_record(self, base_id: str, table_name: str, record_id: str, record: dict):
-        table = self.api.table(base_id, table_name)
+        table = self._table(base_id, table_name)
         response = table.update(record_id, record)
-        logger.debug(f"Response from update_record: {response}")
+        logger.debug("Response from update_record: %s", RecordSummary(response), extra=SAMPLED)
+        self.cache.upsert_record(base_id, table_name, response)
+        if self._use_replica(base_id, table_name, live=False):
+            self.replica.upsert_records(base_id, table_name, [response])
         return response
 
+    @timed("delete_record")
     def delete_record(self, base_id: str, table_name: str, record_id: str):
-        table = self.api.table(base_id, table_name)
+        table = self._table(base_id, table_name)
         response = table.delete(record_id)
-        logger.debug(f"Response from delete_record: {response}")
+        logger.debug("Response from delete_record: %s", response, extra=SAMPLED)
+        self.cache.remove_record(base_id, table_name, record_id)
+        if self._use_replica(base_id, table_name, live=False):
+            self.replica.delete_records(base_id, table_name, [record_id])
         return response
 
+    @timed("get_filtered_sorted_records")
     def get_filtered_sorted_records(
         self,
         base_id: str,
         table_name: str,
         point_id: Optional[str] = None,
         zone: Optional[str] = None,
-        sort_by: Optional[str] = "Material"
+        sort_by: Optional[str] = "Material",
+        live: bool = False,
     ) -> List[Dict]:
         """
         Retrieve all records from a specified table with optional filtering and sorting.
@@ -59,38 +160,42 @@ class AirtableService:
             point_id (Optional[str]): Filter records by POINT_ID (optional).
             zone (Optional[str]): Filter records by Zone (optional).
             sort_by (Optional[str]): Sort records by a field (default: Material).
+            live (bool): Read from Airtable even if the table is replicated or cached locally.
 
         Returns:
             List[Dict]: List of filtered and sorted records.
         """
-        logger.debug(f"Get the table")
-        table = Table(self.api_key, base_id, table_name)
-
-        logger.debug(f"Setup the filters")
+        if self._use_replica(base_id, table_name, live):
+            logger.debug("Serving filtered records for table %s from replica", table_name, extra=SAMPLED)
+            return self.replica.get_records(
+                base_id, table_name, filters=spt_filters(point_id, zone), sort_by=sort_by
+            )
 
-        # Build the filter formula dynamically
-        filters = []
-        if point_id:
-            filters.append(f"{{POINT_ID}} = '{point_id}'")
-        if zone:
-            filters.append(f"{{Zone}} = '{zone}'")
-        filter_formula = "AND(" + ", ".join(filters) + ")" if filters else None
+        table = self._table(base_id, table_name)
+        filter_formula = build_spt_formula(point_id, zone)
+        logger.debug("Filter formula: %s", filter_formula, extra=SAMPLED)
 
-        logger.debug(f"Filters {filters}")
-        logger.debug(f"Filter formula: {filter_formula}")
+        cache_key = make_cache_key(base_id, table_name, filter_formula, [sort_by])
+        cached = self.cache.get(cache_key) if not live else None
+        if cached is not None:
+            logger.debug("Cache hit for filter formula: %s", filter_formula, extra=SAMPLED)
+            return list(cached)
 
-        try:
+        def fetch() -> List[Dict]:
+            write_version = self.cache.write_version(base_id, table_name)
             # Get records with filtering and sorting
             records = table.all(
                 formula=filter_formula,
                 sort=[sort_by]
             )
-            logger.debug(f"Retrieved {len(records)} records from table {table_name}")
-            logger.debug(f"Records: {records}")
+            self.cache.set(cache_key, records, write_version=write_version)
+            return records
+
+        try:
+            records = self.flights.do(cache_key, fetch)
+            logger.debug("Retrieved %s from table %s", RecordSummary(records), table_name, extra=SAMPLED)
             return [record for record in records]
         except Exception as e:
-            logger.error(f"Error retrieving records: {e}")
-            logger.error(f"Response content: {e.response.content if hasattr(e, 'response') else 'No response content'}")
+            logger.error("Error retrieving records: %s", e)
+            logger.error("Response content: %s", e.response.content if hasattr(e, 'response') else 'No response content')
             raise
-
-airtable_service = AirtableService(api_key=settings.AIRTABLE_API_KEY)
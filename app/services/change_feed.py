@@ -0,0 +1,213 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from app.services.airtable_async_services import AsyncAirtableService
+from app.services.record_index import index_key
+from app.utils.rate_limiter import Priority, request_priority
+from app.utils.serialization import shape_record
+
+logger = logging.getLogger("app")
+
+# (event name, payload)
+Event = Tuple[str, Dict]
+
+
+def matches(record: Dict, filters: Dict[str, str]) -> bool:
+    """Field-equality match with the same value normalization as the replica index."""
+    fields = record.get("fields", {})
+    return all(index_key(fields.get(field)) == value for field, value in filters.items())
+
+
+def diff_records(previous: Dict[str, Dict], current: Dict[str, Dict]) -> Tuple[List[Dict], List[Tuple[Dict, Dict]], List[Dict]]:
+    """
+    Compare two ``{id: record}`` snapshots of a table.
+
+    Returns:
+        Tuple: Created records, ``(old, new)`` pairs of updated records and
+        the last known version of deleted records.
+    """
+    created = [record for record_id, record in current.items() if record_id not in previous]
+    updated = [
+        (previous[record_id], record)
+        for record_id, record in current.items()
+        if record_id in previous and previous[record_id] != record
+    ]
+    deleted = [record for record_id, record in previous.items() if record_id not in current]
+    return created, updated, deleted
+
+
+class Subscription:
+    """
+    One client's view of a table's changes, optionally narrowed by field filters.
+
+    Events are queued until the client reads them. A client that falls
+    ``queue_size`` events behind is disconnected; on reconnecting it starts
+    again from a fresh snapshot.
+    """
+
+    def __init__(self, base_id: str, table_name: str, filters: Dict[str, str], queue_size: int = 100):
+        self.base_id = base_id
+        self.table_name = table_name
+        self.filters = filters
+        self.started = False
+        self.closed = False
+        self._queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue(maxsize=queue_size)
+
+    def send_snapshot(self, snapshot: Dict[str, Dict]) -> None:
+        records = [shape_record(record) for record in snapshot.values() if matches(record, self.filters)]
+        self.started = True
+        self._push(("snapshot", {"records": records}))
+
+    def send_changes(self, created: List[Dict], updated: List[Tuple[Dict, Dict]], deleted: List[Dict]) -> None:
+        """Push the part of a table-wide delta that falls within this subscription's filters."""
+        delta: Dict[str, List] = {"created": [], "updated": [], "deleted": []}
+        for record in created:
+            if matches(record, self.filters):
+                delta["created"].append(shape_record(record))
+        for old, new in updated:
+            was, now = matches(old, self.filters), matches(new, self.filters)
+            # A record moving into or out of the filtered view looks created or deleted to this client
+            if now:
+                delta["updated" if was else "created"].append(shape_record(new))
+            elif was:
+                delta["deleted"].append(new["id"])
+        for record in deleted:
+            if matches(record, self.filters):
+                delta["deleted"].append(record["id"])
+        if any(delta.values()):
+            self._push(("changes", delta))
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    async def events(self, heartbeat_seconds: float) -> AsyncIterator[Optional[Event]]:
+        """
+        Yield queued events until the subscription is closed. Yields None
+        after ``heartbeat_seconds`` without events so idle streams can send a
+        keep-alive.
+        """
+        while True:
+            try:
+                event = await asyncio.wait_for(self._queue.get(), heartbeat_seconds)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if event is None:
+                return
+            yield event
+
+    def _push(self, event: Event) -> None:
+        if self.closed:
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("Change feed subscriber for %s/%s fell behind; disconnecting", self.base_id, self.table_name)
+            self.close()
+
+
+class _TableFeed:
+    def __init__(self):
+        self.subscriptions: Set[Subscription] = set()
+        self.snapshot: Optional[Dict[str, Dict]] = None
+        self.version = None
+        self.task: Optional[asyncio.Task] = None
+
+
+class ChangeFeed:
+    """
+    Pushes record changes to subscribed clients instead of having each of
+    them poll a table.
+
+    Each table with at least one subscriber has a single poller that reads it
+    every ``interval_seconds`` and diffs the result against the previous
+    read. Replicated tables are read from the replica, and only once its
+    version changes; other tables are read live from Airtable, once per
+    interval regardless of the number of subscribers.
+    """
+
+    def __init__(self, service: AsyncAirtableService, interval_seconds: float = 5, queue_size: int = 100):
+        self.service = service
+        self.interval_seconds = interval_seconds
+        self.queue_size = queue_size
+        self._feeds: Dict[Tuple[str, str], _TableFeed] = {}
+
+    def subscribe(self, base_id: str, table_name: str, filters: Optional[Dict[str, str]] = None) -> Subscription:
+        subscription = Subscription(base_id, table_name, filters or {}, self.queue_size)
+        feed = self._feeds.get((base_id, table_name))
+        if feed is None:
+            feed = self._feeds[(base_id, table_name)] = _TableFeed()
+        feed.subscriptions.add(subscription)
+        if feed.snapshot is not None:
+            subscription.send_snapshot(feed.snapshot)
+        if feed.task is None:
+            feed.task = asyncio.create_task(self._run(base_id, table_name, feed))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        key = (subscription.base_id, subscription.table_name)
+        feed = self._feeds.get(key)
+        if feed is None:
+            return
+        feed.subscriptions.discard(subscription)
+        if not feed.subscriptions:
+            # Nobody is listening; stop polling and forget the snapshot
+            if feed.task is not None:
+                feed.task.cancel()
+            del self._feeds[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            f"{base_id}/{table_name}": len(feed.subscriptions)
+            for (base_id, table_name), feed in self._feeds.items()
+        }
+
+    async def close(self) -> None:
+        tasks = []
+        for feed in list(self._feeds.values()):
+            for subscription in list(feed.subscriptions):
+                subscription.close()
+            if feed.task is not None:
+                feed.task.cancel()
+                tasks.append(feed.task)
+        self._feeds.clear()
+        # Wait for the pollers to finish, so none is left reading after shutdown
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def poll(self, base_id: str, table_name: str) -> None:
+        """Read a subscribed table once and push what changed since the last read."""
+        feed = self._feeds.get((base_id, table_name))
+        if feed is None:
+            return
+        version = self.service.data_version(base_id, table_name)
+        replicated = version is not None and version[0] == "replica"
+        if replicated and feed.snapshot is not None and version == feed.version:
+            return
+        records = await self.service.read_records(base_id, table_name, live=not replicated)
+        current = {record["id"]: record for record in records}
+        previous, feed.snapshot, feed.version = feed.snapshot, current, version
+        changes = diff_records(previous, current) if previous is not None else None
+        for subscription in list(feed.subscriptions):
+            if not subscription.started:
+                subscription.send_snapshot(current)
+            elif changes is not None:
+                subscription.send_changes(*changes)
+
+    async def _run(self, base_id: str, table_name: str, feed: _TableFeed) -> None:
+        # Feed polls yield to interactive reads under the rate limiter
+        request_priority.set(Priority.BULK)
+        while feed.subscriptions:
+            try:
+                await self.poll(base_id, table_name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Change feed poll failed for %s/%s: %s", base_id, table_name, e)
+            await asyncio.sleep(self.interval_seconds)
@@ -0,0 +1,131 @@
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from pyairtable import formulas
+
+from app.services.record_index import index_key, sort_key
+
+OPERATORS = ("eq", "ne", "lt", "lte", "gt", "gte", "in", "contains")
+
+_COMPARISONS = {
+    "eq": formulas.EQ,
+    "ne": formulas.NE,
+    "lt": formulas.LT,
+    "lte": formulas.LTE,
+    "gt": formulas.GT,
+    "gte": formulas.GTE,
+}
+
+
+class Predicate(NamedTuple):
+    """One ``{field} <op> value`` condition of a structured query."""
+
+    field: str
+    op: str
+    value: Any
+
+
+def escape_field(field_name: str) -> str:
+    """Field reference with braces and backslashes escaped, e.g. ``{Zone}``."""
+    return formulas.field_name(field_name)
+
+
+def escape_value(value: Any) -> str:
+    """Formula literal for a string, number or boolean, with strings quoted and escaped."""
+    return formulas.to_formula_str(value)
+
+
+def predicate_formula(predicate: Predicate) -> formulas.Formula:
+    field = formulas.Field(predicate.field)
+    if predicate.op == "in":
+        options = [formulas.EQ(field, value) for value in predicate.value]
+        return formulas.OR(*options) if options else formulas.FALSE()
+    if predicate.op == "contains":
+        # FIND returns the 1-based position, or 0 when the text is absent
+        return formulas.GT(formulas.FIND(str(predicate.value), field), 0)
+    return _COMPARISONS[predicate.op](field, predicate.value)
+
+
+def compile_formula(predicates: Iterable[Predicate]) -> Optional[str]:
+    """
+    Compile predicates into one ``filterByFormula`` expression, AND-ed together.
+
+    Field names and values are escaped by pyairtable's formula builder, so
+    quotes and braces in client input cannot change the formula's structure.
+    Returns None when there is nothing to filter on.
+    """
+    parts = [predicate_formula(predicate) for predicate in predicates]
+    if not parts:
+        return None
+    return str(parts[0] if len(parts) == 1 else formulas.AND(*parts))
+
+
+def _compare(cell: Any, value: Any) -> Optional[int]:
+    """Three-way comparison of a cell with a query value, or None if they are not comparable."""
+    if isinstance(value, bool):
+        left, right = bool(cell), bool(value)
+    elif isinstance(value, (int, float)):
+        if not isinstance(cell, (int, float)):
+            return None
+        left, right = cell, value
+    else:
+        if cell is None:
+            return None
+        left, right = index_key(cell), str(value)
+    return (left > right) - (left < right)
+
+
+def predicate_matches(fields: Dict, predicate: Predicate) -> bool:
+    """Evaluate one predicate against a record's fields the way the compiled formula would."""
+    cell = fields.get(predicate.field)
+    op = predicate.op
+    if op == "in":
+        return any(_compare(cell, value) == 0 for value in predicate.value)
+    if op == "contains":
+        return cell is not None and str(predicate.value) in index_key(cell)
+    order = _compare(cell, predicate.value)
+    if op == "ne":
+        return order != 0
+    if order is None:
+        return False
+    if op == "eq":
+        return order == 0
+    if op == "lt":
+        return order < 0
+    if op == "lte":
+        return order <= 0
+    if op == "gt":
+        return order > 0
+    return order >= 0
+
+
+def run_query(
+    records: Iterable[Dict],
+    predicates: List[Predicate],
+    sort: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+) -> List[Dict]:
+    """
+    Filter, sort and limit records held locally.
+
+    ``sort`` takes the same ``-field`` form as Airtable requests, and ties
+    keep their input order, like Airtable's multi-field sort.
+    """
+    matched = [
+        record for record in records
+        if all(predicate_matches(record.get("fields", {}), predicate) for predicate in predicates)
+    ]
+    # Stable sorts applied from the last key to the first give a multi-key ordering
+    for field_name in reversed(sort or []):
+        descending = field_name.startswith("-")
+        field_name = field_name[1:] if descending else field_name
+        matched.sort(key=lambda record: sort_key(record.get("fields", {}).get(field_name)), reverse=descending)
+    return matched[:limit] if limit else matched
+
+
+def equality_filters(predicates: Iterable[Predicate]) -> Dict[str, str]:
+    """Text equality predicates in the replica's ``{field: value}`` filter form."""
+    return {
+        predicate.field: predicate.value
+        for predicate in predicates
+        if predicate.op == "eq" and isinstance(predicate.value, str)
+    }
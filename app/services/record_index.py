@@ -0,0 +1,172 @@
+import bisect
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+SortKey = Tuple[int, Any]
+# Flat (rank, value, record_id) tuples compare faster than nested ones
+SortEntry = Tuple[int, Any, str]
+
+
+def sort_key(value: Any) -> SortKey:
+    """
+    Order field values the way Airtable sorts ascending: empty cells first,
+    then numbers, then text. Lists (lookup/multi-select cells) sort by their
+    string form.
+    """
+    if value is None:
+        return (0, "")
+    if isinstance(value, (bool, int, float)):
+        return (1, float(value))
+    if isinstance(value, str):
+        return (2, value)
+    return (3, str(value))
+
+
+def index_key(value: Any) -> Optional[str]:
+    """Normalize a field value for equality lookups against query string values."""
+    if value is None:
+        return None
+    if isinstance(value, list):
+        return ", ".join(str(item) for item in value)
+    return str(value)
+
+
+class RecordIndex:
+    """
+    In-memory secondary indexes over one table's records.
+
+    Keeps a hash index (value -> record ids) for each field in
+    ``filter_fields`` and a pre-sorted ``(rank, value, id)`` ordering for each
+    field in ``sort_fields``. Equality filters become set lookups and sorting
+    by an indexed field becomes a walk over the pre-sorted ordering, instead
+    of a filter-and-sort over every row.
+    """
+
+    def __init__(self, filter_fields: Iterable[str] = (), sort_fields: Iterable[str] = ()):
+        self.filter_fields = tuple(filter_fields)
+        self.sort_fields = tuple(sort_fields)
+        self.records: Dict[str, Dict] = {}
+        self._hash: Dict[str, Dict[Optional[str], Set[str]]] = {f: defaultdict(set) for f in self.filter_fields}
+        self._sorted: Dict[str, List[SortEntry]] = {f: [] for f in self.sort_fields}
+        self._entries: Dict[str, Dict[str, SortEntry]] = {f: {} for f in self.sort_fields}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def load(self, records: Iterable[Dict]) -> None:
+        """Rebuild every index from a full set of records."""
+        with self._lock:
+            self.records = {record["id"]: record for record in records}
+            self._hash = {f: defaultdict(set) for f in self.filter_fields}
+            for record_id, record in self.records.items():
+                fields = record.get("fields", {})
+                for field_name in self.filter_fields:
+                    self._hash[field_name][index_key(fields.get(field_name))].add(record_id)
+            self._entries = {
+                field_name: {
+                    record_id: sort_key(record.get("fields", {}).get(field_name)) + (record_id,)
+                    for record_id, record in self.records.items()
+                }
+                for field_name in self.sort_fields
+            }
+            self._sorted = {field_name: sorted(entries.values()) for field_name, entries in self._entries.items()}
+
+    def upsert(self, records: Iterable[Dict]) -> None:
+        with self._lock:
+            for record in records:
+                self._remove(record["id"])
+                self._add(record)
+
+    def delete(self, record_ids: Iterable[str]) -> None:
+        with self._lock:
+            for record_id in record_ids:
+                self._remove(record_id)
+
+    def query(self, filters: Optional[Dict[str, Any]] = None, sort_by: Optional[str] = None) -> List[Dict]:
+        """
+        Return records matching all equality ``filters``, sorted by ``sort_by``.
+
+        Filters on indexed fields are answered by intersecting hash buckets;
+        filters on other fields are checked against the remaining candidates.
+        """
+        with self._lock:
+            candidates = self._candidates(filters or {})
+            if sort_by is None:
+                ids = list(self.records) if candidates is None else sorted(candidates)
+            elif sort_by in self._sorted:
+                ids = self._ordered_ids(sort_by, candidates)
+            else:
+                ids = self._sort_ids(self.records if candidates is None else candidates, sort_by)
+            return [self.records[record_id] for record_id in ids]
+
+    def _candidates(self, filters: Dict[str, Any]) -> Optional[Set[str]]:
+        indexed = [(f, v) for f, v in filters.items() if f in self._hash]
+        others = [(f, v) for f, v in filters.items() if f not in self._hash]
+        candidates: Optional[Set[str]] = None
+        buckets = sorted(
+            (self._hash[f].get(index_key(v), set()) for f, v in indexed), key=len
+        )
+        for bucket in buckets:
+            candidates = set(bucket) if candidates is None else candidates & bucket
+            if not candidates:
+                return set()
+        if others:
+            pool = self.records if candidates is None else candidates
+            candidates = {
+                record_id
+                for record_id in pool
+                if all(
+                    index_key(self.records[record_id].get("fields", {}).get(f)) == index_key(v)
+                    for f, v in others
+                )
+            }
+        return candidates
+
+    def _ordered_ids(self, sort_by: str, candidates: Optional[Set[str]]) -> List[str]:
+        ordering = self._sorted[sort_by]
+        if candidates is None:
+            return [entry[2] for entry in ordering]
+        # Unless the filters keep most rows, sorting the candidates by their
+        # precomputed keys is cheaper than walking the whole ordering.
+        if len(candidates) * 2 < len(ordering):
+            entries = self._entries[sort_by]
+            return [entry[2] for entry in sorted(entries[rid] for rid in candidates)]
+        return [entry[2] for entry in ordering if entry[2] in candidates]
+
+    def _sort_ids(self, record_ids: Iterable[str], sort_by: str) -> List[str]:
+        return sorted(
+            record_ids,
+            key=lambda rid: (sort_key(self.records[rid].get("fields", {}).get(sort_by)), rid),
+        )
+
+    def _add(self, record: Dict) -> None:
+        record_id = record["id"]
+        fields = record.get("fields", {})
+        self.records[record_id] = record
+        for field_name in self.filter_fields:
+            self._hash[field_name][index_key(fields.get(field_name))].add(record_id)
+        for field_name in self.sort_fields:
+            entry = sort_key(fields.get(field_name)) + (record_id,)
+            self._entries[field_name][record_id] = entry
+            bisect.insort(self._sorted[field_name], entry)
+
+    def _remove(self, record_id: str) -> None:
+        record = self.records.pop(record_id, None)
+        if record is None:
+            return
+        fields = record.get("fields", {})
+        for field_name in self.filter_fields:
+            key = index_key(fields.get(field_name))
+            bucket = self._hash[field_name].get(key)
+            if bucket is not None:
+                bucket.discard(record_id)
+                if not bucket:
+                    del self._hash[field_name][key]
+        for field_name in self.sort_fields:
+            ordering = self._sorted[field_name]
+            entry = self._entries[field_name].pop(record_id)
+            position = bisect.bisect_left(ordering, entry)
+            if position < len(ordering) and ordering[position] == entry:
+                del ordering[position]
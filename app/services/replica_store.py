@@ -0,0 +1,347 @@
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.record_index import RecordIndex
+from app.services.spt_aggregates import SptAggregates
+
+logger = logging.getLogger("app")
+
+# Source of table generations, shared by every store like TableCache's
+_generations = itertools.count(1)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    base_id TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    id TEXT NOT NULL,
+    created_time TEXT,
+    fields TEXT NOT NULL,
+    PRIMARY KEY (base_id, table_name, id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    base_id TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    watermark TEXT,
+    last_full_sync TEXT,
+    PRIMARY KEY (base_id, table_name)
+);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    base_id TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    id TEXT,
+    writer TEXT NOT NULL,
+    logged_at REAL NOT NULL
+);
+"""
+
+# Record ids per SELECT ... IN (...) when applying logged changes
+REFRESH_CHUNK = 500
+
+
+def json_path(field_name: str) -> str:
+    """Build a SQLite JSON path for a top-level Airtable field name."""
+    return '$."' + field_name.replace('"', '\\"') + '"'
+
+
+class ReplicaStore:
+    """
+    Local SQLite mirror of Airtable tables.
+
+    Records are stored as ``(id, createdTime, fields JSON)`` rows per table and
+    read back in the same shape pyairtable returns, so the replica can stand in
+    for a live ``table.all()`` call.
+
+    When ``index_fields`` or ``sort_fields`` are given, each synced table is
+    also held in an in-memory RecordIndex that is kept up to date on every
+    write, and reads are answered from it instead of SQLite. Aggregates
+    added with ``add_aggregates`` are maintained the same way.
+
+    Several processes may share one database file. Every write is also
+    logged in the ``changes`` table (the record ids, or NULL when a table was
+    replaced), and ``refresh`` applies other processes' logged writes to this
+    process's indexes and aggregates.
+    """
+
+    def __init__(self, db_path: str, index_fields: Iterable[str] = (), sort_fields: Iterable[str] = ()):
+        self.db_path = db_path
+        self.index_fields = tuple(index_fields)
+        self.sort_fields = tuple(sort_fields)
+        self._indexes: Dict[Tuple[str, str], RecordIndex] = {}
+        self._aggregates: Dict[Tuple[str, str], SptAggregates] = {}
+        self._index_lock = threading.Lock()
+        self._generations: Dict[Tuple[str, str], int] = {}
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # Tags this process's entries in the change log
+        self.writer = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+            # Indexes and aggregates are built from SQLite, so they start out current
+            self._seen_seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def is_synced(self, base_id: str, table_name: str) -> bool:
+        """Whether the table has completed at least one full load."""
+        return self.get_sync_state(base_id, table_name).get("last_full_sync") is not None
+
+    def get_sync_state(self, base_id: str, table_name: str) -> Dict[str, Optional[str]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark, last_full_sync FROM sync_state WHERE base_id = ? AND table_name = ?",
+                (base_id, table_name),
+            ).fetchone()
+        if row is None:
+            return {}
+        return {"watermark": row[0], "last_full_sync": row[1]}
+
+    def replace_table(self, base_id: str, table_name: str, records: List[Dict], synced_at: str) -> None:
+        """Swap the full contents of a table after a full load."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM records WHERE base_id = ? AND table_name = ?", (base_id, table_name)
+            )
+            self._insert(base_id, table_name, records)
+            self._log(base_id, table_name, [None])
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (base_id, table_name, watermark, last_full_sync) "
+                "VALUES (?, ?, ?, ?)",
+                (base_id, table_name, synced_at, synced_at),
+            )
+        with self._index_lock:
+            index = self._indexes.get((base_id, table_name))
+            if index is not None:
+                index.load(records)
+            aggregates = self._aggregates.get((base_id, table_name))
+            if aggregates is not None:
+                aggregates.load(records)
+        self._bump(base_id, table_name)
+
+    def upsert_records(
+        self, base_id: str, table_name: str, records: List[Dict], watermark: Optional[str] = None
+    ) -> None:
+        """Insert or replace changed records, optionally advancing the sync watermark."""
+        with self._lock, self._conn:
+            self._insert(base_id, table_name, records)
+            self._log(base_id, table_name, [record["id"] for record in records])
+            if watermark is not None:
+                self._conn.execute(
+                    "UPDATE sync_state SET watermark = ? WHERE base_id = ? AND table_name = ?",
+                    (watermark, base_id, table_name),
+                )
+        with self._index_lock:
+            index = self._indexes.get((base_id, table_name))
+            if index is not None:
+                index.upsert(records)
+            aggregates = self._aggregates.get((base_id, table_name))
+            if aggregates is not None:
+                aggregates.upsert(records)
+        if records:
+            self._bump(base_id, table_name)
+
+    def delete_records(self, base_id: str, table_name: str, record_ids: Iterable[str]) -> None:
+        record_ids = list(record_ids)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM records WHERE base_id = ? AND table_name = ? AND id = ?",
+                [(base_id, table_name, record_id) for record_id in record_ids],
+            )
+            self._log(base_id, table_name, record_ids)
+        with self._index_lock:
+            index = self._indexes.get((base_id, table_name))
+            if index is not None:
+                index.delete(record_ids)
+            aggregates = self._aggregates.get((base_id, table_name))
+            if aggregates is not None:
+                aggregates.delete(record_ids)
+        if record_ids:
+            self._bump(base_id, table_name)
+
+    def refresh(self) -> int:
+        """
+        Apply writes that other processes logged since the last refresh to the
+        in-memory indexes and aggregates. Returns the number of tables changed.
+        """
+        with self._lock:
+            first_seq = self._conn.execute("SELECT MIN(seq) FROM changes").fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT seq, base_id, table_name, id, writer FROM changes WHERE seq > ? ORDER BY seq",
+                (self._seen_seq,),
+            ).fetchall()
+        if first_seq is not None and first_seq > self._seen_seq + 1:
+            # Entries this process has not seen were pruned; start over from SQLite
+            changed: Dict[Tuple[str, str], Optional[set]] = {key: None for key in self._loaded_tables()}
+        else:
+            changed = {}
+        for _, base_id, table_name, record_id, writer in rows:
+            key = (base_id, table_name)
+            if writer == self.writer or (key in changed and changed[key] is None):
+                continue
+            if record_id is None:
+                changed[key] = None
+            else:
+                changed.setdefault(key, set()).add(record_id)
+        if rows:
+            self._seen_seq = rows[-1][0]
+        for (base_id, table_name), record_ids in changed.items():
+            self._apply_logged(base_id, table_name, record_ids)
+        return len(changed)
+
+    def _loaded_tables(self) -> List[Tuple[str, str]]:
+        with self._index_lock:
+            return list(set(self._indexes) | set(self._aggregates))
+
+    def _apply_logged(self, base_id: str, table_name: str, record_ids: Optional[set]) -> None:
+        key = (base_id, table_name)
+        with self._index_lock:
+            targets = [target for target in (self._indexes.get(key), self._aggregates.get(key)) if target is not None]
+        if targets:
+            if record_ids is None:
+                records = self._select(base_id, table_name)
+                with self._index_lock:
+                    for target in targets:
+                        target.load(records)
+            else:
+                records = self._select_ids(base_id, table_name, list(record_ids))
+                deleted = record_ids - {record["id"] for record in records}
+                with self._index_lock:
+                    for target in targets:
+                        target.upsert(records)
+                        target.delete(deleted)
+        self._bump(base_id, table_name)
+
+    def prune_changes(self, older_than_seconds: float) -> int:
+        """Drop change log entries older than ``older_than_seconds``, keeping the latest."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM changes WHERE logged_at < ? AND seq < (SELECT MAX(seq) FROM changes)",
+                (time.time() - older_than_seconds,),
+            )
+        return cursor.rowcount
+
+    def generation(self, base_id: str, table_name: str) -> int:
+        """
+        Version of a table's replicated contents, changed after every write
+        that touches it. Reads return at least the data of the generation
+        seen before the read started.
+        """
+        with self._index_lock:
+            key = (base_id, table_name)
+            generation = self._generations.get(key)
+            if generation is None:
+                generation = self._generations[key] = next(_generations)
+            return generation
+
+    def _bump(self, base_id: str, table_name: str) -> None:
+        with self._index_lock:
+            self._generations[(base_id, table_name)] = next(_generations)
+
+    def get_index(self, base_id: str, table_name: str) -> Optional[RecordIndex]:
+        """Return the in-memory index for a table, building it from SQLite on first use."""
+        if not (self.index_fields or self.sort_fields):
+            return None
+        key = (base_id, table_name)
+        with self._index_lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = RecordIndex(self.index_fields, self.sort_fields)
+                index.load(self._select(base_id, table_name))
+                self._indexes[key] = index
+        return index
+
+    def add_aggregates(self, base_id: str, table_name: str, aggregates: SptAggregates) -> None:
+        """Load ``aggregates`` from a table's replicated records and keep them current on every write."""
+        with self._index_lock:
+            aggregates.load(self._select(base_id, table_name))
+            self._aggregates[(base_id, table_name)] = aggregates
+
+    def get_aggregates(self, base_id: str, table_name: str) -> Optional[SptAggregates]:
+        with self._index_lock:
+            return self._aggregates.get((base_id, table_name))
+
+    def get_records(
+        self,
+        base_id: str,
+        table_name: str,
+        filters: Optional[Dict[str, str]] = None,
+        sort_by: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Read records from the replica.
+
+        Args:
+            base_id (str): The base ID.
+            table_name (str): The table name.
+            filters (Optional[Dict[str, str]]): Field equality filters.
+            sort_by (Optional[str]): Field to sort ascending by.
+
+        Returns:
+            List[Dict]: Records in pyairtable's ``{"id", "createdTime", "fields"}`` shape.
+        """
+        index = self.get_index(base_id, table_name)
+        if index is not None:
+            return index.query(filters, sort_by)
+        return self._select(base_id, table_name, filters, sort_by)
+
+    def _select(
+        self,
+        base_id: str,
+        table_name: str,
+        filters: Optional[Dict[str, str]] = None,
+        sort_by: Optional[str] = None,
+    ) -> List[Dict]:
+        query = "SELECT id, created_time, fields FROM records WHERE base_id = ? AND table_name = ?"
+        params: List = [base_id, table_name]
+        for field_name, value in (filters or {}).items():
+            query += " AND json_extract(fields, ?) = ?"
+            params.extend([json_path(field_name), value])
+        if sort_by:
+            query += " ORDER BY json_extract(fields, ?) IS NOT NULL, json_extract(fields, ?), id"
+            params.extend([json_path(sort_by), json_path(sort_by)])
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [{"id": row[0], "createdTime": row[1], "fields": json.loads(row[2])} for row in rows]
+
+    def _select_ids(self, base_id: str, table_name: str, record_ids: List[str]) -> List[Dict]:
+        records = []
+        for start in range(0, len(record_ids), REFRESH_CHUNK):
+            chunk = record_ids[start:start + REFRESH_CHUNK]
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, created_time, fields FROM records WHERE base_id = ? AND table_name = ? "
+                    f"AND id IN ({', '.join('?' * len(chunk))})",
+                    [base_id, table_name, *chunk],
+                ).fetchall()
+            records.extend({"id": row[0], "createdTime": row[1], "fields": json.loads(row[2])} for row in rows)
+        return records
+
+    def _log(self, base_id: str, table_name: str, record_ids: List[Optional[str]]) -> None:
+        now = time.time()
+        self._conn.executemany(
+            "INSERT INTO changes (base_id, table_name, id, writer, logged_at) VALUES (?, ?, ?, ?, ?)",
+            [(base_id, table_name, record_id, self.writer, now) for record_id in record_ids],
+        )
+
+    def _insert(self, base_id: str, table_name: str, records: List[Dict]) -> None:
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO records (base_id, table_name, id, created_time, fields) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (base_id, table_name, record["id"], record.get("createdTime"), json.dumps(record.get("fields", {})))
+                for record in records
+            ],
+        )
@@ -0,0 +1,211 @@
+import itertools
+import math
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.core.settings import settings
+from app.services.record_index import index_key
+
+# The table the SPT endpoints serve
+SPT_TABLE = ("app4p8WX4X6BRjei8", "Field_SPT")
+
+# A rollup is keyed by one value (or None for "any") per group field
+GroupKey = Tuple[Optional[str], ...]
+
+
+class Contribution(NamedTuple):
+    """What one record adds to the rollups it belongs to."""
+
+    groups: Tuple[Optional[str], ...]
+    n_value: Optional[float]
+    depth_bin: Optional[int]
+    material: Optional[str]
+
+
+def _number(value) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return value
+
+
+def _discard(counter: Counter, key) -> None:
+    counter[key] -= 1
+    if counter[key] <= 0:
+        del counter[key]
+
+
+def describe(values: Counter) -> Dict:
+    """count/mean/std/min/max of a multiset of N values, held as value -> count."""
+    count = sum(values.values())
+    if not count:
+        return {"count": 0, "mean": None, "std": None, "min": None, "max": None}
+    mean = math.fsum(value * times for value, times in values.items()) / count
+    variance = math.fsum((value - mean) ** 2 * times for value, times in values.items()) / count
+    return {"count": count, "mean": mean, "std": math.sqrt(variance), "min": min(values), "max": max(values)}
+
+
+class Rollup:
+    """Record count, N-value distribution by depth and material counts for one group."""
+
+    def __init__(self):
+        self.count = 0
+        self.n_values: Counter = Counter()
+        self.depths: Dict[int, Counter] = {}
+        self.materials: Counter = Counter()
+
+    def add(self, contribution: Contribution) -> None:
+        self.count += 1
+        if contribution.n_value is not None:
+            self.n_values[contribution.n_value] += 1
+            if contribution.depth_bin is not None:
+                self.depths.setdefault(contribution.depth_bin, Counter())[contribution.n_value] += 1
+        if contribution.material is not None:
+            self.materials[contribution.material] += 1
+
+    def remove(self, contribution: Contribution) -> None:
+        self.count -= 1
+        if contribution.n_value is not None:
+            _discard(self.n_values, contribution.n_value)
+            if contribution.depth_bin is not None:
+                depth = self.depths[contribution.depth_bin]
+                _discard(depth, contribution.n_value)
+                if not depth:
+                    del self.depths[contribution.depth_bin]
+        if contribution.material is not None:
+            _discard(self.materials, contribution.material)
+
+    def summary(self, depth_bin: float) -> Dict:
+        return {
+            "count": self.count,
+            "n_value": describe(self.n_values),
+            "by_depth": [
+                {"depth_from": position * depth_bin, "depth_to": (position + 1) * depth_bin, **describe(values)}
+                for position, values in sorted(self.depths.items())
+            ],
+            "materials": dict(self.materials.most_common()),
+        }
+
+
+class SptAggregates:
+    """
+    SPT summary statistics per group, maintained as records change.
+
+    Every record contributes to one rollup per combination of its
+    ``group_fields`` values and "any" (for POINT_ID and Zone: the point, the
+    zone, the point within the zone and the whole table). Writes update only
+    the rollups of the records they touch, and reading a summary costs the
+    number of distinct N values, depth bins and materials in the group,
+    whatever the size of the table.
+
+    Exposes the same ``load``/``upsert``/``delete`` interface as RecordIndex
+    so the replica can keep it current.
+    """
+
+    def __init__(
+        self,
+        group_fields: Iterable[str] = ("POINT_ID", "Zone"),
+        n_field: str = "N_Value",
+        depth_field: str = "Depth",
+        material_field: str = "Material",
+        depth_bin: float = 1.0,
+    ):
+        self.group_fields = tuple(group_fields)
+        self.n_field = n_field
+        self.depth_field = depth_field
+        self.material_field = material_field
+        self.depth_bin = depth_bin
+        self._contributions: Dict[str, Contribution] = {}
+        self._rollups: Dict[GroupKey, Rollup] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._contributions)
+
+    def load(self, records: Iterable[Dict]) -> None:
+        """Rebuild every rollup from a full set of records."""
+        with self._lock:
+            self._contributions = {}
+            self._rollups = {}
+            for record in records:
+                self._add(record)
+
+    def upsert(self, records: Iterable[Dict]) -> None:
+        with self._lock:
+            for record in records:
+                self._remove(record["id"])
+                self._add(record)
+
+    def delete(self, record_ids: Iterable[str]) -> None:
+        with self._lock:
+            for record_id in record_ids:
+                self._remove(record_id)
+
+    def summary(self, filters: Optional[Dict[str, str]] = None) -> Dict:
+        """Summary of the records matching equality ``filters`` on group fields."""
+        key = self._key(filters or {})
+        with self._lock:
+            rollup = self._rollups.get(key) or Rollup()
+            return rollup.summary(self.depth_bin)
+
+    def groups(self, group_by: str, filters: Optional[Dict[str, str]] = None) -> Dict[str, Dict]:
+        """Summaries of every ``group_by`` value among the records matching ``filters``."""
+        position = self.group_fields.index(group_by)
+        key = self._key(filters or {})
+        with self._lock:
+            return {
+                rollup_key[position]: rollup.summary(self.depth_bin)
+                for rollup_key, rollup in self._rollups.items()
+                if rollup_key[position] is not None
+                and all(value == wanted for i, (value, wanted) in enumerate(zip(rollup_key, key)) if i != position)
+            }
+
+    def _key(self, filters: Dict[str, str]) -> GroupKey:
+        unknown = set(filters) - set(self.group_fields)
+        if unknown:
+            raise ValueError(f"Aggregates are grouped by {', '.join(self.group_fields)}, not {', '.join(sorted(unknown))}")
+        return tuple(index_key(filters.get(field_name)) for field_name in self.group_fields)
+
+    def _contribution(self, record: Dict) -> Contribution:
+        fields = record.get("fields", {})
+        depth = _number(fields.get(self.depth_field))
+        material = fields.get(self.material_field)
+        return Contribution(
+            groups=tuple(index_key(fields.get(field_name)) for field_name in self.group_fields),
+            n_value=_number(fields.get(self.n_field)),
+            depth_bin=math.floor(depth / self.depth_bin) if depth is not None else None,
+            material=index_key(material) if material not in (None, "") else None,
+        )
+
+    def _rollup_keys(self, groups: Tuple[Optional[str], ...]) -> List[GroupKey]:
+        # Records with an empty group field only count towards that field's "any" rollups
+        options = [(None,) if value is None else (value, None) for value in groups]
+        return list(itertools.product(*options))
+
+    def _add(self, record: Dict) -> None:
+        contribution = self._contribution(record)
+        self._contributions[record["id"]] = contribution
+        for key in self._rollup_keys(contribution.groups):
+            rollup = self._rollups.get(key)
+            if rollup is None:
+                rollup = self._rollups[key] = Rollup()
+            rollup.add(contribution)
+
+    def _remove(self, record_id: str) -> None:
+        contribution = self._contributions.pop(record_id, None)
+        if contribution is None:
+            return
+        for key in self._rollup_keys(contribution.groups):
+            rollup = self._rollups[key]
+            rollup.remove(contribution)
+            if not rollup.count:
+                del self._rollups[key]
+
+
+def create_spt_aggregates() -> SptAggregates:
+    """SptAggregates configured for Field_SPT from settings."""
+    return SptAggregates(
+        n_field=settings.SPT_N_FIELD,
+        depth_field=settings.SPT_DEPTH_FIELD,
+        depth_bin=settings.SPT_DEPTH_BIN,
+    )
@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from pyairtable import Api
+
+from app.services.replica_store import ReplicaStore
+from app.utils.file_lock import FileLock
+from app.utils.rate_limiter import Priority, request_priority
+
+logger = logging.getLogger("app")
+
+# Overlap applied to the incremental watermark to absorb clock skew between
+# this host and Airtable. Re-fetching a few records twice is harmless.
+WATERMARK_OVERLAP = timedelta(seconds=5)
+WATERMARK_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+
+# Followers further behind than this reload their indexes from SQLite
+CHANGE_LOG_RETENTION_SECONDS = 3600
+
+
+def parse_replica_tables(value: Optional[str]) -> List[Tuple[str, str]]:
+    """Parse ``"base/table,base/table"`` into ``[(base_id, table_name), ...]``."""
+    tables = []
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        base_id, _, table_name = item.partition("/")
+        if not base_id or not table_name:
+            raise ValueError(f"Invalid replica table '{item}', expected 'base_id/table_name'")
+        tables.append((base_id, table_name))
+    return tables
+
+
+def incremental_formula(watermark: str) -> str:
+    return f"IS_AFTER(LAST_MODIFIED_TIME(), DATETIME_PARSE('{watermark}'))"
+
+
+class ReplicaSyncEngine:
+    """
+    Background worker that mirrors Airtable tables into a ReplicaStore.
+
+    The first sync of a table is a full load. Later syncs only fetch records
+    modified since the last watermark. Incremental syncs cannot see deletions,
+    so a table is fully reloaded once its last full load is more than
+    ``full_sync_every`` intervals old. That age is kept in the replica, so a
+    restarted process resumes a persisted replica incrementally.
+
+    When several processes share the replica, only the holder of ``lock``
+    syncs; every process applies the others' writes to its in-memory indexes
+    each ``refresh_seconds``, and takes over syncing if the holder exits.
+    """
+
+    def __init__(
+        self,
+        api: Api,
+        store: ReplicaStore,
+        tables: List[Tuple[str, str]],
+        interval_seconds: float = 30,
+        full_sync_every: int = 20,
+        lock: Optional[FileLock] = None,
+        refresh_seconds: Optional[float] = None,
+    ):
+        self.api = api
+        self.store = store
+        self.tables = tables
+        self.interval_seconds = interval_seconds
+        self.full_sync_every = full_sync_every
+        self.lock = lock
+        self.refresh_seconds = refresh_seconds or interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-sync", daemon=True)
+        self._thread.start()
+        logger.info("Started replica sync for %d table(s)", len(self.tables))
+
+    def stop(self, timeout: float = 10) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def full_sync_due(self, state: Dict[str, Optional[str]]) -> bool:
+        if not state.get("last_full_sync"):
+            return True
+        # Stored as the watermark of the full load, which is set back by the overlap
+        loaded_at = datetime.strptime(state["last_full_sync"], WATERMARK_FORMAT).replace(tzinfo=timezone.utc) + WATERMARK_OVERLAP
+        age = datetime.now(timezone.utc) - loaded_at
+        return age >= timedelta(seconds=self.interval_seconds * self.full_sync_every)
+
+    def sync_all(self) -> None:
+        for base_id, table_name in self.tables:
+            try:
+                full = self.full_sync_due(self.store.get_sync_state(base_id, table_name))
+                self.sync_table(base_id, table_name, full=full)
+            except Exception as e:
+                logger.error("Replica sync failed for %s/%s: %s", base_id, table_name, e)
+
+    def sync_table(self, base_id: str, table_name: str, full: bool = False) -> int:
+        """
+        Bring one table up to date.
+
+        Returns:
+            int: Number of records written to the replica.
+        """
+        state = self.store.get_sync_state(base_id, table_name)
+        started_at = datetime.now(timezone.utc)
+        watermark = (started_at - WATERMARK_OVERLAP).strftime(WATERMARK_FORMAT)
+        table = self.api.table(base_id, table_name)
+
+        if full or not state.get("last_full_sync"):
+            records = table.all()
+            self.store.replace_table(base_id, table_name, records, watermark)
+            logger.info("Full replica sync of %s/%s: %d records", base_id, table_name, len(records))
+            return len(records)
+
+        records = table.all(formula=incremental_formula(state["watermark"]))
+        self.store.upsert_records(base_id, table_name, records, watermark=watermark)
+        logger.debug("Incremental replica sync of %s/%s: %d records", base_id, table_name, len(records))
+        return len(records)
+
+    def _run(self) -> None:
+        # Background syncs yield to interactive reads under the rate limiter
+        request_priority.set(Priority.BULK)
+        next_sync = 0.0
+        while not self._stop.is_set():
+            if (self.lock is None or self.lock.acquire()) and time.monotonic() >= next_sync:
+                self.sync_all()
+                self.store.prune_changes(CHANGE_LOG_RETENTION_SECONDS)
+                next_sync = time.monotonic() + self.interval_seconds
+            try:
+                self.store.refresh()
+            except Exception as e:
+                logger.error("Replica refresh failed: %s", e)
+            self._stop.wait(self.refresh_seconds)
+        if self.lock is not None:
+            self.lock.release()
@@ -0,0 +1,292 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.services.airtable_async_services import AsyncAirtableService
+from app.utils.file_lock import FileLock
+from app.utils.rate_limiter import Priority, request_priority
+
+logger = logging.getLogger("app")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mutations (
+    id TEXT PRIMARY KEY,
+    base_id TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    op TEXT NOT NULL,
+    record_id TEXT,
+    fields TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS mutations_status ON mutations (status);
+"""
+
+COLUMNS = "id, base_id, table_name, op, record_id, fields, status, attempts, error"
+
+
+def _row(row: Tuple) -> Dict:
+    return {
+        "id": row[0],
+        "base_id": row[1],
+        "table_name": row[2],
+        "op": row[3],
+        "record_id": row[4],
+        "fields": json.loads(row[5]) if row[5] is not None else None,
+        "status": row[6],
+        "attempts": row[7],
+        "error": row[8],
+    }
+
+
+class Outbox:
+    """
+    Durable queue of record mutations in SQLite (WAL).
+
+    A mutation is ``pending`` until it has been sent to Airtable, then
+    ``done`` or, after too many attempts, ``failed``. Delivery is at least
+    once: a mutation sent just before a crash is sent again on restart.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def append(self, base_id: str, table_name: str, op: str, fields: Optional[Dict], record_id: Optional[str] = None) -> str:
+        """Store a mutation and return its tracking id once it is committed."""
+        mutation_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO mutations (id, base_id, table_name, op, record_id, fields, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (mutation_id, base_id, table_name, op, record_id, json.dumps(fields) if fields is not None else None, now, now),
+            )
+        return mutation_id
+
+    def get(self, mutation_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {COLUMNS} FROM mutations WHERE id = ?", (mutation_id,)).fetchone()
+        return _row(row) if row is not None else None
+
+    def pending(self, limit: int) -> List[Dict]:
+        """The oldest pending mutations, in submission order."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {COLUMNS} FROM mutations WHERE status = 'pending' ORDER BY rowid LIMIT ?", (limit,)
+            ).fetchall()
+        return [_row(row) for row in rows]
+
+    def complete(self, mutation_ids: List[str], record_id: Optional[str] = None) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE mutations SET status = 'done', record_id = COALESCE(?, record_id), "
+                "attempts = attempts + 1, error = NULL, updated_at = ? WHERE id = ?",
+                [(record_id, time.time(), mutation_id) for mutation_id in mutation_ids],
+            )
+
+    def retry(self, mutation_ids: List[str], error: str, max_attempts: int) -> None:
+        """Record a failed attempt; mutations out of attempts become ``failed``."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE mutations SET attempts = attempts + 1, error = ?, updated_at = ?, "
+                "status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END WHERE id = ?",
+                [(error, time.time(), max_attempts, mutation_id) for mutation_id in mutation_ids],
+            )
+
+    def fail(self, mutation_ids: List[str], error: str) -> None:
+        """Give up on mutations that must not be sent again."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE mutations SET status = 'failed', attempts = attempts + 1, error = ?, updated_at = ? WHERE id = ?",
+                [(error, time.time(), mutation_id) for mutation_id in mutation_ids],
+            )
+
+    def prune(self, older_than_seconds: float) -> int:
+        """Forget settled mutations last updated more than ``older_than_seconds`` ago."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM mutations WHERE status != 'pending' AND updated_at < ?",
+                (time.time() - older_than_seconds,),
+            )
+        return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM mutations GROUP BY status").fetchall()
+        return dict(rows)
+
+
+class WriteBehind:
+    """
+    Acknowledges record creates and updates once they are in the outbox, and
+    sends them to Airtable from a background task.
+
+    Each flush takes up to ``batch_size`` pending mutations, merges
+    successive updates to the same record into one, and sends creates,
+    updates and deletes per table through the service's 10-record batch
+    calls at BULK priority. Mutations whose call fails stay pending and are
+    retried on later flushes, up to ``max_attempts``; a failed create is
+    retried only if it certainly was not applied (throttled, or never sent),
+    and is otherwise marked ``failed`` for the caller to reconcile, since
+    resending it could duplicate the record. Reads see a mutation once it
+    has been flushed.
+
+    Workers sharing an outbox all accept mutations, but only the holder of
+    ``lock`` flushes them, so nothing is sent twice.
+    """
+
+    def __init__(
+        self,
+        service: AsyncAirtableService,
+        outbox: Outbox,
+        interval_seconds: float = 1.0,
+        batch_size: int = 100,
+        max_attempts: int = 5,
+        retention_seconds: float = 86400,
+        lock: Optional[FileLock] = None,
+    ):
+        self.service = service
+        self.outbox = outbox
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self.lock = lock
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop flushing; anything still pending is sent after the next start."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.lock is not None:
+            self.lock.release()
+
+    async def submit(
+        self, base_id: str, table_name: str, op: str, fields: Optional[Dict] = None, record_id: Optional[str] = None
+    ) -> Dict:
+        """Queue a mutation durably and return its status."""
+        mutation_id = await asyncio.to_thread(self.outbox.append, base_id, table_name, op, fields, record_id)
+        self._wakeup.set()
+        return {"tracking_id": mutation_id, "status": "pending", "record_id": record_id, "attempts": 0, "error": None}
+
+    async def status(self, mutation_id: str) -> Optional[Dict]:
+        mutation = await asyncio.to_thread(self.outbox.get, mutation_id)
+        if mutation is None:
+            return None
+        return {
+            "tracking_id": mutation["id"],
+            "status": mutation["status"],
+            "record_id": mutation["record_id"],
+            "attempts": mutation["attempts"],
+            "error": mutation["error"],
+        }
+
+    async def flush(self) -> int:
+        """Send one batch of pending mutations. Returns how many of them were completed."""
+        mutations = await asyncio.to_thread(self.outbox.pending, self.batch_size)
+        tables: Dict[Tuple[str, str], List[Dict]] = {}
+        for mutation in mutations:
+            tables.setdefault((mutation["base_id"], mutation["table_name"]), []).append(mutation)
+        completed = await asyncio.gather(
+            *(self._flush_table(base_id, table_name, items) for (base_id, table_name), items in tables.items())
+        )
+        return sum(completed)
+
+    async def _flush_table(self, base_id: str, table_name: str, mutations: List[Dict]) -> int:
+        creates = [mutation for mutation in mutations if mutation["op"] == "create"]
+        # Successive updates of a record become one update with the latest value of each field
+        updates: Dict[str, Tuple[Dict, List[str]]] = {}
+        deletes: Dict[str, List[str]] = {}
+        for mutation in mutations:
+            if mutation["op"] == "update":
+                fields, ids = updates.setdefault(mutation["record_id"], ({}, []))
+                fields.update(mutation["fields"] or {})
+                ids.append(mutation["id"])
+            elif mutation["op"] == "delete":
+                deletes.setdefault(mutation["record_id"], []).append(mutation["id"])
+
+        completed = 0
+        if creates:
+            results = await self.service.batch_create(base_id, table_name, [m["fields"] or {} for m in creates])
+            completed += await self._settle(results, [[m["id"]] for m in creates], idempotent=False)
+        if updates:
+            results = await self.service.batch_update(
+                base_id, table_name, [{"id": record_id, "fields": fields} for record_id, (fields, _) in updates.items()]
+            )
+            completed += await self._settle(results, [ids for _, ids in updates.values()])
+        if deletes:
+            results = await self.service.batch_delete(base_id, table_name, list(deletes))
+            completed += await self._settle(results, list(deletes.values()))
+        return completed
+
+    async def _settle(self, results: List[Dict], mutation_ids: List[List[str]], idempotent: bool = True) -> int:
+        completed = 0
+        for result in results:
+            ids = mutation_ids[result["index"]]
+            error = result.get("error") or "unknown error"
+            if result["success"]:
+                await asyncio.to_thread(self.outbox.complete, ids, result.get("id"))
+                completed += len(ids)
+            elif idempotent or result.get("not_applied"):
+                logger.warning("Write-behind mutation failed, will retry: %s", error)
+                await asyncio.to_thread(self.outbox.retry, ids, error, self.max_attempts)
+            else:
+                logger.error("Write-behind create failed and may have been applied, not retrying: %s", error)
+                await asyncio.to_thread(self.outbox.fail, ids, error)
+        return completed
+
+    async def _run(self) -> None:
+        # Background writes yield to interactive requests under the rate limiter
+        request_priority.set(Priority.BULK)
+        await asyncio.to_thread(self.outbox.prune, self.retention_seconds)
+        while True:
+            self._wakeup.clear()
+            if self.lock is not None and not self.lock.acquire():
+                # Another worker flushes this outbox; check again in case it exits
+                await asyncio.sleep(self.interval_seconds)
+                continue
+            try:
+                completed = await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Write-behind flush failed: %s", e)
+                completed = 0
+            if completed >= self.batch_size:
+                # A full batch went through, so more is likely waiting; keep draining
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval_seconds)
+            except asyncio.TimeoutError:
+                await asyncio.to_thread(self.outbox.prune, self.retention_seconds)
@@ -0,0 +1,35 @@
+import base64
+import json
+from typing import Dict, Optional
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded, or no longer fits the data it pages."""
+
+
+def encode_cursor(position: Dict) -> str:
+    """Encode a pagination position as an opaque, URL-safe cursor."""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Dict:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Positions are either ``{"offset": <Airtable offset>}`` for pages read from
+    Airtable or ``{"index": <int>}`` for pages sliced from locally held data.
+    An empty cursor means the first page.
+    """
+    if not cursor:
+        return {}
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(position, dict) or not (
+        isinstance(position.get("offset"), str) or isinstance(position.get("index"), int)
+    ):
+        raise InvalidCursorError(f"Invalid cursor: {cursor}")
+    return position
@@ -0,0 +1,242 @@
+import csv
+import io
+import json
+import logging
+import re
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Set, Tuple
+from fastapi.responses import StreamingResponse
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # Arrow and Parquet export are optional; CSV always works
+    pyarrow = None
+
+logger = logging.getLogger("app")
+
+# format: (media type, file extension)
+EXPORT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Records read ahead to infer the column schema before anything is sent
+SCHEMA_SAMPLE_ROWS = 1_000
+# Rows per Arrow record batch / Parquet row group; bounds memory per export
+BATCH_ROWS = 10_000
+
+RECORD_COLUMNS = ("id", "created_time")
+
+
+class Column(NamedTuple):
+    name: str
+    # "string", "number" or "bool"
+    kind: str
+
+
+def format_available(export_format: str) -> bool:
+    return export_format == "csv" or pyarrow is not None
+
+
+def _kind(value) -> str:
+    if type(value) is bool:
+        return "bool"
+    if type(value) in (int, float):
+        return "number"
+    return "string"
+
+
+def infer_columns(records: List[Dict], fields: Optional[List[str]] = None) -> List[Column]:
+    """
+    Columns for ``records``: the record id and creation time, then each field
+    in ``fields`` order, or in order of first appearance.
+
+    A field whose values are all numbers (or all booleans) gets that kind;
+    anything else, including lists and objects, is a string column.
+    """
+    names = list(fields or ())
+    kinds: Dict[str, Set[str]] = {name: set() for name in names}
+    for record in records:
+        for name, value in record.get("fields", {}).items():
+            if name not in kinds:
+                if fields:
+                    continue
+                names.append(name)
+                kinds[name] = set()
+            if value is not None:
+                kinds[name].add(_kind(value))
+    columns = [Column(name, "string") for name in RECORD_COLUMNS]
+    for name in names:
+        seen = kinds[name]
+        columns.append(Column(name, seen.pop() if len(seen) == 1 else "string"))
+    return columns
+
+
+def cell(value, kind: str):
+    """
+    Convert a field value for a column of ``kind``. Values that do not fit a
+    number or bool column are left empty; lists and objects are written as
+    JSON text.
+    """
+    if value is None:
+        return None
+    if kind != "string":
+        return value if _kind(value) == kind else None
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _values(record: Dict, columns: List[Column]) -> list:
+    fields = record.get("fields", {})
+    return [
+        record.get("id"),
+        record.get("createdTime", record.get("created_time")),
+        *(cell(fields.get(column.name), column.kind) for column in columns[len(RECORD_COLUMNS):]),
+    ]
+
+
+async def _pages(first_pages: List[List[Dict]], pages: AsyncIterator[List[Dict]]) -> AsyncIterator[List[Dict]]:
+    for page in first_pages:
+        yield page
+    try:
+        async for page in pages:
+            yield page
+    except Exception as e:
+        # Headers are already sent; re-raising aborts the response instead of
+        # ending it cleanly, so clients can tell the export is incomplete. The
+        # Arrow/Parquet writers are never closed, so no valid footer is written.
+        logger.error("Error while exporting records: %s", e)
+        raise
+
+
+def _report_dropped(dropped: Set[str]) -> None:
+    if dropped:
+        logger.warning("Export left out fields first seen after the schema sample: %s", ", ".join(sorted(dropped)))
+
+
+async def _csv_chunks(pages: AsyncIterator[List[Dict]], columns: List[Column], fields: Optional[List[str]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(column.name for column in columns)
+    known = {column.name for column in columns}
+    dropped: Set[str] = set()
+    async for page in pages:
+        for record in page:
+            if not fields:
+                dropped.update(record.get("fields", {}).keys() - known)
+            writer.writerow(_values(record, columns))
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    _report_dropped(dropped)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last drain."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        chunk = b"".join(self._chunks)
+        self._chunks.clear()
+        return chunk
+
+
+ARROW_TYPES = {"string": "string", "number": "float64", "bool": "bool_"}
+
+
+def arrow_schema(columns: List[Column]):
+    return pyarrow.schema([(column.name, getattr(pyarrow, ARROW_TYPES[column.kind])()) for column in columns])
+
+
+def _record_batch(rows: List[list], schema):
+    arrays = [
+        pyarrow.array([row[position] for row in rows], type=field.type)
+        for position, field in enumerate(schema)
+    ]
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+async def _columnar_chunks(
+    pages: AsyncIterator[List[Dict]], columns: List[Column], fields: Optional[List[str]], export_format: str
+) -> AsyncIterator[bytes]:
+    schema = arrow_schema(columns)
+    sink = _ChunkSink()
+    if export_format == "parquet":
+        writer = pyarrow.parquet.ParquetWriter(sink, schema)
+        write = lambda batch: writer.write_batch(batch, row_group_size=BATCH_ROWS)
+    else:
+        writer = pyarrow.ipc.new_stream(sink, schema)
+        write = writer.write_batch
+    known = {column.name for column in columns}
+    dropped: Set[str] = set()
+    rows: List[list] = []
+    async for page in pages:
+        for record in page:
+            if not fields:
+                dropped.update(record.get("fields", {}).keys() - known)
+            rows.append(_values(record, columns))
+        if len(rows) >= BATCH_ROWS:
+            write(_record_batch(rows, schema))
+            rows = []
+            yield sink.drain()
+    if rows:
+        write(_record_batch(rows, schema))
+    writer.close()
+    yield sink.drain()
+    _report_dropped(dropped)
+
+
+def _filename(table_name: str, extension: str) -> str:
+    return re.sub(r"[^\w.-]", "_", table_name) + "." + extension
+
+
+async def export_response(
+    pages: AsyncIterator[List[Dict]], export_format: str, table_name: str, fields: Optional[List[str]] = None
+) -> StreamingResponse:
+    """
+    Stream pages of records as a CSV, Arrow IPC stream or Parquet file.
+
+    The column schema is inferred from the first ``SCHEMA_SAMPLE_ROWS``
+    records, which are read before the response starts (so upstream errors
+    still get a proper status code). Fields first seen after that are left
+    out; pass ``fields`` to fix the columns. Pages are converted as they
+    arrive, so at most one batch of rows is held in memory. An error on a
+    later page aborts the response.
+    """
+    sample: List[List[Dict]] = []
+    sampled = 0
+    async for page in pages:
+        sample.append(page)
+        sampled += len(page)
+        if sampled >= SCHEMA_SAMPLE_ROWS:
+            break
+    columns = infer_columns([record for page in sample for record in page], fields)
+    media_type, extension = EXPORT_FORMATS[export_format]
+    if export_format == "csv":
+        chunks = _csv_chunks(_pages(sample, pages), columns, fields)
+    else:
+        chunks = _columnar_chunks(_pages(sample, pages), columns, fields, export_format)
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{_filename(table_name, extension)}"'},
+    )
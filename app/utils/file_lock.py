@@ -0,0 +1,55 @@
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; every process then acts alone
+    fcntl = None
+
+logger = logging.getLogger("app")
+
+
+class FileLock:
+    """
+    Non-blocking exclusive lock on a file, held by at most one process on
+    the host. Used to pick the one worker that runs a background job.
+
+    The operating system releases the lock when its holder exits, so another
+    process takes over on its next ``acquire``.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """Take the lock if it is free. Returns whether this process holds it."""
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            self._fd = -1
+            return True
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        logger.info("Acquired %s (pid %d)", self.path, os.getpid())
+        return True
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        if self._fd >= 0:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._fd = None
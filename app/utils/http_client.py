@@ -1,5 +1,118 @@
-import requests
+import httpx
 import logging
-from pathlib import Path
+import requests
+from typing import Dict, Optional
+from app.core.settings import settings
+from app.utils.metrics import observe_upstream
+from app.utils.rate_limiter import RateLimitedAdapter, RateLimitedTransport, RateLimiter
+
+logger = logging.getLogger("app")
+
+
+def create_rate_limiter() -> RateLimiter:
+    return RateLimiter(
+        rate=settings.AIRTABLE_RATE_LIMIT_PER_SECOND,
+        burst=settings.AIRTABLE_RATE_LIMIT_BURST,
+        deadline_seconds=settings.AIRTABLE_REQUEST_DEADLINE_SECONDS,
+    )
+
+
+def retry_options() -> Dict[str, float]:
+    return {
+        "max_retries": settings.AIRTABLE_MAX_RETRIES,
+        "retry_base_seconds": settings.AIRTABLE_RETRY_BASE_SECONDS,
+        "retry_max_seconds": settings.AIRTABLE_RETRY_MAX_SECONDS,
+    }
+
+
+def create_async_client(
+    api_key: str,
+    base_url: Optional[str] = None,
+    limiter: Optional[RateLimiter] = None,
+) -> httpx.AsyncClient:
+    """
+    Create a pooled, keep-alive AsyncClient authenticated against the Airtable API.
+
+    With a ``limiter``, every request is scheduled through it and throttled
+    or failed requests are retried with backoff.
+    """
+    transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    )
+    if limiter is not None:
+        transport = RateLimitedTransport(transport, limiter, **retry_options())
+    return httpx.AsyncClient(
+        base_url=base_url or settings.AIRTABLE_API_URL,
+        headers={"Authorization": f"Bearer {api_key}"},
+        transport=transport,
+        timeout=settings.HTTP_TIMEOUT_SECONDS,
+    )
+
+
+def mount_rate_limiter(session: requests.Session, limiter: RateLimiter) -> None:
+    """Route every request made through ``session`` via ``limiter``."""
+    adapter = RateLimitedAdapter(limiter, **retry_options())
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+def instrument_session(session: requests.Session) -> None:
+    """Record the latency and size of every Airtable call made through ``session``."""
+    def record(response: requests.Response, *args, **kwargs) -> None:
+        observe_upstream(
+            response.request.method, response.status_code, response.elapsed.total_seconds(), len(response.content)
+        )
+
+    session.hooks["response"].append(record)
+
+
+class PoolStats:
+    """
+    Counts requests and newly opened connections on an AsyncClient.
+
+    Pass ``trace`` as the ``"trace"`` request extension; httpcore reports a
+    ``connection.connect_tcp`` event only when a request cannot reuse a
+    pooled connection.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+
+    async def trace(self, event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+        elif event_name.endswith("send_request_headers.started"):
+            self.requests += 1
+
+    def snapshot(self) -> Dict[str, float]:
+        return reuse_stats(self.requests, self.connections_opened)
+
+
+def session_pool_stats(session: requests.Session) -> Dict[str, float]:
+    """Aggregate urllib3 connection pool counters for a requests Session."""
+    total_pools = 0
+    total_requests = 0
+    total_connections = 0
+    # One adapter can be mounted on several prefixes; count its pools once
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+    for adapter in adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            total_pools += 1
+            total_requests += pool.num_requests
+            total_connections += pool.num_connections
+    return {"pools": total_pools, **reuse_stats(total_requests, total_connections)}
+
 
-# This file can be removed or updated if it contains other utility functions.
+def reuse_stats(request_count: int, connection_count: int) -> Dict[str, float]:
+    reuse_rate = 1 - connection_count / request_count if request_count else 0.0
+    return {
+        "requests": request_count,
+        "connections_opened": connection_count,
+        "reuse_rate": round(max(reuse_rate, 0.0), 4),
+    }
@@ -0,0 +1,239 @@
+import bisect
+import functools
+import inspect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from cache hits up to slow multi-page reads
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Sample = Tuple[str, Dict[str, str], float]
+
+# Phase timings (seconds) of the request being handled; set by MetricsMiddleware
+request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def add_timing(name: str, seconds: float) -> None:
+    """Add ``seconds`` to the named phase of the current request, if one is being timed."""
+    timings = request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def format_metric(name: str, kind: str, help_text: str, samples: Iterable[Sample]) -> List[str]:
+    """Render one metric family in the Prometheus text exposition format."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for suffix, labels, value in samples:
+        label_text = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+        lines.append(f"{name}{suffix}{{{label_text}}} {_format_value(value)}" if label_text
+                     else f"{name}{suffix} {_format_value(value)}")
+    return lines
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return format_metric(self.name, self.kind, self.help, self.samples())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        return [("", dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._values: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, **labels: Any) -> int:
+        state = self._values.get(self._key(labels))
+        return sum(state[0]) if state else 0
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        samples: List[Sample] = []
+        for key, counts, total in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append(("_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append(("_sum", labels, total))
+            samples.append(("_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """In-process metric families rendered on demand for the ``/metrics`` endpoint."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(
+        self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def _register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> List[str]:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return lines
+
+
+registry = MetricsRegistry()
+
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Time to handle an API request.", ("method", "route", "status")
+)
+REQUEST_PHASE_DURATION = registry.histogram(
+    "http_request_phase_seconds",
+    "Time spent per request phase (endpoint, airtable, validate, encode).",
+    ("route", "phase"),
+)
+RESPONSE_BYTES = registry.counter("http_response_bytes_total", "Response body bytes sent.", ("route",))
+SERVICE_CALL_DURATION = registry.histogram(
+    "airtable_service_call_duration_seconds",
+    "Duration of Airtable service methods, including cache and replica hits.",
+    ("service", "operation", "outcome"),
+)
+SERVICE_RECORDS = registry.counter(
+    "airtable_service_records_total", "Records returned by Airtable service methods.", ("service", "operation")
+)
+UPSTREAM_DURATION = registry.histogram(
+    "airtable_upstream_duration_seconds", "Duration of calls to the Airtable API.", ("method", "status")
+)
+UPSTREAM_BYTES = registry.counter(
+    "airtable_upstream_response_bytes_total", "Response body bytes received from Airtable.", ("method",)
+)
+
+
+def observe_upstream(method: str, status: Any, seconds: float, nbytes: int = 0) -> None:
+    """Record one Airtable API round-trip."""
+    UPSTREAM_DURATION.observe(seconds, method=method, status=status)
+    UPSTREAM_BYTES.inc(nbytes, method=method)
+    add_timing("airtable", seconds)
+    add_timing("airtable_calls", 1)
+
+
+def record_count(result: Any) -> int:
+    """Number of records in a service method's result."""
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple) and result and isinstance(result[0], list):
+        return len(result[0])
+    if isinstance(result, dict) and "fields" in result:
+        return 1
+    return 0
+
+
+def timed(operation: str) -> Callable:
+    """
+    Decorate an Airtable service method to record its duration, outcome and
+    the number of records it returned. Works for sync and async methods.
+    """
+    def decorator(fn: Callable) -> Callable:
+        def observe(service: Any, started: float, outcome: str, result: Any = None) -> None:
+            name = type(service).__name__
+            SERVICE_CALL_DURATION.observe(
+                time.perf_counter() - started, service=name, operation=operation, outcome=outcome
+            )
+            if result is not None:
+                SERVICE_RECORDS.inc(record_count(result), service=name, operation=operation)
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(self, *args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    result = await fn(self, *args, **kwargs)
+                except Exception:
+                    observe(self, started, "error")
+                    raise
+                observe(self, started, "ok", result)
+                return result
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = fn(self, *args, **kwargs)
+            except Exception:
+                observe(self, started, "error")
+                raise
+            observe(self, started, "ok", result)
+            return result
+        return wrapper
+
+    return decorator
@@ -0,0 +1,316 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("app")
+
+# Upstream statuses worth retrying: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# A 429 means the request was rejected unprocessed, so any method can be resent.
+# A server error may come after the write was committed, so only methods that
+# are safe to repeat are retried on those; resending a create would duplicate it.
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "PATCH", "DELETE"}
+
+
+def should_retry(method: str, status_code: int) -> bool:
+    if status_code == 429:
+        return True
+    return status_code in RETRY_STATUSES and method.upper() in IDEMPOTENT_METHODS
+
+
+class Priority(IntEnum):
+    """Lower values are served first."""
+    INTERACTIVE = 0
+    BULK = 1
+
+
+# Priority of Airtable calls made from the current task or thread
+request_priority: ContextVar[Priority] = ContextVar("request_priority", default=Priority.INTERACTIVE)
+
+
+@contextmanager
+def priority(value: Priority) -> Iterator[None]:
+    """Run the enclosed Airtable calls at the given priority."""
+    token = request_priority.set(value)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a queued Airtable call cannot start before its deadline."""
+
+
+def was_not_applied(error: Exception) -> bool:
+    """
+    Whether a failed call certainly had no effect upstream, so a create can
+    be sent again without risking a duplicate: it was throttled, or it never
+    left the rate limiter's queue.
+    """
+    if isinstance(error, RateLimitTimeout):
+        return True
+    return isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429
+
+
+def base_id_from_path(path: str) -> str:
+    """Extract the Airtable base ID (``app...``) from a request path."""
+    return next((segment for segment in path.split("/") if segment.startswith("app")), "")
+
+
+def retry_delay(attempt: int, base_seconds: float, max_seconds: float) -> float:
+    """Exponential backoff with jitter: half the delay is fixed, half is random."""
+    delay = min(max_seconds, base_seconds * 2 ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class _Waiter:
+    __slots__ = ("priority", "cancelled")
+
+    def __init__(self, priority: Priority):
+        self.priority = priority
+        self.cancelled = False
+
+
+class _Bucket:
+    def __init__(self, burst: float):
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.queue: List = []
+        # Counters for this base; the limiter also keeps totals
+        self.acquired = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.retries: Dict[int, int] = {}
+
+
+class RateLimiter:
+    """
+    Per-base token bucket scheduler shared by every Airtable call.
+
+    Calls queue by priority (interactive reads before bulk writes), then in
+    arrival order, and only the head of a base's queue may take a token.
+    A call whose expected wait already exceeds its deadline fails straight
+    away with RateLimitTimeout instead of joining the queue.
+
+    The limiter is thread-safe and serves both blocking (``acquire``) and
+    asyncio (``acquire_async``) callers from the same buckets, so sync and
+    async services share one budget per base.
+    """
+
+    def __init__(self, rate: float = 5, burst: float = 5, deadline_seconds: float = 15):
+        self.rate = rate
+        self.burst = burst
+        self.deadline_seconds = deadline_seconds
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self.acquired = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.retries: Dict[int, int] = {}
+
+    def deadline(self) -> float:
+        return time.monotonic() + self.deadline_seconds
+
+    def acquire(self, base_id: str, priority: Optional[Priority] = None, deadline: Optional[float] = None) -> None:
+        """Block the calling thread until a token for ``base_id`` is available."""
+        started = time.monotonic()
+        waiter = self._enqueue(base_id, priority, deadline, started)
+        while True:
+            wait = self._try_take(base_id, waiter, deadline, started)
+            if wait == 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(
+        self, base_id: str, priority: Optional[Priority] = None, deadline: Optional[float] = None
+    ) -> None:
+        """Wait without blocking the event loop until a token for ``base_id`` is available."""
+        started = time.monotonic()
+        waiter = self._enqueue(base_id, priority, deadline, started)
+        try:
+            while True:
+                wait = self._try_take(base_id, waiter, deadline, started)
+                if wait == 0:
+                    return
+                await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            waiter.cancelled = True
+            raise
+
+    def record_retry(self, base_id: str, status_code: int) -> None:
+        with self._lock:
+            self.retries[status_code] = self.retries.get(status_code, 0) + 1
+            bucket = self._buckets.setdefault(base_id, _Bucket(self.burst))
+            bucket.retries[status_code] = bucket.retries.get(status_code, 0) + 1
+
+    def stats(self) -> Dict:
+        """Totals across bases, and the same figures for each base under ``bases``."""
+        with self._lock:
+            bases = {
+                base_id: {
+                    "queue_depth": sum(1 for *_, waiter in bucket.queue if not waiter.cancelled),
+                    "acquired": bucket.acquired,
+                    "timeouts": bucket.timeouts,
+                    "wait_seconds_total": round(bucket.wait_seconds_total, 4),
+                    "wait_seconds_max": round(bucket.wait_seconds_max, 4),
+                    "retries": dict(bucket.retries),
+                }
+                for base_id, bucket in self._buckets.items()
+            }
+            return {
+                "queue_depth": {base_id: base["queue_depth"] for base_id, base in bases.items()},
+                "acquired": self.acquired,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 4),
+                "wait_seconds_max": round(self.wait_seconds_max, 4),
+                "retries": dict(self.retries),
+                "bases": bases,
+            }
+
+    def _enqueue(
+        self, base_id: str, priority: Optional[Priority], deadline: Optional[float], now: float
+    ) -> _Waiter:
+        waiter = _Waiter(request_priority.get() if priority is None else priority)
+        with self._lock:
+            bucket = self._buckets.setdefault(base_id, _Bucket(self.burst))
+            self._refill(bucket, now)
+            ahead = sum(
+                1 for p, _, queued in bucket.queue if p <= waiter.priority and not queued.cancelled
+            )
+            expected_wait = max(0.0, (ahead + 1 - bucket.tokens) / self.rate)
+            if deadline is not None and now + expected_wait > deadline:
+                self.timeouts += 1
+                bucket.timeouts += 1
+                raise RateLimitTimeout(
+                    f"Airtable rate limit for base {base_id}: {ahead} calls queued, "
+                    f"expected wait {expected_wait:.1f}s exceeds deadline"
+                )
+            heapq.heappush(bucket.queue, (waiter.priority, next(self._sequence), waiter))
+        return waiter
+
+    def _try_take(self, base_id: str, waiter: _Waiter, deadline: Optional[float], started: float) -> float:
+        """Take a token if ``waiter`` is at the head of the queue; otherwise return how long to wait."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets[base_id]
+            self._refill(bucket, now)
+            while bucket.queue and bucket.queue[0][2].cancelled:
+                heapq.heappop(bucket.queue)
+            is_head = bool(bucket.queue) and bucket.queue[0][2] is waiter
+            if is_head and bucket.tokens >= 1:
+                heapq.heappop(bucket.queue)
+                bucket.tokens -= 1
+                waited = now - started
+                self.acquired += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+                bucket.acquired += 1
+                bucket.wait_seconds_total += waited
+                bucket.wait_seconds_max = max(bucket.wait_seconds_max, waited)
+                return 0
+            if deadline is not None and now >= deadline:
+                waiter.cancelled = True
+                self.timeouts += 1
+                bucket.timeouts += 1
+                raise RateLimitTimeout(f"Airtable rate limit for base {base_id}: deadline exceeded while queued")
+            wait = (1 - bucket.tokens) / self.rate if bucket.tokens < 1 else 0.005
+            if deadline is not None:
+                wait = min(wait, max(deadline - now, 0.001))
+            return max(wait, 0.001)
+
+    def _refill(self, bucket: _Bucket, now: float) -> None:
+        bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+        bucket.updated = now
+
+
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that schedules every request through a RateLimiter and
+    retries throttled or failed requests with jittered exponential backoff.
+    Creates (POST) are only retried when throttled; see ``should_retry``.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        limiter: RateLimiter,
+        max_retries: int = 4,
+        retry_base_seconds: float = 0.5,
+        retry_max_seconds: float = 30,
+    ):
+        self.transport = transport
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        base_id = base_id_from_path(request.url.path)
+        deadline = self.limiter.deadline()
+        attempt = 0
+        while True:
+            await self.limiter.acquire_async(base_id, deadline=deadline)
+            response = await self.transport.handle_async_request(request)
+            if not should_retry(request.method, response.status_code) or attempt >= self.max_retries:
+                return response
+            delay = retry_delay(attempt, self.retry_base_seconds, self.retry_max_seconds)
+            if time.monotonic() + delay > deadline:
+                return response
+            await response.aclose()
+            self.limiter.record_retry(base_id, response.status_code)
+            logger.warning("Airtable returned %d, retrying in %.2fs", response.status_code, delay)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """requests adapter with the same scheduling and retry behaviour as RateLimitedTransport."""
+
+    def __init__(
+        self,
+        limiter: RateLimiter,
+        max_retries: int = 4,
+        retry_base_seconds: float = 0.5,
+        retry_max_seconds: float = 30,
+    ):
+        super().__init__()
+        self.limiter = limiter
+        self.retry_count = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+
+    def send(self, request, **kwargs):
+        base_id = base_id_from_path(request.path_url.split("?", 1)[0])
+        deadline = self.limiter.deadline()
+        attempt = 0
+        while True:
+            self.limiter.acquire(base_id, deadline=deadline)
+            response = super().send(request, **kwargs)
+            if not should_retry(request.method, response.status_code) or attempt >= self.retry_count:
+                return response
+            delay = retry_delay(attempt, self.retry_base_seconds, self.retry_max_seconds)
+            if time.monotonic() + delay > deadline:
+                return response
+            response.close()
+            self.limiter.record_retry(base_id, response.status_code)
+            logger.warning("Airtable returned %d, retrying in %.2fs", response.status_code, delay)
+            attempt += 1
+            time.sleep(delay)
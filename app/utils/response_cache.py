@@ -0,0 +1,159 @@
+import gzip
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always offered
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the serialized body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def coding_etag(etag: str, coding: Optional[str]) -> str:
+    """
+    The ETag of ``etag``'s body sent with content-coding ``coding``. Strong
+    validators must differ between codings, so each one gets a suffix.
+    """
+    return etag if coding is None else etag[:-1] + "-" + coding + '"'
+
+
+def etag_matches(if_none_match: Optional[str], *etags: str) -> bool:
+    """Whether an ``If-None-Match`` header value matches any of ``etags`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") in etags:
+            return True
+    return False
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> Tuple[str, ...]:
+    """Content codings the client accepts (ignoring ``q=0``), lower-cased."""
+    accepted = []
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.lower().partition(";")
+        name, _, quality = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                if float(quality) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding.strip():
+            accepted.append(coding.strip())
+    return tuple(accepted)
+
+
+class CachedBody:
+    """A serialized JSON body with its ETag and lazily built compressed variants."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = make_etag(body)
+        self._encoded: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(encoded) for encoded in self._encoded.values())
+
+    def encoded(self, coding: str) -> bytes:
+        """Return the body compressed with ``coding``, compressing it only once."""
+        with self._lock:
+            encoded = self._encoded.get(coding)
+            if encoded is None:
+                if coding == "br":
+                    encoded = brotli.compress(self.body, quality=5)
+                else:
+                    encoded = gzip.compress(self.body, compresslevel=6, mtime=0)
+                self._encoded[coding] = encoded
+            return encoded
+
+    def respond(self, request_headers: Headers, cache_control: str) -> Response:
+        """
+        Build the response for a request: 304 when the client already holds
+        this body, otherwise the body in the best encoding the client accepts.
+        """
+        coding = None
+        if len(self.body) >= MIN_COMPRESS_BYTES:
+            accepted = accepted_encodings(request_headers.get("accept-encoding"))
+            coding = "br" if brotli is not None and "br" in accepted else "gzip" if "gzip" in accepted else None
+        headers = {"ETag": coding_etag(self.etag, coding), "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        # Any coding's tag validates: they all carry the same data
+        variants = (self.etag, *(coding_etag(self.etag, name) for name in ("gzip", "br")))
+        if etag_matches(request_headers.get("if-none-match"), *variants):
+            return Response(status_code=304, headers=headers)
+        if coding is None:
+            return Response(self.body, media_type="application/json", headers=headers)
+        headers["Content-Encoding"] = coding
+        return Response(self.encoded(coding), media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """
+    LRU cache of serialized responses keyed by request and data version.
+
+    An entry is reused only while the data it was built from is unchanged
+    (same ``version``) and younger than ``ttl_seconds``, so unchanged tables
+    are served, revalidated and compressed without re-serializing. The cache
+    holds at most ``max_bytes`` of bodies, counting compressed variants.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_bytes: int = 256 * 1024 * 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[float, Hashable, CachedBody]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_bytes > 0
+
+    def get(self, key: Hashable, version: Optional[Hashable]) -> Optional[CachedBody]:
+        if not self.enabled or version is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] != version or entry[0] <= time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key: Hashable, version: Optional[Hashable], body: bytes) -> CachedBody:
+        """Wrap ``body`` for responding, and keep it if ``version`` makes it reusable."""
+        cached = CachedBody(body)
+        if not self.enabled or version is None:
+            return cached
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, version, cached)
+            self._entries.move_to_end(key)
+            total = sum(entry[2].size for entry in self._entries.values())
+            while total > self.max_bytes and len(self._entries) > 1:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                total -= evicted.size
+        return cached
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
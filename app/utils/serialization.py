@@ -0,0 +1,64 @@
+import json
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson is a speed-up only; stdlib json gives the same bytes
+    orjson = None
+
+
+def _has_divergent_float(value: Any) -> bool:
+    """
+    True if ``value`` holds a float that orjson formats differently from
+    json.dumps. json.dumps switches to exponent notation outside
+    [1e-4, 1e16) and orjson does not agree with it there (1e16 vs 1e+16,
+    0.0000225 vs 2.25e-05). NaN and infinity are included, because json.dumps
+    rejects them while orjson writes null.
+    """
+    value_type = type(value)
+    if value_type is dict:
+        for item in value.values():
+            if _has_divergent_float(item):
+                return True
+    elif value_type is list or value_type is tuple:
+        for item in value:
+            if _has_divergent_float(item):
+                return True
+    elif value_type is float and value and not 1e-4 <= abs(value) < 1e16:
+        return True
+    return False
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode ``content`` to exactly the bytes ``JSONResponse`` produces, using
+    orjson where it is available and agrees with json.dumps.
+    """
+    if orjson is not None and not _has_divergent_float(content):
+        try:
+            return orjson.dumps(content)
+        except TypeError:
+            # e.g. integers wider than 64 bits or non-string keys
+            pass
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def shape_record(record: Dict) -> Dict:
+    """Shape an Airtable record the way the AirtableRecord schema serializes it."""
+    return {
+        "id": record.get("id"),
+        "fields": record.get("fields", {}),
+        "created_time": record.get("created_time"),
+    }
+
+
+def shape_page(records: List[Dict], next_cursor: Optional[str] = None) -> Dict:
+    """
+    Shape records the way ``AirtableTablePage`` serializes them.
+
+    Records from the service layer already have the schema's shape, so list
+    endpoints return this directly instead of validating every record.
+    """
+    return {"records": [shape_record(record) for record in records], "next_cursor": next_cursor}
@@ -0,0 +1,143 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.serialization import dumps
+from app.utils.table_cache import CacheKey
+
+try:
+    import orjson
+except ImportError:  # orjson only speeds up decoding
+    orjson = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    key TEXT PRIMARY KEY,
+    base_id TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    body BLOB NOT NULL,
+    refreshing_until REAL
+);
+CREATE INDEX IF NOT EXISTS snapshots_table ON snapshots (base_id, table_name);
+CREATE TABLE IF NOT EXISTS table_versions (
+    base_id TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (base_id, table_name)
+);
+"""
+
+
+def _loads(body: bytes) -> List[Dict]:
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+class SnapshotStore:
+    """
+    Serialized table reads in a SQLite (WAL) file shared by every worker
+    process on a host, and kept across restarts.
+
+    It is the second tier behind each worker's TableCache: a read one worker
+    fetched from Airtable can be served by the others, and a newly started
+    worker has warm data before its first upstream call. Reads go through
+    the operating system's page cache, which the processes share.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _key(key: CacheKey) -> str:
+        return json.dumps(key)
+
+    def get(self, key: CacheKey) -> Optional[Tuple[float, List[Dict]]]:
+        """The stored records for a read and their age in seconds, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stored_at, body FROM snapshots WHERE key = ?", (self._key(key),)
+            ).fetchone()
+        if row is None:
+            return None
+        return time.time() - row[0], _loads(row[1])
+
+    def version(self, base_id: str, table_name: str) -> int:
+        """
+        Count of invalidations of a table, shared by every process. Take it
+        before an upstream read and pass it to ``put``.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM table_versions WHERE base_id = ? AND table_name = ?", (base_id, table_name)
+            ).fetchone()
+        return row[0] if row is not None else 0
+
+    def put(self, key: CacheKey, records: List[Dict], version: Optional[int] = None) -> bool:
+        """
+        Store a read. With ``version``, the read is dropped if the table was
+        invalidated since, by this or any other process, so a read that raced
+        a write is never shared. Returns whether the read was stored.
+        """
+        body = dumps(records)
+        params = (self._key(key), key[0], key[1], time.time(), body)
+        with self._lock, self._conn:
+            if version is None:
+                cursor = self._conn.execute(
+                    "INSERT OR REPLACE INTO snapshots (key, base_id, table_name, stored_at, body) VALUES (?, ?, ?, ?, ?)",
+                    params,
+                )
+            else:
+                # One statement, so the check and the insert are atomic across processes
+                cursor = self._conn.execute(
+                    "INSERT OR REPLACE INTO snapshots (key, base_id, table_name, stored_at, body) "
+                    "SELECT ?, ?, ?, ?, ? WHERE COALESCE("
+                    "(SELECT version FROM table_versions WHERE base_id = ? AND table_name = ?), 0) = ?",
+                    (*params, key[0], key[1], version),
+                )
+        return cursor.rowcount == 1
+
+    def claim_refresh(self, key: CacheKey, lease_seconds: float) -> bool:
+        """
+        Claim the refresh of a stored read for ``lease_seconds``. Only one
+        process gets the claim, so a stale snapshot is refetched once per host.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE snapshots SET refreshing_until = ? WHERE key = ? "
+                "AND (refreshing_until IS NULL OR refreshing_until < ?)",
+                (now + lease_seconds, self._key(key), now),
+            )
+        return cursor.rowcount == 1
+
+    def invalidate_table(self, base_id: str, table_name: str) -> None:
+        """Drop every stored read of a table, and any read of it still in flight."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM snapshots WHERE base_id = ? AND table_name = ?", (base_id, table_name))
+            self._conn.execute(
+                "INSERT INTO table_versions (base_id, table_name, version) VALUES (?, ?, 1) "
+                "ON CONFLICT (base_id, table_name) DO UPDATE SET version = version + 1",
+                (base_id, table_name),
+            )
+
+    def prune(self, older_than_seconds: float) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM snapshots WHERE stored_at < ?", (time.time() - older_than_seconds,)
+            )
+        return cursor.rowcount
@@ -0,0 +1,70 @@
+import json
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from fastapi.responses import StreamingResponse
+from app.utils.serialization import dumps, shape_record
+
+logger = logging.getLogger("app")
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+async def _ndjson_lines(first_page: List[Dict], pages: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+    page = first_page
+    while True:
+        yield "".join(json.dumps(shape_record(record), ensure_ascii=False) + "\n" for record in page).encode()
+        try:
+            page = await pages.__anext__()
+        except StopAsyncIteration:
+            return
+        except Exception as e:
+            # Headers are already sent; re-raising aborts the response instead
+            # of ending it cleanly, so clients can tell the stream is incomplete
+            logger.error("Error while streaming records: %s", e)
+            raise
+
+
+async def ndjson_response(pages: AsyncIterator[List[Dict]]) -> StreamingResponse:
+    """
+    Stream pages of records as NDJSON, one record per line.
+
+    The first page is fetched before the response starts so upstream errors
+    can still be reported with a proper status code. An error on a later page
+    aborts the response.
+    """
+    try:
+        first_page = await pages.__anext__()
+    except StopAsyncIteration:
+        first_page = []
+    return StreamingResponse(_ndjson_lines(first_page, pages), media_type=NDJSON_MEDIA_TYPE)
+
+
+def format_sse(event: str, data: Dict, event_id: Optional[int] = None) -> bytes:
+    """Encode one server-sent event with a JSON payload."""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\ndata: ".encode() + dumps(data) + b"\n\n"
+
+
+async def _sse_lines(events: AsyncIterator[Optional[Tuple[str, Dict]]]) -> AsyncIterator[bytes]:
+    event_id = 0
+    async for event in events:
+        if event is None:
+            # Comment line; keeps idle connections open through proxies
+            yield b": keep-alive\n\n"
+            continue
+        event_id += 1
+        yield format_sse(*event, event_id=event_id)
+
+
+def sse_response(events: AsyncIterator[Optional[Tuple[str, Dict]]]) -> StreamingResponse:
+    """
+    Stream ``(event, payload)`` pairs as server-sent events. A None item is
+    sent as a keep-alive comment.
+    """
+    return StreamingResponse(
+        _sse_lines(events),
+        media_type=SSE_MEDIA_TYPE,
+        # Stop reverse proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
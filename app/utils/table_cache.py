@@ -0,0 +1,177 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+# Source of table generations; shared by every cache so that generations from
+# different cache instances never coincide
+_generations = itertools.count(1)
+
+# (base_id, table_name, formula, sort, fields)
+CacheKey = Tuple[str, str, Optional[str], Tuple[str, ...], Tuple[str, ...]]
+
+
+def make_cache_key(
+    base_id: str,
+    table_name: str,
+    formula: Optional[str] = None,
+    sort: Optional[List[str]] = None,
+    fields: Optional[List[str]] = None,
+) -> CacheKey:
+    """Build the cache key for a table read."""
+    return (base_id, table_name, formula, tuple(sort or ()), tuple(fields or ()))
+
+
+class TableCache:
+    """
+    Thread-safe read-through cache for Airtable table reads.
+
+    Entries expire after ``ttl_seconds`` and the least recently used entry is
+    evicted once ``max_entries`` is reached. A ``ttl_seconds`` of 0 disables
+    caching entirely.
+
+    Cached record lists are never mutated in place; patches build a new list so
+    callers holding a previous result are not affected.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 256):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, List[Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generations: Dict[Tuple[str, str], int] = {}
+        # Writes applied to each table's cached reads, see ``write_version``
+        self._write_versions: Dict[Tuple[str, str], int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def generation(self, base_id: str, table_name: str) -> int:
+        """
+        Version of a table's cached reads. It changes whenever any cached read
+        of the table is stored, patched or dropped, so anything derived from
+        those reads can be reused while it stays the same.
+        """
+        with self._lock:
+            return self._generation(base_id, table_name)
+
+    def write_version(self, base_id: str, table_name: str) -> int:
+        """
+        Count of writes applied to a table's cached reads. Take it before an
+        upstream read and pass it to ``set``, so a read that raced a write
+        cannot replace the entry the write patched.
+        """
+        with self._lock:
+            return self._write_versions.get((base_id, table_name), 0)
+
+    def get(self, key: CacheKey) -> Optional[List[Dict]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, records = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return records
+
+    def set(
+        self,
+        key: CacheKey,
+        records: List[Dict],
+        ttl_seconds: Optional[float] = None,
+        write_version: Optional[int] = None,
+    ) -> None:
+        """
+        Store a read; ``ttl_seconds`` shortens its lifetime, e.g. for data that
+        is already old. With ``write_version``, the read is dropped if the table
+        was written since that version was taken.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if write_version is not None and self._write_versions.get((key[0], key[1]), 0) != write_version:
+                return
+            ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+            self._entries[key] = (time.monotonic() + ttl, records)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._bump(key[0], key[1])
+
+    def invalidate_table(self, base_id: str, table_name: str) -> None:
+        """Drop every cached read of a table."""
+        with self._lock:
+            for key in self._table_keys(base_id, table_name):
+                del self._entries[key]
+            self._bump(base_id, table_name)
+            self._written(base_id, table_name)
+
+    def upsert_record(self, base_id: str, table_name: str, record: Dict) -> None:
+        """
+        Apply a created or updated record to the cached reads of a table.
+
+        Only unfiltered, unsorted reads of every field can be patched safely;
+        reads with a formula or sort may change membership or order, and
+        projected reads would need the record trimmed, so they are dropped.
+        """
+        with self._lock:
+            for key in self._table_keys(base_id, table_name):
+                _, _, formula, sort, fields = key
+                if formula or sort or fields:
+                    del self._entries[key]
+                    continue
+                expires_at, records = self._entries[key]
+                record_id = record.get("id")
+                patched = [record if r.get("id") == record_id else r for r in records]
+                if not any(r.get("id") == record_id for r in records):
+                    patched.append(record)
+                self._entries[key] = (expires_at, patched)
+            self._bump(base_id, table_name)
+            self._written(base_id, table_name)
+
+    def remove_record(self, base_id: str, table_name: str, record_id: str) -> None:
+        """Remove a deleted record from every cached read of a table."""
+        with self._lock:
+            for key in self._table_keys(base_id, table_name):
+                expires_at, records = self._entries[key]
+                self._entries[key] = (expires_at, [r for r in records if r.get("id") != record_id])
+            self._bump(base_id, table_name)
+            self._written(base_id, table_name)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for base_id, table_name in list(self._generations):
+                self._bump(base_id, table_name)
+            for key in self._write_versions:
+                self._write_versions[key] += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _generation(self, base_id: str, table_name: str) -> int:
+        generation = self._generations.get((base_id, table_name))
+        if generation is None:
+            generation = self._generations[(base_id, table_name)] = next(_generations)
+        return generation
+
+    def _bump(self, base_id: str, table_name: str) -> None:
+        self._generations[(base_id, table_name)] = next(_generations)
+
+    def _written(self, base_id: str, table_name: str) -> None:
+        key = (base_id, table_name)
+        self._write_versions[key] = self._write_versions.get(key, 0) + 1
+
+    def _table_keys(self, base_id: str, table_name: str) -> List[CacheKey]:
+        return [key for key in self._entries if key[0] == base_id and key[1] == table_name]
@@ -0,0 +1,79 @@
+"""
+Compare RecordIndex lookups against a linear filter-and-sort scan.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_record_index [rows ...]
+
+Defaults to 10k, 100k and 1M synthetic Field_SPT-shaped rows.
+"""
+import random
+import sys
+import time
+
+from app.services.record_index import RecordIndex, index_key, sort_key
+
+MATERIALS = ["Clay", "Sand", "Silt", "Gravel", "Peat", "Rock"]
+REPEATS = 20
+
+
+def synthetic_records(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    points = max(count // 50, 1)
+    return [
+        {
+            "id": f"rec{i:08d}",
+            "createdTime": "2024-01-01T00:00:00.000Z",
+            "fields": {
+                "POINT_ID": f"BH{rng.randrange(points)}",
+                "Zone": f"Zone{rng.randrange(10)}",
+                "Material": rng.choice(MATERIALS),
+                "Depth": round(rng.uniform(0, 30), 2),
+                "N_Value": rng.randrange(0, 60),
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def linear_scan(records, filters, sort_by):
+    matches = [
+        record
+        for record in records
+        if all(index_key(record["fields"].get(f)) == v for f, v in filters.items())
+    ]
+    return sorted(matches, key=lambda r: (sort_key(r["fields"].get(sort_by)), r["id"]))
+
+
+def timed(fn):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = fn()
+    return (time.perf_counter() - start) / REPEATS * 1000, result
+
+
+def run(count: int):
+    records = synthetic_records(count)
+    index = RecordIndex(filter_fields=["POINT_ID", "Zone"], sort_fields=["Material"])
+    start = time.perf_counter()
+    index.load(records)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    queries = {
+        "point+zone": {"POINT_ID": "BH1", "Zone": "Zone5"},
+        "zone": {"Zone": "Zone5"},
+    }
+    print(f"\n{count:>9,} rows (index build {build_ms:,.0f} ms)")
+    for name, filters in queries.items():
+        scan_ms, expected = timed(lambda: linear_scan(records, filters, "Material"))
+        index_ms, actual = timed(lambda: index.query(filters, "Material"))
+        assert [r["id"] for r in actual] == [r["id"] for r in expected]
+        print(
+            f"  {name:<11} {len(actual):>7,} hits  scan {scan_ms:9.2f} ms  "
+            f"index {index_ms:9.3f} ms  speedup {scan_ms / max(index_ms, 1e-6):7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,57 @@
+"""
+Compare the response_model serialization path against the pre-shaped fast path.
+
+The validated path is what FastAPI does for ``response_model=AirtableTablePage``:
+validate every record, dump the model to JSON-compatible Python and encode it
+with JSONResponse. The fast path shapes the records and encodes them with
+TimedJSONResponse (orjson). Both must produce the same bytes.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_serialization [records ...]
+
+Defaults to 1k, 10k and 100k synthetic Field_SPT-shaped records.
+"""
+import sys
+import time
+
+from fastapi.responses import JSONResponse
+
+from app.core.instrumentation import TimedJSONResponse
+from app.schemas.airtable_schemas import AirtableTablePage
+from app.utils.serialization import orjson, shape_page
+from benchmarks.bench_record_index import synthetic_records
+
+REPEATS = 10
+
+
+def validated_path(records):
+    return JSONResponse(AirtableTablePage.model_validate({"records": records}).model_dump(mode="json")).body
+
+
+def fast_path(records):
+    return TimedJSONResponse(shape_page(records)).body
+
+
+def timed(fn, records):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        body = fn(records)
+    return (time.perf_counter() - start) / REPEATS * 1000, body
+
+
+def run(count: int):
+    records = synthetic_records(count)
+    validated_ms, expected = timed(validated_path, records)
+    fast_ms, actual = timed(fast_path, records)
+    assert actual == expected, "fast path output differs from the validated path"
+    print(
+        f"{count:>9,} records  {len(actual) / 1e6:7.2f} MB  validated {validated_ms:9.2f} ms  "
+        f"fast {fast_ms:9.2f} ms  speedup {validated_ms / max(fast_ms, 1e-6):5.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    print(f"orjson {'available' if orjson is not None else 'not installed, using json'}")
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    for size in sizes:
+        run(size)
@@ -0,0 +1,229 @@
+"""
+Drive the API at fixed concurrency and report latency, throughput and memory
+per endpoint, against the local Airtable stand-in.
+
+By default the app runs in process: its lifespan is started, the async
+Airtable service is pointed at a MockAirtable through httpx.ASGITransport
+(keeping the rate limiter and retries in the path) and requests are sent
+through another ASGITransport, so no network or Airtable account is used.
+``--replica`` also loads the mock's table into an in-memory replica, as the
+background sync would. With ``--url`` an already running server is driven
+over HTTP instead (start it against ``python -m benchmarks.mock_airtable``).
+
+Each scenario is warmed up, then ``--requests`` requests are sent by
+``--concurrency`` workers. Reported per scenario: p50/p95/p99 latency,
+requests per second, error count and the process's peak RSS so far.
+
+Baselines are kept in benchmarks/baselines.json:
+    python -m benchmarks.load_test --save-baseline
+    python -m benchmarks.load_test --check        # exit 1 on regression
+
+Usage (from the repository root):
+    python -m benchmarks.load_test [--rows 10000] [--concurrency 16] [--requests 500]
+        [--latency 0.0] [--throttle-rate 0.0] [--rate-limit 50] [--replica]
+        [--scenarios table,query] [--url http://127.0.0.1:8000]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import resource
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Settings are read at import time; keep the app away from real Airtable
+os.environ.setdefault("AIRTABLE_API_KEY", "mock")
+os.environ.setdefault("REPLICA_TABLES", "")
+# Snapshots left in ./data by an earlier run would warm later measurements
+os.environ.setdefault("SNAPSHOTS_ENABLED", "false")
+os.environ.setdefault("WRITE_BEHIND_ENABLED", "false")
+
+import httpx
+
+from app.main import app
+from app.services.airtable_async_services import AsyncAirtableService
+from app.services.replica_store import ReplicaStore
+from app.services.spt_aggregates import SPT_TABLE, create_spt_aggregates
+from app.utils.http_client import retry_options
+from app.utils.rate_limiter import RateLimitedTransport, RateLimiter
+from benchmarks.mock_airtable import MockAirtable
+
+BASELINES = Path(__file__).with_name("baselines.json")
+BASE_ID, TABLE_NAME = SPT_TABLE
+
+# method, path, JSON body
+Request = Tuple[str, str, Optional[Dict]]
+
+SCENARIOS: Dict[str, Callable[[int], Request]] = {
+    "table": lambda i: ("GET", f"/api/{BASE_ID}/{TABLE_NAME}", None),
+    "table_page_live": lambda i: ("GET", f"/api/{BASE_ID}/{TABLE_NAME}?page_size=100&live=true", None),
+    "spt_filtered": lambda i: ("GET", f"/api/geo/spt/filtered-sorted?zone=Zone{i % 10}", None),
+    "query": lambda i: ("POST", f"/api/{BASE_ID}/{TABLE_NAME}/query", {
+        "filters": [{"field": "Zone", "value": f"Zone{i % 10}"}, {"field": "N_Value", "op": "gte", "value": 30}],
+        "sort": [{"field": "Depth", "direction": "desc"}],
+        "limit": 50,
+    }),
+    "summary": lambda i: ("GET", f"/api/geo/spt/summary?zone=Zone{i % 10}", None),
+    "record": lambda i: ("GET", f"/api/{BASE_ID}/{TABLE_NAME}/rec{i % 1000:08d}", None),
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0))]
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, make_request: Callable[[int], Request], requests: int, concurrency: int, warmup: int
+) -> Dict:
+    for i in range(warmup):
+        method, path, body = make_request(i)
+        await client.request(method, path, json=body)
+
+    latencies: List[float] = []
+    errors = 0
+    counter = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while (i := next(counter)) < requests:
+            method, path, body = make_request(i)
+            started = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "rps": round(len(latencies) / elapsed, 1),
+        "errors": errors,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+@asynccontextmanager
+async def in_process_client(args):
+    """Start the app against a MockAirtable and yield a client for it."""
+    mock = MockAirtable.with_spt_rows(args.rows, latency_seconds=args.latency, throttle_rate=args.throttle_rate)
+    async with app.router.lifespan_context(app):
+        limiter = RateLimiter(rate=args.rate_limit, burst=args.rate_limit)
+        upstream = httpx.AsyncClient(
+            base_url="http://mock-airtable/v0",
+            transport=RateLimitedTransport(httpx.ASGITransport(mock.app), limiter, **retry_options()),
+        )
+        replica = None
+        if args.replica:
+            replica = ReplicaStore(":memory:", index_fields=["POINT_ID", "Zone"], sort_fields=["Material"])
+            replica.replace_table(*SPT_TABLE, list(mock.tables[SPT_TABLE].values()), "2024-01-01T00:00:00.000Z")
+            replica.add_aggregates(*SPT_TABLE, create_spt_aggregates())
+        await app.state.async_airtable_service.close()
+        service = app.state.async_airtable_service = AsyncAirtableService(upstream, replica=replica)
+        # Services built by the lifespan still hold the closed one
+        app.state.change_feed.service = service
+        if app.state.write_behind is not None:
+            app.state.write_behind.service = service
+        async with httpx.AsyncClient(
+            base_url="http://app", transport=httpx.ASGITransport(app), timeout=None
+        ) as client:
+            yield client
+        if replica is not None:
+            replica.close()
+
+
+def check(results: Dict[str, Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """Regressions of ``results`` against a stored baseline."""
+    regressions = []
+    for name, result in results.items():
+        expected = baseline["results"].get(name)
+        if expected is None:
+            continue
+        if result["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_ms']:.2f} ms vs baseline {expected['p95_ms']:.2f} ms")
+        if result["rps"] < expected["rps"] / (1 + tolerance):
+            regressions.append(f"{name}: {result['rps']:.0f} req/s vs baseline {expected['rps']:.0f} req/s")
+        if result["peak_rss_mb"] > expected["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {result['peak_rss_mb']:.0f} MB vs baseline {expected['peak_rss_mb']:.0f} MB")
+        if result["errors"] > expected["errors"]:
+            regressions.append(f"{name}: {result['errors']} errors vs baseline {expected['errors']}")
+    return regressions
+
+
+async def main(args) -> int:
+    # Per-request client logging would dominate the measurements
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    names = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    config = {
+        key: getattr(args, key)
+        for key in ("rows", "concurrency", "requests", "latency", "throttle_rate", "rate_limit", "replica")
+    }
+    if args.url:
+        client_context = httpx.AsyncClient(base_url=args.url, timeout=None)
+    else:
+        client_context = in_process_client(args)
+
+    results: Dict[str, Dict] = {}
+    async with client_context as client:
+        print(f"{'scenario':<16} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'errors':>7} {'peak RSS MB':>12}")
+        for name in names:
+            result = await run_scenario(client, SCENARIOS[name], args.requests, args.concurrency, args.warmup)
+            results[name] = result
+            print(
+                f"{name:<16} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} {result['p99_ms']:9.2f} "
+                f"{result['rps']:9.0f} {result['errors']:7d} {result['peak_rss_mb']:12.1f}"
+            )
+
+    if args.save_baseline:
+        BASELINES.write_text(json.dumps({"config": config, "results": results}, indent=2) + "\n")
+        print(f"Baseline written to {BASELINES}")
+    if args.check:
+        baseline = json.loads(BASELINES.read_text())
+        if baseline["config"] != config:
+            print(f"warning: baseline was recorded with {baseline['config']}")
+        regressions = check(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000, help="Synthetic Field_SPT rows (1k to 1M)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests per scenario")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock Airtable latency in seconds")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of mock requests answered with 429")
+    parser.add_argument("--rate-limit", type=float, default=50.0, help="Upstream requests per second per base")
+    parser.add_argument("--replica", action="store_true", help="Serve reads from an in-memory replica")
+    parser.add_argument("--scenarios", help=f"Comma separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--url", help="Drive a running server instead of the in-process app")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="Compare against the stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed slowdown before --check fails")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args())))
@@ -0,0 +1,264 @@
+"""
+Local stand-in for the Airtable REST API, for benchmarks and offline tests.
+
+Implements list (with offset pagination, pageSize, maxRecords, sort and
+fields[]), get, create, update and delete, single and batched, over
+in-memory tables. Latency, the maximum page size and the share of requests
+rejected with 429 are configurable, and tables can be seeded with synthetic
+Field_SPT-shaped rows.
+
+filterByFormula understands ``{Field} = 'value'`` terms, alone or inside
+AND(); any other formula is ignored and every record is returned, so
+filtered reads see a superset of what Airtable would send.
+
+In process, mount it with ``httpx.ASGITransport(MockAirtable(...).app)``.
+Standalone (needs uvicorn), point AIRTABLE_API_URL at it:
+    python -m benchmarks.mock_airtable --rows 100000 --latency 0.05 --port 8081
+    AIRTABLE_API_URL=http://127.0.0.1:8081/v0 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.services.record_index import index_key, sort_key
+from app.services.spt_aggregates import SPT_TABLE
+from benchmarks.bench_record_index import synthetic_records
+
+# Airtable's limits
+MAX_PAGE_SIZE = 100
+MAX_BATCH_SIZE = 10
+
+_EQUALITY = re.compile(r"\{((?:[^}\\]|\\.)+)\}\s*=\s*'((?:[^'\\]|\\.)*)'")
+
+
+def _unescape(value: str) -> str:
+    return re.sub(r"\\(.)", r"\1", value)
+
+
+def parse_equalities(formula: Optional[str]) -> Dict[str, str]:
+    """``{Field} = 'value'`` terms of a formula; empty when the formula has any other shape."""
+    if not formula:
+        return {}
+    terms = _EQUALITY.findall(formula)
+    stripped = _EQUALITY.sub("", formula).replace("AND(", "").replace(")", "").replace(",", "")
+    if not terms or stripped.strip():
+        return {}
+    return {_unescape(field): _unescape(value) for field, value in terms}
+
+
+def error(status_code: int, error_type: str, message: str) -> JSONResponse:
+    return JSONResponse({"error": {"type": error_type, "message": message}}, status_code=status_code)
+
+
+class MockAirtable:
+    """
+    In-memory Airtable tables behind an ASGI app.
+
+    Args:
+        tables: Initial records per ``(base_id, table_name)``.
+        latency_seconds: Delay added to every request.
+        page_size: Largest page returned by list, at most Airtable's 100.
+        throttle_rate: Share of requests answered with 429.
+        seed: Seed for 429 injection, so runs are repeatable.
+    """
+
+    def __init__(
+        self,
+        tables: Optional[Dict[Tuple[str, str], List[Dict]]] = None,
+        latency_seconds: float = 0.0,
+        page_size: int = MAX_PAGE_SIZE,
+        throttle_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.tables: Dict[Tuple[str, str], Dict[str, Dict]] = {
+            key: {record["id"]: record for record in records} for key, records in (tables or {}).items()
+        }
+        self.latency_seconds = latency_seconds
+        self.page_size = min(page_size, MAX_PAGE_SIZE)
+        self.throttle_rate = throttle_rate
+        self.requests: Counter = Counter()
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self.app = Starlette(routes=[
+            Route("/v0/{base_id}/{table_name}", self.list_records, methods=["GET"]),
+            Route("/v0/{base_id}/{table_name}", self.create_records, methods=["POST"]),
+            Route("/v0/{base_id}/{table_name}", self.update_records, methods=["PATCH", "PUT"]),
+            Route("/v0/{base_id}/{table_name}", self.delete_records, methods=["DELETE"]),
+            Route("/v0/{base_id}/{table_name}/{record_id}", self.get_record, methods=["GET"]),
+            Route("/v0/{base_id}/{table_name}/{record_id}", self.update_record, methods=["PATCH", "PUT"]),
+            Route("/v0/{base_id}/{table_name}/{record_id}", self.delete_record, methods=["DELETE"]),
+        ])
+
+    @classmethod
+    def with_spt_rows(cls, rows: int, **options) -> "MockAirtable":
+        """A mock serving ``rows`` synthetic records as the Field_SPT table."""
+        return cls({SPT_TABLE: synthetic_records(rows)}, **options)
+
+    async def _enter(self, request: Request) -> Optional[JSONResponse]:
+        """Apply latency and 429 injection; returns the 429 response for throttled requests."""
+        self.requests[request.method] += 1
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        if self.throttle_rate and self._random.random() < self.throttle_rate:
+            self.requests["429"] += 1
+            return error(429, "RATE_LIMIT_REACHED", "Rate limit exceeded. Please try again later")
+        return None
+
+    def _table(self, request: Request) -> Dict[str, Dict]:
+        key = (request.path_params["base_id"], request.path_params["table_name"])
+        return self.tables.setdefault(key, {})
+
+    def _new_record(self, fields: Dict) -> Dict:
+        return {
+            "id": f"recMock{next(self._ids):010d}",
+            "createdTime": "2024-01-01T00:00:00.000Z",
+            "fields": dict(fields),
+        }
+
+    async def list_records(self, request: Request) -> JSONResponse:
+        throttled = await self._enter(request)
+        if throttled is not None:
+            return throttled
+        params = request.query_params
+        records = list(self._table(request).values())
+        filters = parse_equalities(params.get("filterByFormula"))
+        if filters:
+            records = [
+                record for record in records
+                if all(index_key(record["fields"].get(field)) == value for field, value in filters.items())
+            ]
+        sorts = []
+        for position in itertools.count():
+            field = params.get(f"sort[{position}][field]")
+            if field is None:
+                break
+            sorts.append((field, params.get(f"sort[{position}][direction]") == "desc"))
+        for field, descending in reversed(sorts):
+            records.sort(key=lambda record: sort_key(record["fields"].get(field)), reverse=descending)
+        if params.get("maxRecords"):
+            records = records[:int(params["maxRecords"])]
+        start = int(params.get("offset", "itr0").removeprefix("itr"))
+        page_size = min(int(params.get("pageSize", self.page_size)), self.page_size)
+        page = records[start:start + page_size]
+        fields = params.getlist("fields[]")
+        if fields:
+            page = [{**record, "fields": {f: record["fields"][f] for f in fields if f in record["fields"]}} for record in page]
+        body: Dict = {"records": page}
+        if start + page_size < len(records):
+            body["offset"] = f"itr{start + page_size}"
+        return JSONResponse(body)
+
+    async def get_record(self, request: Request) -> JSONResponse:
+        throttled = await self._enter(request)
+        if throttled is not None:
+            return throttled
+        record = self._table(request).get(request.path_params["record_id"])
+        if record is None:
+            return error(404, "NOT_FOUND", "Could not find record")
+        return JSONResponse(record)
+
+    async def create_records(self, request: Request) -> JSONResponse:
+        throttled = await self._enter(request)
+        if throttled is not None:
+            return throttled
+        body = await request.json()
+        table = self._table(request)
+        if "records" not in body:
+            record = self._new_record(body.get("fields", {}))
+            table[record["id"]] = record
+            return JSONResponse(record)
+        if len(body["records"]) > MAX_BATCH_SIZE:
+            return error(422, "INVALID_RECORDS", f"At most {MAX_BATCH_SIZE} records per request")
+        created = [self._new_record(item.get("fields", {})) for item in body["records"]]
+        for record in created:
+            table[record["id"]] = record
+        return JSONResponse({"records": created})
+
+    def _apply_update(self, table: Dict[str, Dict], record_id: str, fields: Dict, replace: bool) -> Optional[Dict]:
+        record = table.get(record_id)
+        if record is None:
+            return None
+        updated = {**record, "fields": dict(fields) if replace else {**record["fields"], **fields}}
+        table[record_id] = updated
+        return updated
+
+    async def update_record(self, request: Request) -> JSONResponse:
+        throttled = await self._enter(request)
+        if throttled is not None:
+            return throttled
+        body = await request.json()
+        record = self._apply_update(
+            self._table(request), request.path_params["record_id"], body.get("fields", {}), request.method == "PUT"
+        )
+        if record is None:
+            return error(404, "NOT_FOUND", "Could not find record")
+        return JSONResponse(record)
+
+    async def update_records(self, request: Request) -> JSONResponse:
+        throttled = await self._enter(request)
+        if throttled is not None:
+            return throttled
+        items = (await request.json()).get("records", [])
+        if len(items) > MAX_BATCH_SIZE:
+            return error(422, "INVALID_RECORDS", f"At most {MAX_BATCH_SIZE} records per request")
+        table = self._table(request)
+        if any(item.get("id") not in table for item in items):
+            return error(404, "NOT_FOUND", "Could not find record")
+        updated = [
+            self._apply_update(table, item["id"], item.get("fields", {}), request.method == "PUT") for item in items
+        ]
+        return JSONResponse({"records": updated})
+
+    async def delete_record(self, request: Request) -> JSONResponse:
+        throttled = await self._enter(request)
+        if throttled is not None:
+            return throttled
+        record_id = request.path_params["record_id"]
+        if self._table(request).pop(record_id, None) is None:
+            return error(404, "NOT_FOUND", "Could not find record")
+        return JSONResponse({"id": record_id, "deleted": True})
+
+    async def delete_records(self, request: Request) -> JSONResponse:
+        throttled = await self._enter(request)
+        if throttled is not None:
+            return throttled
+        record_ids = request.query_params.getlist("records[]")
+        if len(record_ids) > MAX_BATCH_SIZE:
+            return error(422, "INVALID_RECORDS", f"At most {MAX_BATCH_SIZE} records per request")
+        table = self._table(request)
+        if any(record_id not in table for record_id in record_ids):
+            return error(404, "NOT_FOUND", "Could not find record")
+        for record_id in record_ids:
+            del table[record_id]
+        return JSONResponse({"records": [{"id": record_id, "deleted": True} for record_id in record_ids]})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000, help="Synthetic Field_SPT rows")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--page-size", type=int, default=MAX_PAGE_SIZE)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    mock = MockAirtable.with_spt_rows(
+        args.rows, latency_seconds=args.latency, page_size=args.page_size, throttle_rate=args.throttle_rate
+    )
+    uvicorn.run(mock.app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import pytest
 from fastapi.testclient import TestClient
+from app.core.settings import settings
 from app.main import app
 from dotenv import load_dotenv
 import logging
@@ -23,10 +24,26 @@ logging.basicConfig(
     ]
 )
 
-@pytest.fixture(scope="module")
-def test_client():
-    client = TestClient(app)
-    yield client
+@pytest.fixture
+def test_client(tmp_path):
+    # No background replica sync, snapshots or write-behind against real
+    # Airtable, and any database files go to the test's own directory
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(settings, "REPLICA_TABLES", "")
+        patch.setattr(settings, "SNAPSHOTS_ENABLED", False)
+        patch.setattr(settings, "WRITE_BEHIND_ENABLED", False)
+        patch.setattr(settings, "REPLICA_DB_PATH", str(tmp_path / "replica.sqlite3"))
+        patch.setattr(settings, "SNAPSHOT_DB_PATH", str(tmp_path / "snapshots.sqlite3"))
+        patch.setattr(settings, "OUTBOX_DB_PATH", str(tmp_path / "outbox.sqlite3"))
+        # Enter the client so the app lifespan creates the shared services
+        with TestClient(app) as client:
+            # Tests swap services on app.state; put the lifespan's back so it closes them
+            state = dict(app.state._state)
+            try:
+                yield client
+            finally:
+                app.state._state.clear()
+                app.state._state.update(state)
 
 @pytest.fixture(scope="session")
 def airtable_base_id():
@@ -0,0 +1,206 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services.airtable_async_services import AsyncAirtableService
+from app.utils.streaming import ndjson_response
+from app.utils.table_cache import TableCache, make_cache_key
+
+
+def make_client(handler):
+    return httpx.AsyncClient(base_url="https://airtable.test/v0", transport=httpx.MockTransport(handler))
+
+
+def test_list_records_follows_offsets():
+    pages = {
+        None: {"records": [{"id": "rec1", "fields": {}}], "offset": "page2"},
+        "page2": {"records": [{"id": "rec2", "fields": {}}]},
+    }
+    seen = []
+
+    def handler(request: httpx.Request):
+        seen.append(request.url)
+        return httpx.Response(200, json=pages[request.url.params.get("offset")])
+
+    async def run():
+        async with make_client(handler) as client:
+            service = AsyncAirtableService(client, cache=TableCache(ttl_seconds=0))
+            return await service.get_filtered_sorted_records("base", "Field SPT", point_id="BH501")
+
+    records = asyncio.run(run())
+    assert [record["id"] for record in records] == ["rec1", "rec2"]
+    assert seen[0].raw_path.startswith(b"/v0/base/Field%20SPT?")
+    assert seen[0].params["filterByFormula"] == "AND({POINT_ID} = 'BH501')"
+    assert seen[0].params["sort[0][field]"] == "Material"
+
+
+def test_reads_are_cached_and_writes_patch_the_cache():
+    calls = []
+
+    def handler(request: httpx.Request):
+        calls.append(request.method)
+        if request.method == "POST":
+            return httpx.Response(200, json={"id": "rec2", "fields": {"name": "new"}})
+        return httpx.Response(200, json={"records": [{"id": "rec1", "fields": {"name": "old"}}]})
+
+    async def run():
+        async with make_client(handler) as client:
+            service = AsyncAirtableService(client, cache=TableCache(ttl_seconds=60))
+            await service.get_table("base", "table")
+            await service.create_record("base", "table", {"name": "new"})
+            return await service.get_table("base", "table")
+
+    records = asyncio.run(run())
+    assert calls == ["GET", "POST"]
+    assert [record["id"] for record in records] == ["rec1", "rec2"]
+
+
+def test_get_table_streams_ndjson(test_client):
+    pages = {
+        None: {"records": [{"id": "rec1", "fields": {"name": "a"}}], "offset": "page2"},
+        "page2": {"records": [{"id": "rec2", "fields": {"name": "b"}}]},
+    }
+
+    def handler(request: httpx.Request):
+        return httpx.Response(200, json=pages[request.url.params.get("offset")])
+
+    test_client.app.state.async_airtable_service = AsyncAirtableService(
+        make_client(handler), cache=TableCache(ttl_seconds=0)
+    )
+    response = test_client.get("/api/base/table?stream=true&live=true")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines == [
+        {"id": "rec1", "fields": {"name": "a"}, "created_time": None},
+        {"id": "rec2", "fields": {"name": "b"}, "created_time": None},
+    ]
+
+
+def test_ndjson_stream_is_aborted_when_a_later_page_fails():
+    async def pages():
+        yield [{"id": "rec1", "fields": {"name": "a"}}]
+        raise RuntimeError("upstream failed")
+
+    async def run():
+        response = await ndjson_response(pages())
+        return [chunk async for chunk in response.body_iterator]
+
+    with pytest.raises(RuntimeError, match="upstream failed"):
+        asyncio.run(run())
+
+
+def test_get_table_pages_with_cursor_and_fields(test_client):
+    pages = {
+        None: {"records": [{"id": "rec1", "fields": {"name": "a"}}], "offset": "page2"},
+        "page2": {"records": [{"id": "rec2", "fields": {"name": "b"}}]},
+    }
+    seen = []
+
+    def handler(request: httpx.Request):
+        seen.append(request.url.params)
+        return httpx.Response(200, json=pages[request.url.params.get("offset")])
+
+    test_client.app.state.async_airtable_service = AsyncAirtableService(
+        make_client(handler), cache=TableCache(ttl_seconds=0)
+    )
+    first = test_client.get("/api/base/table?page_size=1&fields=name&live=true").json()
+    assert [record["id"] for record in first["records"]] == ["rec1"]
+    assert seen[0]["pageSize"] == "1"
+    assert seen[0].get_list("fields[]") == ["name"]
+
+    second = test_client.get(f"/api/base/table?page_size=1&cursor={first['next_cursor']}&live=true").json()
+    assert [record["id"] for record in second["records"]] == ["rec2"]
+    assert second["next_cursor"] is None
+    assert seen[1]["offset"] == "page2"
+
+    assert test_client.get("/api/base/table?cursor=not-a-cursor").status_code == 400
+
+
+def test_get_page_slices_cached_records():
+    def handler(request: httpx.Request):
+        records = [{"id": f"rec{i}", "fields": {"name": str(i), "other": i}} for i in range(5)]
+        return httpx.Response(200, json={"records": records})
+
+    async def run():
+        async with make_client(handler) as client:
+            service = AsyncAirtableService(client, cache=TableCache(ttl_seconds=60))
+            await service.get_table("base", "table")
+            first, cursor = await service.get_page("base", "table", 2, fields=["name"])
+            second, cursor = await service.get_page("base", "table", 2, cursor, fields=["name"])
+            return first + second, cursor
+
+    records, cursor = asyncio.run(run())
+    assert [record["id"] for record in records] == ["rec0", "rec1", "rec2", "rec3"]
+    assert records[0]["fields"] == {"name": "0"}
+    assert cursor is not None
+
+
+def test_position_cursor_without_local_data_is_rejected(test_client):
+    requests = []
+
+    def handler(request: httpx.Request):
+        requests.append(request)
+        records = [{"id": f"rec{i}", "fields": {"name": str(i)}} for i in range(5)]
+        return httpx.Response(200, json={"records": records})
+
+    cache = TableCache(ttl_seconds=60)
+    test_client.app.state.async_airtable_service = AsyncAirtableService(make_client(handler), cache=cache)
+    first = test_client.get("/api/base/table?page_size=2").json()
+    assert len(requests) == 1
+
+    # Once the table is read live, or its local copy is gone, positions no longer apply
+    assert test_client.get(f"/api/base/table?page_size=2&cursor={first['next_cursor']}&live=true").status_code == 400
+    cache.invalidate_table("base", "table")
+    assert test_client.get(f"/api/base/table?page_size=2&cursor={first['next_cursor']}").status_code == 400
+    assert len(requests) == 1
+
+
+def test_batch_create_chunks_and_reports_partial_failures():
+    calls = []
+
+    def handler(request: httpx.Request):
+        records = json.loads(request.content)["records"]
+        calls.append(len(records))
+        if records[0]["fields"]["n"] == 10:
+            return httpx.Response(422, json={"error": {"type": "INVALID_VALUE_FOR_COLUMN"}})
+        return httpx.Response(
+            200, json={"records": [{"id": f"rec{r['fields']['n']}", "fields": r["fields"]} for r in records]}
+        )
+
+    async def run():
+        async with make_client(handler) as client:
+            service = AsyncAirtableService(client, cache=TableCache(ttl_seconds=0))
+            return await service.batch_create("base", "table", [{"n": n} for n in range(25)])
+
+    results = asyncio.run(run())
+    assert sorted(calls) == [5, 10, 10]
+    assert [result["index"] for result in results] == list(range(25))
+    assert [result["success"] for result in results] == [True] * 10 + [False] * 10 + [True] * 5
+    assert results[0]["id"] == "rec0"
+    assert "422" in results[10]["error"]
+
+
+def test_read_racing_a_write_is_not_cached():
+    release = asyncio.Event()
+
+    async def handler(request: httpx.Request):
+        if request.method == "POST":
+            return httpx.Response(200, json={"id": "rec2", "fields": {"name": "new"}})
+        await release.wait()
+        return httpx.Response(200, json={"records": [{"id": "rec1", "fields": {"name": "old"}}]})
+
+    async def run():
+        async with make_client(handler) as client:
+            service = AsyncAirtableService(client, cache=TableCache(ttl_seconds=60))
+            read = asyncio.create_task(service.get_table("base", "table"))
+            await asyncio.sleep(0.01)
+            await service.create_record("base", "table", {"name": "new"})
+            release.set()
+            await read
+            return service.cache.get(make_cache_key("base", "table"))
+
+    # Caching the read would hide rec2 until the entry expired
+    assert asyncio.run(run()) is None
@@ -0,0 +1,29 @@
+from app.services.airtable_services import AirtableService
+from app.utils.table_cache import TableCache
+
+
+class FakeTable:
+    def __init__(self):
+        self.calls = []
+
+    def all(self, **params):
+        self.calls.append(params)
+        return [{"id": f"rec{len(self.calls)}", "fields": {}}]
+
+
+def test_live_reads_skip_the_cache(monkeypatch):
+    service = AirtableService("key", cache=TableCache(ttl_seconds=60))
+    table = FakeTable()
+    monkeypatch.setattr(service, "_table", lambda base_id, table_name: table)
+
+    assert service.get_table("base", "table") == [{"id": "rec1", "fields": {}}]
+    assert service.get_table("base", "table") == [{"id": "rec1", "fields": {}}]
+    assert len(table.calls) == 1
+    assert service.get_table("base", "table", live=True) == [{"id": "rec2", "fields": {}}]
+    assert len(table.calls) == 2
+
+    service.get_filtered_sorted_records("base", "table", point_id="BH1")
+    service.get_filtered_sorted_records("base", "table", point_id="BH1")
+    assert len(table.calls) == 3
+    service.get_filtered_sorted_records("base", "table", point_id="BH1", live=True)
+    assert len(table.calls) == 4
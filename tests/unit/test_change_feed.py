@@ -0,0 +1,96 @@
+import asyncio
+
+import httpx
+
+from app.services.airtable_async_services import AsyncAirtableService
+from app.services.change_feed import ChangeFeed
+from app.utils.streaming import format_sse
+from app.utils.table_cache import TableCache
+
+
+def make_record(record_id, **fields):
+    return {"id": record_id, "fields": fields}
+
+
+def test_subscribers_get_a_snapshot_then_filtered_deltas():
+    table = {
+        "rec1": make_record("rec1", POINT_ID="BH1", Material="Sand"),
+        "rec2": make_record("rec2", POINT_ID="BH2", Material="Clay"),
+    }
+    requests = []
+
+    def handler(request: httpx.Request):
+        requests.append(request)
+        return httpx.Response(200, json={"records": list(table.values())})
+
+    async def run():
+        client = httpx.AsyncClient(base_url="https://airtable.test/v0", transport=httpx.MockTransport(handler))
+        feed = ChangeFeed(AsyncAirtableService(client, cache=TableCache(ttl_seconds=0)), interval_seconds=3600)
+        everything = feed.subscribe("base", "table")
+        bh1 = feed.subscribe("base", "table", {"POINT_ID": "BH1"})
+        all_events = everything.events(heartbeat_seconds=1)
+        bh1_events = bh1.events(heartbeat_seconds=1)
+
+        snapshots = [await anext(all_events), await anext(bh1_events)]
+
+        table["rec1"] = make_record("rec1", POINT_ID="BH2", Material="Sand")
+        table["rec3"] = make_record("rec3", POINT_ID="BH1", Material="Silt")
+        del table["rec2"]
+        await feed.poll("base", "table")
+        changes = [await anext(all_events), await anext(bh1_events)]
+
+        assert feed.stats() == {"base/table": 2}
+        feed.unsubscribe(everything)
+        feed.unsubscribe(bh1)
+        assert feed.stats() == {}
+        await client.aclose()
+        return snapshots, changes
+
+    snapshots, changes = asyncio.run(run())
+    # Two subscribers, one upstream read per poll
+    assert len(requests) == 2
+
+    (_, all_snapshot), (_, bh1_snapshot) = snapshots
+    assert [r["id"] for r in all_snapshot["records"]] == ["rec1", "rec2"]
+    assert [r["id"] for r in bh1_snapshot["records"]] == ["rec1"]
+
+    (name, all_delta), (_, bh1_delta) = changes
+    assert name == "changes"
+    assert [r["id"] for r in all_delta["created"]] == ["rec3"]
+    assert [r["id"] for r in all_delta["updated"]] == ["rec1"]
+    assert all_delta["deleted"] == ["rec2"]
+    # rec1 moved out of the BH1 view, rec3 moved in
+    assert [r["id"] for r in bh1_delta["created"]] == ["rec3"]
+    assert bh1_delta["updated"] == []
+    assert bh1_delta["deleted"] == ["rec1"]
+
+
+def test_idle_subscription_yields_heartbeats_and_slow_clients_are_dropped():
+    async def run():
+        client = httpx.AsyncClient(
+            base_url="https://airtable.test/v0",
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"records": []})),
+        )
+        feed = ChangeFeed(AsyncAirtableService(client, cache=TableCache(ttl_seconds=0)), queue_size=1)
+        subscription = feed.subscribe("base", "table")
+        events = subscription.events(heartbeat_seconds=0.01)
+        assert await anext(events) == ("snapshot", {"records": []})
+        assert await anext(events) is None
+
+        subscription.send_changes([make_record("rec1")], [], [])
+        subscription.send_changes([make_record("rec2")], [], [])
+        assert subscription.closed
+        remaining = [event async for event in events]
+        task = feed._feeds[("base", "table")].task
+        await feed.close()
+        assert task.done()
+        await client.aclose()
+        return remaining
+
+    assert asyncio.run(run()) == []
+
+
+def test_format_sse():
+    assert format_sse("changes", {"deleted": ["rec1"]}, event_id=3) == (
+        b'id: 3\nevent: changes\ndata: {"deleted":["rec1"]}\n\n'
+    )
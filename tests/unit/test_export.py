@@ -0,0 +1,121 @@
+import asyncio
+import csv
+import io
+
+import httpx
+import pytest
+
+from app.services.airtable_async_services import AsyncAirtableService
+from app.utils.export import Column, cell, export_response, infer_columns, pyarrow
+from app.utils.table_cache import TableCache
+from benchmarks.mock_airtable import MockAirtable
+
+RECORDS = [
+    {"id": "rec1", "createdTime": "2024-01-01T00:00:00.000Z", "fields": {"POINT_ID": "BH1", "N_Value": 10, "Tested": True}},
+    {"id": "rec2", "createdTime": "2024-01-02T00:00:00.000Z", "fields": {"POINT_ID": "BH2", "N_Value": 12.5, "Tags": ["a", "b"]}},
+    {"id": "rec3", "createdTime": "2024-01-03T00:00:00.000Z", "fields": {"N_Value": "n/a", "Tested": False}},
+]
+
+
+def use_mock(test_client, records):
+    mock = MockAirtable({("base", "table"): records}, page_size=2)
+    test_client.app.state.async_airtable_service = AsyncAirtableService(
+        httpx.AsyncClient(base_url="http://mock-airtable/v0", transport=httpx.ASGITransport(mock.app)),
+        cache=TableCache(ttl_seconds=0),
+    )
+    return mock
+
+
+def test_infer_columns_and_cells():
+    columns = infer_columns(RECORDS[:2])
+    assert columns == [
+        Column("id", "string"),
+        Column("created_time", "string"),
+        Column("POINT_ID", "string"),
+        Column("N_Value", "number"),
+        Column("Tested", "bool"),
+        Column("Tags", "string"),
+    ]
+    assert infer_columns(RECORDS)[3] == Column("N_Value", "string")
+    assert [column.name for column in infer_columns(RECORDS, ["Tested", "Missing"])] == ["id", "created_time", "Tested", "Missing"]
+    assert cell("n/a", "number") is None
+    assert cell(["a", "b"], "string") == '["a", "b"]'
+    assert cell(3, "string") == "3"
+
+
+def test_csv_export_streams_every_page(test_client):
+    mock = use_mock(test_client, RECORDS)
+    response = test_client.get("/api/base/table/export?live=true")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    assert response.headers["content-disposition"] == 'attachment; filename="table.csv"'
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "created_time", "POINT_ID", "N_Value", "Tested", "Tags"]
+    assert rows[1] == ["rec1", "2024-01-01T00:00:00.000Z", "BH1", "10", "True", ""]
+    assert rows[3] == ["rec3", "2024-01-03T00:00:00.000Z", "", "n/a", "False", ""]
+    assert mock.requests["GET"] == 2
+
+
+def test_schema_is_inferred_from_the_sample(test_client, monkeypatch):
+    monkeypatch.setattr("app.utils.export.SCHEMA_SAMPLE_ROWS", 1)
+    late = {"id": "rec3", "createdTime": "2024-01-03T00:00:00.000Z", "fields": {"N_Value": "n/a", "Late": 1}}
+    use_mock(test_client, RECORDS[:2] + [late])
+    rows = list(csv.reader(io.StringIO(test_client.get("/api/base/table/export?live=true").text)))
+    # Only the first page was sampled: "n/a" does not fit N_Value's numeric column and Late is left out
+    assert rows[0] == ["id", "created_time", "POINT_ID", "N_Value", "Tested", "Tags"]
+    assert rows[3] == ["rec3", "2024-01-03T00:00:00.000Z", "", "", "", ""]
+
+
+def test_csv_export_with_fields(test_client):
+    use_mock(test_client, RECORDS)
+    response = test_client.get("/api/base/table/export?live=true&fields=Tags&fields=POINT_ID")
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "created_time", "Tags", "POINT_ID"]
+    assert rows[2][2:] == ['["a", "b"]', "BH2"]
+
+
+async def failing_pages(pages):
+    for page in range(pages):
+        yield [{"id": f"rec{page}-{i}", "fields": {"n": i}} for i in range(100)]
+    raise RuntimeError("upstream failed")
+
+
+@pytest.mark.parametrize("export_format", ["csv", "arrow", "parquet"])
+def test_export_is_aborted_when_a_later_page_fails(export_format, monkeypatch):
+    if export_format != "csv":
+        pytest.importorskip("pyarrow")
+    monkeypatch.setattr("app.utils.export.BATCH_ROWS", 500)
+    chunks = []
+
+    async def run():
+        # 11 pages fill the schema sample; the failure comes after the response has started
+        response = await export_response(failing_pages(11), export_format, "table")
+        async for chunk in response.body_iterator:
+            chunks.append(chunk)
+
+    with pytest.raises(RuntimeError, match="upstream failed"):
+        asyncio.run(run())
+    if export_format == "csv":
+        assert len(b"".join(chunks).decode().splitlines()) == 1 + 1_100
+    elif export_format == "parquet":
+        # Batches already sent, but never the footer that makes the file readable
+        assert not b"".join(chunks).endswith(b"PAR1")
+
+
+@pytest.mark.skipif(pyarrow is not None, reason="pyarrow is installed")
+def test_columnar_export_needs_pyarrow(test_client):
+    assert test_client.get("/api/base/table/export?format=parquet").status_code == 501
+
+
+def test_columnar_exports_round_trip(test_client):
+    pytest.importorskip("pyarrow")
+    import pyarrow.ipc
+    import pyarrow.parquet
+
+    use_mock(test_client, RECORDS[:2])
+    arrow = test_client.get("/api/base/table/export?format=arrow&live=true")
+    table = pyarrow.ipc.open_stream(arrow.content).read_all()
+    assert table.column("N_Value").to_pylist() == [10.0, 12.5]
+    parquet = test_client.get("/api/base/table/export?format=parquet&live=true")
+    table = pyarrow.parquet.read_table(pyarrow.BufferReader(parquet.content))
+    assert table.column("Tested").to_pylist() == [True, None]
@@ -0,0 +1,19 @@
+import requests
+
+from app.utils.http_client import mount_rate_limiter, session_pool_stats
+from app.utils.rate_limiter import RateLimiter
+
+
+def test_session_pool_stats_count_shared_adapters_once():
+    session = requests.Session()
+    mount_rate_limiter(session, RateLimiter())
+    # The same adapter serves both http:// and https://
+    pool = session.get_adapter("https://airtable.test").poolmanager.connection_from_url("https://airtable.test")
+    pool.num_requests = 4
+    pool.num_connections = 1
+
+    stats = session_pool_stats(session)
+    assert stats["pools"] == 1
+    assert stats["requests"] == 4
+    assert stats["connections_opened"] == 1
+    assert stats["reuse_rate"] == 0.75
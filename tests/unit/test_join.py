@@ -0,0 +1,83 @@
+import asyncio
+
+import httpx
+
+from app.services.airtable_async_services import AsyncAirtableService
+from app.services.join import build_index, hash_join
+from app.utils.table_cache import TableCache
+
+
+def make_record(record_id, **fields):
+    return {"id": record_id, "fields": fields}
+
+
+SPT = [
+    make_record("spt1", POINT_ID="BH1", Borehole=["pt1"], N=12),
+    make_record("spt2", POINT_ID="BH1", Borehole=["pt1"], N=20),
+    make_record("spt3", POINT_ID="BH9", Borehole=[], N=7),
+]
+POINTS = [
+    make_record("pt1", POINT_ID="BH1", Easting=1000),
+    make_record("pt2", POINT_ID="BH2", Easting=2000),
+]
+
+
+def test_hash_join_on_field_and_linked_record_ids():
+    rows = [{"spt": record} for record in SPT]
+    by_point = hash_join(rows, "spt", "POINT_ID", "point", build_index(POINTS, "POINT_ID"))
+    assert [(row["spt"]["id"], row["point"]["id"]) for row in by_point] == [("spt1", "pt1"), ("spt2", "pt1")]
+
+    by_link = hash_join(rows, "spt", "Borehole", "point", build_index(POINTS, "id"), how="left")
+    assert [(row["spt"]["id"], row["point"] and row["point"]["id"]) for row in by_link] == [
+        ("spt1", "pt1"), ("spt2", "pt1"), ("spt3", None),
+    ]
+
+
+def test_hash_join_stops_probing_at_the_limit():
+    probed = []
+
+    def rows():
+        for record in SPT:
+            probed.append(record["id"])
+            yield {"spt": record}
+
+    joined = hash_join(rows(), "spt", "POINT_ID", "point", build_index(POINTS, "POINT_ID"), limit=1)
+    assert [row["spt"]["id"] for row in joined] == ["spt1"]
+    assert probed == ["spt1"]
+
+
+def test_join_endpoint_fetches_tables_concurrently(test_client):
+    tables = {"Field_SPT": SPT, "Points": POINTS}
+    in_flight = []
+    peak = []
+    seen = {}
+
+    async def handler(request: httpx.Request):
+        table = request.url.path.rsplit("/", 1)[-1]
+        seen[table] = request.url.params
+        in_flight.append(table)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.05)
+        in_flight.remove(table)
+        return httpx.Response(200, json={"records": tables[table]})
+
+    test_client.app.state.async_airtable_service = AsyncAirtableService(
+        httpx.AsyncClient(base_url="https://airtable.test/v0", transport=httpx.MockTransport(handler)),
+        cache=TableCache(ttl_seconds=0),
+    )
+    response = test_client.post("/api/base/join", json={
+        "tables": [
+            {"table_name": "Field_SPT", "alias": "spt", "fields": ["N"], "filters": [{"field": "N", "op": "gte", "value": 10}]},
+            {"table_name": "Points", "alias": "point", "on": "POINT_ID", "key": "POINT_ID", "fields": ["Easting"]},
+        ],
+    })
+    assert response.status_code == 200
+    assert max(peak) == 2
+    assert seen["Field_SPT"]["filterByFormula"] == "{N}>=10"
+    assert seen["Field_SPT"].get_list("fields[]") == ["N", "POINT_ID"]
+    assert seen["Points"].get_list("fields[]") == ["Easting", "POINT_ID"]
+    rows = response.json()["rows"]
+    assert [(row["spt"]["id"], row["point"]["fields"]["Easting"]) for row in rows] == [("spt1", 1000), ("spt2", 1000)]
+
+    missing_on = test_client.post("/api/base/join", json={"tables": [{"table_name": "A"}, {"table_name": "B"}]})
+    assert missing_on.status_code == 422
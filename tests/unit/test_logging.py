@@ -0,0 +1,30 @@
+import logging
+
+from app.core.logging import SamplingFilter, RecordSummary
+
+
+def make_record(level=logging.DEBUG, sampled=True):
+    record = logging.LogRecord("app", level, __file__, 1, "event", None, None)
+    if sampled:
+        record.sampled = True
+    return record
+
+
+def test_sampling_keeps_a_fraction_of_sampled_debug_events():
+    sampler = SamplingFilter(rate=0.25)
+    kept = sum(sampler.filter(make_record()) for _ in range(100))
+    assert kept == 25
+
+
+def test_sampling_passes_unsampled_and_higher_level_events():
+    sampler = SamplingFilter(rate=0)
+    assert not sampler.filter(make_record())
+    assert sampler.filter(make_record(sampled=False))
+    assert sampler.filter(make_record(level=logging.INFO))
+
+
+def test_record_summary_reports_counts_not_payload():
+    records = [{"id": f"rec{i}", "fields": {"secret": "x" * 50}} for i in range(3)]
+    assert str(RecordSummary(records)) == "3 records"
+    assert str(RecordSummary(records[0])) == "record rec0 with 1 fields"
+    assert str(RecordSummary({"deleted": True})) == "dict"
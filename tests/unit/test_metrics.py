@@ -0,0 +1,81 @@
+import asyncio
+
+import httpx
+
+from app.services.airtable_async_services import AsyncAirtableService
+from app.utils.metrics import MetricsRegistry, UPSTREAM_DURATION, request_timings
+from app.utils.rate_limiter import RateLimiter
+from app.utils.table_cache import TableCache
+
+
+def make_service(handler):
+    client = httpx.AsyncClient(base_url="https://airtable.test/v0", transport=httpx.MockTransport(handler))
+    return AsyncAirtableService(client, cache=TableCache(ttl_seconds=0))
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    counter = registry.counter("demo_total", "A counter.", ("route",))
+    histogram = registry.histogram("demo_seconds", "A histogram.", buckets=(0.1, 1))
+    counter.inc(2, route='/a"b')
+    histogram.observe(0.05)
+    histogram.observe(5)
+
+    lines = registry.render()
+    assert "# TYPE demo_total counter" in lines
+    assert 'demo_total{route="/a\\"b"} 2' in lines
+    assert 'demo_seconds_bucket{le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{le="1"} 1' in lines
+    assert 'demo_seconds_bucket{le="+Inf"} 2' in lines
+    assert "demo_seconds_count 2" in lines
+
+
+def test_upstream_calls_are_timed_into_the_current_request():
+    def handler(request: httpx.Request):
+        return httpx.Response(200, json={"records": [{"id": "rec1", "fields": {}}]})
+
+    async def run():
+        timings = {}
+        request_timings.set(timings)
+        service = make_service(handler)
+        await service.get_table("base", "table", live=True)
+        await service.close()
+        return timings
+
+    before = UPSTREAM_DURATION.count(method="GET", status=200)
+    timings = asyncio.run(run())
+    assert timings["airtable_calls"] == 1
+    assert UPSTREAM_DURATION.count(method="GET", status=200) == before + 1
+
+
+def test_profile_header_and_metrics_endpoint(test_client):
+    def handler(request: httpx.Request):
+        return httpx.Response(200, json={"records": [{"id": "rec1", "fields": {"name": "a"}}]})
+
+    test_client.app.state.async_airtable_service = make_service(handler)
+    response = test_client.get("/api/base/table?live=true", headers={"X-Profile": "1"})
+    assert response.status_code == 200
+    timing = response.headers["server-timing"]
+    for phase in ("endpoint", "airtable", "validate", "encode", "total"):
+        assert f"{phase};dur=" in timing
+    assert "server-timing" not in test_client.get("/api/base/table?live=true").headers
+
+    body = test_client.get("/metrics").text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/{base_id}/{table_name}",status="200"}' in body
+    assert 'airtable_service_records_total{service="AsyncAirtableService",operation="get_table"}' in body
+    assert "airtable_cache_hit_ratio" in body
+
+
+def test_metrics_expose_rate_limiter_per_base(test_client):
+    limiter = RateLimiter(rate=100, burst=10, deadline_seconds=5)
+    limiter.acquire("app1")
+    limiter.acquire("app2")
+    limiter.record_retry("app1", 429)
+    test_client.app.state.rate_limiter = limiter
+
+    lines = test_client.get("/metrics").text.splitlines()
+    assert 'airtable_rate_limit_queue_depth{base="app1"} 0' in lines
+    assert 'airtable_rate_limit_acquired_total{base="app2"} 1' in lines
+    assert 'airtable_rate_limit_timeouts_total{base="app1"} 0' in lines
+    assert 'airtable_rate_limit_retries_total{base="app1",status="429"} 1' in lines
+    assert "# TYPE airtable_rate_limit_wait_seconds_total counter" in lines
@@ -0,0 +1,58 @@
+import asyncio
+
+import httpx
+
+from app.services.airtable_async_services import AsyncAirtableService
+from app.utils.rate_limiter import RateLimitedTransport, RateLimiter
+from app.utils.table_cache import TableCache
+from benchmarks.mock_airtable import MockAirtable, parse_equalities
+
+
+def make_service(mock: MockAirtable, limiter: RateLimiter = None) -> AsyncAirtableService:
+    transport = httpx.ASGITransport(mock.app)
+    if limiter is not None:
+        transport = RateLimitedTransport(transport, limiter, retry_base_seconds=0.001, retry_max_seconds=0.01)
+    client = httpx.AsyncClient(base_url="http://mock-airtable/v0", transport=transport)
+    return AsyncAirtableService(client, cache=TableCache(ttl_seconds=0))
+
+
+def test_parse_equalities():
+    assert parse_equalities("AND({POINT_ID} = 'BH\\'1', {Zone}='Zone1')") == {"POINT_ID": "BH'1", "Zone": "Zone1"}
+    assert parse_equalities("AND({Zone}='Zone1', {Depth}>=3)") == {}
+
+
+def test_service_round_trip_against_mock():
+    mock = MockAirtable.with_spt_rows(250, page_size=40)
+
+    async def run():
+        service = make_service(mock)
+        records = await service.get_table("app4p8WX4X6BRjei8", "Field_SPT")
+        filtered = await service.get_filtered_sorted_records("app4p8WX4X6BRjei8", "Field_SPT", zone="Zone3")
+        created = await service.batch_create("base", "table", [{"n": i} for i in range(25)])
+        ids = [result["id"] for result in created]
+        await service.batch_update("base", "table", [{"id": ids[0], "fields": {"n": 100}}])
+        await service.batch_delete("base", "table", ids[1:])
+        remaining = await service.get_table("base", "table", live=True)
+        await service.close()
+        return records, filtered, remaining
+
+    records, filtered, remaining = asyncio.run(run())
+    assert len(records) == 250
+    assert mock.requests["GET"] >= 7  # 250 rows in pages of 40
+    assert filtered and all(record["fields"]["Zone"] == "Zone3" for record in filtered)
+    materials = [record["fields"]["Material"] for record in filtered]
+    assert materials == sorted(materials)
+    assert [record["fields"] for record in remaining] == [{"n": 100}]
+
+
+def test_injected_429s_are_retried():
+    mock = MockAirtable.with_spt_rows(50, throttle_rate=0.5, seed=1)
+
+    async def run():
+        service = make_service(mock, RateLimiter(rate=1000, burst=1000))
+        records = await service.get_table("app4p8WX4X6BRjei8", "Field_SPT", live=True)
+        await service.close()
+        return records
+
+    assert len(asyncio.run(run())) == 50
+    assert mock.requests["429"] > 0
@@ -0,0 +1,101 @@
+import asyncio
+
+import httpx
+
+from app.services.airtable_async_services import AsyncAirtableService
+from app.services.airtable_services import build_spt_formula
+from app.services.query import Predicate, compile_formula, run_query
+from app.utils.table_cache import TableCache
+
+
+def make_client(handler):
+    return httpx.AsyncClient(base_url="https://airtable.test/v0", transport=httpx.MockTransport(handler))
+
+
+def make_record(record_id, **fields):
+    return {"id": record_id, "fields": fields}
+
+
+RECORDS = [
+    make_record("rec1", POINT_ID="BH1", Depth=1.5, Material="Clay"),
+    make_record("rec2", POINT_ID="BH1", Depth=3, Material="Sand"),
+    make_record("rec3", POINT_ID="BH2", Depth=3, Material="Clay"),
+    make_record("rec4", POINT_ID="BH3", Material="Gravel, sandy"),
+]
+
+
+def test_compile_formula_escapes_values_and_field_names():
+    formula = compile_formula([
+        Predicate("POINT_ID", "eq", "BH'1"),
+        Predicate("Depth", "gte", 3),
+        Predicate("Odd}name", "in", ["a", 2]),
+        Predicate("Material", "contains", "Clay"),
+    ])
+    assert formula == (
+        "AND({POINT_ID}='BH\\'1', {Depth}>=3, OR({Odd\\}name}='a', {Odd\\}name}=2), FIND('Clay', {Material})>0)"
+    )
+    assert compile_formula([]) is None
+    assert build_spt_formula("BH501", None) == "AND({POINT_ID} = 'BH501')"
+    assert build_spt_formula("x') , TRUE(), ('", None) == "AND({POINT_ID} = 'x\\') , TRUE(), (\\'')"
+
+
+def test_run_query_filters_sorts_and_limits():
+    ids = lambda records: [record["id"] for record in records]
+    assert ids(run_query(RECORDS, [Predicate("Depth", "gte", 2)])) == ["rec2", "rec3"]
+    assert ids(run_query(RECORDS, [Predicate("POINT_ID", "in", ["BH2", "BH3"])])) == ["rec3", "rec4"]
+    assert ids(run_query(RECORDS, [Predicate("Material", "contains", "and")])) == ["rec2", "rec4"]
+    assert ids(run_query(RECORDS, [Predicate("POINT_ID", "ne", "BH1")])) == ["rec3", "rec4"]
+    # Empty cells sort first ascending, so last descending; ties fall back to the next key
+    assert ids(run_query(RECORDS, [], sort=["-Depth", "Material"])) == ["rec3", "rec2", "rec1", "rec4"]
+    assert ids(run_query(RECORDS, [], sort=["-Depth", "Material"], limit=2)) == ["rec3", "rec2"]
+
+
+def test_query_records_runs_on_cached_table_without_upstream_calls():
+    calls = []
+
+    def handler(request: httpx.Request):
+        calls.append(request.url.params)
+        return httpx.Response(200, json={"records": RECORDS})
+
+    async def run():
+        async with make_client(handler) as client:
+            service = AsyncAirtableService(client, cache=TableCache(ttl_seconds=60))
+            await service.get_table("base", "table")
+            return await service.query_records(
+                "base", "table", [Predicate("Depth", "lt", 5)], sort=["-Material"], fields=["POINT_ID"], limit=2
+            )
+
+    records = asyncio.run(run())
+    assert len(calls) == 1
+    assert records == [make_record("rec2", POINT_ID="BH1"), make_record("rec1", POINT_ID="BH1")]
+
+
+def test_query_endpoint_pushes_formula_sort_and_limit_upstream(test_client):
+    seen = []
+
+    def handler(request: httpx.Request):
+        seen.append(request.url.params)
+        return httpx.Response(200, json={"records": RECORDS[:1]})
+
+    test_client.app.state.async_airtable_service = AsyncAirtableService(
+        make_client(handler), cache=TableCache(ttl_seconds=0)
+    )
+    response = test_client.post("/api/base/table/query", json={
+        "filters": [{"field": "POINT_ID", "value": "BH1"}, {"field": "Depth", "op": "gt", "value": 1}],
+        "sort": [{"field": "Depth", "direction": "desc"}, {"field": "Material"}],
+        "fields": ["Depth"],
+        "limit": 1,
+    })
+    assert response.status_code == 200
+    assert [record["id"] for record in response.json()["records"]] == ["rec1"]
+    params = seen[0]
+    assert params["filterByFormula"] == "AND({POINT_ID}='BH1', {Depth}>1)"
+    assert params["sort[0][field]"] == "Depth"
+    assert params["sort[0][direction]"] == "desc"
+    assert params["sort[1][field]"] == "Material"
+    assert "sort[1][direction]" not in params
+    assert params["maxRecords"] == "1"
+    assert params.get_list("fields[]") == ["Depth"]
+
+    bad = test_client.post("/api/base/table/query", json={"filters": [{"field": "Zone", "op": "in", "value": "A"}]})
+    assert bad.status_code == 422
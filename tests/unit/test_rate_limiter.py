@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.utils.rate_limiter import (
+    Priority,
+    RateLimitedTransport,
+    RateLimiter,
+    RateLimitTimeout,
+    base_id_from_path,
+    was_not_applied,
+)
+
+
+def test_burst_then_rate_limited():
+    limiter = RateLimiter(rate=50, burst=2, deadline_seconds=5)
+    started = time.monotonic()
+    for _ in range(4):
+        limiter.acquire("app1")
+    # Two calls come from the burst, the other two wait ~1/50s each
+    assert time.monotonic() - started >= 0.03
+    assert limiter.stats()["acquired"] == 4
+
+
+def test_buckets_are_per_base():
+    limiter = RateLimiter(rate=0.1, burst=1, deadline_seconds=5)
+    limiter.acquire("app1")
+    limiter.acquire("app2")
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire("app1", deadline=time.monotonic() + 0.05)
+    assert limiter.stats()["timeouts"] == 1
+
+
+def test_interactive_calls_go_ahead_of_bulk():
+    limiter = RateLimiter(rate=20, burst=1, deadline_seconds=5)
+    order = []
+
+    async def call(name, priority):
+        await limiter.acquire_async("app1", priority=priority)
+        order.append(name)
+
+    async def run():
+        await limiter.acquire_async("app1")
+        bulk = [asyncio.create_task(call(f"bulk{i}", Priority.BULK)) for i in range(2)]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(call("interactive", Priority.INTERACTIVE))
+        await asyncio.gather(*bulk, interactive)
+
+    asyncio.run(run())
+    assert order[0] == "interactive"
+
+
+def test_transport_retries_throttled_requests():
+    statuses = [429, 503, 200]
+
+    def handler(request: httpx.Request):
+        return httpx.Response(statuses.pop(0), json={"records": []})
+
+    limiter = RateLimiter(rate=100, burst=10, deadline_seconds=5)
+    transport = RateLimitedTransport(
+        httpx.MockTransport(handler), limiter, max_retries=3, retry_base_seconds=0.001
+    )
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport, base_url="https://airtable.test/v0") as client:
+            return await client.get("/app1/table")
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert limiter.stats()["retries"] == {429: 1, 503: 1}
+    assert limiter.stats()["bases"]["app1"]["retries"] == {429: 1, 503: 1}
+    assert limiter.stats()["bases"]["app1"]["acquired"] == 3
+
+
+def test_transport_does_not_resend_creates_after_server_errors():
+    statuses = [429, 503, 200]
+    calls = []
+
+    def handler(request: httpx.Request):
+        calls.append(request.method)
+        return httpx.Response(statuses.pop(0), json={"records": []})
+
+    limiter = RateLimiter(rate=100, burst=10, deadline_seconds=5)
+    transport = RateLimitedTransport(
+        httpx.MockTransport(handler), limiter, max_retries=3, retry_base_seconds=0.001
+    )
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport, base_url="https://airtable.test/v0") as client:
+            return await client.post("/app1/table", json={"records": []})
+
+    response = asyncio.run(run())
+    # The 429 is retried; the 503 may have followed a committed write and is returned
+    assert response.status_code == 503
+    assert calls == ["POST", "POST"]
+
+
+def test_base_id_from_path():
+    assert base_id_from_path("/v0/app4p8WX4X6BRjei8/Field_SPT") == "app4p8WX4X6BRjei8"
+    assert base_id_from_path("/v0/meta") == ""
+
+
+def test_only_throttled_or_unsent_calls_count_as_not_applied():
+    def status_error(status_code):
+        request = httpx.Request("POST", "https://airtable.test/v0/app1/table")
+        return httpx.HTTPStatusError("error", request=request, response=httpx.Response(status_code, request=request))
+
+    assert was_not_applied(status_error(429))
+    assert was_not_applied(RateLimitTimeout("deadline exceeded"))
+    assert not was_not_applied(status_error(500))
+    assert not was_not_applied(httpx.ReadTimeout("timed out"))
@@ -0,0 +1,47 @@
+from app.services.record_index import RecordIndex
+
+
+def make_record(record_id, **fields):
+    return {"id": record_id, "fields": fields}
+
+
+def make_index():
+    index = RecordIndex(filter_fields=["POINT_ID", "Zone"], sort_fields=["Material"])
+    index.load(
+        [
+            make_record("rec1", POINT_ID="BH501", Zone="Zone5", Material="Sand"),
+            make_record("rec2", POINT_ID="BH501", Zone="Zone5", Material="Clay"),
+            make_record("rec3", POINT_ID="BH501", Zone="Zone6", Material="Gravel"),
+            make_record("rec4", POINT_ID="BH502", Zone="Zone5"),
+        ]
+    )
+    return index
+
+
+def ids(records):
+    return [record["id"] for record in records]
+
+
+def test_query_filters_and_sorts():
+    index = make_index()
+    assert ids(index.query({"POINT_ID": "BH501", "Zone": "Zone5"}, "Material")) == ["rec2", "rec1"]
+    assert ids(index.query({"Zone": "Zone5"}, "Material")) == ["rec4", "rec2", "rec1"]
+    assert ids(index.query({}, "Material")) == ["rec4", "rec2", "rec3", "rec1"]
+    assert index.query({"POINT_ID": "missing"}, "Material") == []
+
+
+def test_query_on_unindexed_fields():
+    index = make_index()
+    assert ids(index.query({"Material": "Sand"}, None)) == ["rec1"]
+    assert ids(index.query({"Zone": "Zone5"}, "POINT_ID")) == ["rec1", "rec2", "rec4"]
+
+
+def test_indexes_follow_upserts_and_deletes():
+    index = make_index()
+    index.upsert([make_record("rec1", POINT_ID="BH501", Zone="Zone6", Material="Sand")])
+    index.upsert([make_record("rec5", POINT_ID="BH501", Zone="Zone5", Material="Boulders")])
+    index.delete(["rec2"])
+
+    assert ids(index.query({"POINT_ID": "BH501", "Zone": "Zone5"}, "Material")) == ["rec5"]
+    assert ids(index.query({"Zone": "Zone6"}, "Material")) == ["rec3", "rec1"]
+    assert len(index) == 4
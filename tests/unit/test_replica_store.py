@@ -0,0 +1,125 @@
+import pytest
+
+from app.services.replica_store import ReplicaStore
+from app.services.sync_engine import ReplicaSyncEngine, parse_replica_tables
+
+
+class FakeTable:
+    def __init__(self, records):
+        self.records = records
+        self.formulas = []
+
+    def all(self, formula=None, **options):
+        self.formulas.append(formula)
+        if formula is None:
+            return list(self.records)
+        return [record for record in self.records if record.get("changed")]
+
+
+class FakeApi:
+    def __init__(self, table):
+        self._table = table
+
+    def table(self, base_id, table_name):
+        return self._table
+
+
+def make_record(record_id, **fields):
+    return {"id": record_id, "createdTime": "2024-01-01T00:00:00.000Z", "fields": fields}
+
+
+@pytest.fixture(params=[False, True], ids=["sqlite", "indexed"])
+def store(request):
+    if request.param:
+        store = ReplicaStore(":memory:", index_fields=["POINT_ID", "Zone"], sort_fields=["Material"])
+    else:
+        store = ReplicaStore(":memory:")
+    yield store
+    store.close()
+
+
+def test_filter_and_sort_from_replica(store):
+    store.replace_table(
+        "base",
+        "Field_SPT",
+        [
+            make_record("rec1", POINT_ID="BH501", Zone="Zone5", Material="Sand"),
+            make_record("rec2", POINT_ID="BH501", Zone="Zone5", Material="Clay"),
+            make_record("rec3", POINT_ID="BH502", Zone="Zone5", Material="Gravel"),
+        ],
+        "2024-01-01T00:00:00.000Z",
+    )
+    records = store.get_records("base", "Field_SPT", filters={"POINT_ID": "BH501"}, sort_by="Material")
+    assert [record["id"] for record in records] == ["rec2", "rec1"]
+    assert records[0]["fields"]["Material"] == "Clay"
+
+
+def test_sync_engine_full_then_incremental(store):
+    table = FakeTable([make_record("rec1", name="a"), make_record("rec2", name="b")])
+    engine = ReplicaSyncEngine(FakeApi(table), store, [("base", "table")], full_sync_every=10)
+
+    assert not store.is_synced("base", "table")
+    assert engine.sync_table("base", "table") == 2
+    assert store.is_synced("base", "table")
+
+    table.records[0] = dict(make_record("rec1", name="changed"), changed=True)
+    assert engine.sync_table("base", "table") == 1
+    assert "LAST_MODIFIED_TIME()" in table.formulas[-1]
+    names = {record["id"]: record["fields"]["name"] for record in store.get_records("base", "table")}
+    assert names == {"rec1": "changed", "rec2": "b"}
+
+
+def test_generation_changes_on_writes_only(store):
+    first = store.generation("base", "table")
+    assert store.generation("base", "table") == first
+    store.replace_table("base", "table", [make_record("rec1")], "2024-01-01T00:00:00.000Z")
+    loaded = store.generation("base", "table")
+    assert loaded != first
+    store.upsert_records("base", "table", [], watermark="2024-01-02T00:00:00.000Z")
+    assert store.generation("base", "table") == loaded
+    store.delete_records("base", "table", ["rec1"])
+    assert store.generation("base", "table") != loaded
+
+
+def test_parse_replica_tables():
+    assert parse_replica_tables("app1/Field_SPT, app2/Other") == [("app1", "Field_SPT"), ("app2", "Other")]
+    assert parse_replica_tables("") == []
+    with pytest.raises(ValueError):
+        parse_replica_tables("missing-table")
+
+
+def test_refresh_applies_writes_from_other_processes(tmp_path):
+    path = str(tmp_path / "replica.sqlite3")
+    writer = ReplicaStore(path)
+    reader = ReplicaStore(path, index_fields=["POINT_ID"])
+    writer.replace_table("base", "table", [make_record("rec1", POINT_ID="BH1")], "2024-01-01T00:00:00.000Z")
+    assert reader.refresh() == 1
+    assert [record["id"] for record in reader.get_records("base", "table", {"POINT_ID": "BH1"})] == ["rec1"]
+
+    generation = reader.generation("base", "table")
+    writer.upsert_records("base", "table", [make_record("rec2", POINT_ID="BH1")])
+    writer.delete_records("base", "table", ["rec1"])
+    assert reader.refresh() == 1
+    assert [record["id"] for record in reader.get_records("base", "table", {"POINT_ID": "BH1"})] == ["rec2"]
+    assert reader.generation("base", "table") != generation
+
+    # A process's own writes are already applied
+    reader.upsert_records("base", "table", [make_record("rec3")])
+    assert reader.refresh() == 0
+    writer.close()
+    reader.close()
+
+
+def test_sync_engine_resumes_persisted_replica_incrementally(tmp_path):
+    path = str(tmp_path / "replica.sqlite3")
+    table = FakeTable([make_record("rec1", name="a")])
+    first = ReplicaStore(path)
+    ReplicaSyncEngine(FakeApi(table), first, [("base", "table")]).sync_all()
+    first.close()
+
+    restarted = ReplicaStore(path)
+    ReplicaSyncEngine(FakeApi(table), restarted, [("base", "table")]).sync_all()
+    assert table.formulas[0] is None
+    assert "LAST_MODIFIED_TIME()" in table.formulas[1]
+    assert [record["id"] for record in restarted.get_records("base", "table")] == ["rec1"]
+    restarted.close()
@@ -0,0 +1,83 @@
+import httpx
+
+from app.services.airtable_async_services import AsyncAirtableService
+from app.utils.response_cache import ResponseCache, accepted_encodings, coding_etag, etag_matches
+from app.utils.table_cache import TableCache
+
+
+def test_etag_matching():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"x"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+    assert etag_matches('"abc-gzip"', '"abc"', coding_etag('"abc"', "gzip"))
+    assert coding_etag('"abc"', "br") == '"abc-br"'
+    assert coding_etag('"abc"', None) == '"abc"'
+
+
+def test_accepted_encodings_skip_refused_codings():
+    assert accepted_encodings("gzip, br;q=0, deflate;q=0.5") == ("gzip", "deflate")
+
+
+def test_entries_are_reused_only_for_the_same_version():
+    cache = ResponseCache(ttl_seconds=60)
+    stored = cache.set("key", 1, b"{}")
+    assert cache.get("key", 1) is stored
+    assert cache.get("key", 2) is None
+    assert cache.set("other", None, b"{}") is not None
+    assert cache.get("other", None) is None
+
+
+def test_cache_evicts_to_stay_within_max_bytes():
+    cache = ResponseCache(ttl_seconds=60, max_bytes=10)
+    cache.set("a", 1, b"123456")
+    cache.set("b", 1, b"123456")
+    assert cache.get("a", 1) is None
+    assert cache.get("b", 1) is not None
+
+
+def test_table_endpoint_revalidates_and_compresses(test_client):
+    calls = []
+    records = [{"id": f"rec{i}", "fields": {"name": "x" * 40}} for i in range(50)]
+
+    def handler(request: httpx.Request):
+        calls.append(request.method)
+        if request.method == "POST":
+            return httpx.Response(200, json={"id": "recNew", "fields": {"name": "new"}})
+        return httpx.Response(200, json={"records": records})
+
+    client = httpx.AsyncClient(base_url="https://airtable.test/v0", transport=httpx.MockTransport(handler))
+    test_client.app.state.async_airtable_service = AsyncAirtableService(client, cache=TableCache(ttl_seconds=60))
+    test_client.app.state.response_cache.clear()
+
+    first = test_client.get("/api/base/etag-table", headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["cache-control"] == "max-age=60"
+    assert len(first.json()["records"]) == 50
+    etag = first.headers["etag"]
+
+    assert etag.endswith('-gzip"')
+
+    # The identity variant has its own tag, and either one revalidates
+    identity = test_client.get("/api/base/etag-table", headers={"Accept-Encoding": "identity"})
+    assert identity.headers["etag"] == etag.replace("-gzip", "")
+    revalidated = test_client.get(
+        "/api/base/etag-table", headers={"If-None-Match": identity.headers["etag"], "Accept-Encoding": "gzip"}
+    )
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert revalidated.content == b""
+    assert calls == ["GET"]
+
+    test_client.post("/api/base/etag-table/create", json={"name": "new", "value": 1})
+    changed = test_client.get("/api/base/etag-table", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()["records"]) == 51
+    assert calls == ["GET", "POST"]
+
+    live = test_client.get("/api/base/etag-table?live=true", headers={"Accept-Encoding": "identity"})
+    assert live.headers["cache-control"] == "no-cache"
+    assert "content-encoding" not in live.headers
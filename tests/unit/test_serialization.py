@@ -0,0 +1,46 @@
+from fastapi.responses import JSONResponse
+
+from app.core.instrumentation import TimedJSONResponse
+from app.schemas.airtable_schemas import AirtableTablePage
+from app.utils.serialization import dumps, shape_page
+
+RECORDS = [
+    {
+        "id": "rec1",
+        "createdTime": "2024-01-01T00:00:00.000Z",
+        "fields": {
+            "POINT_ID": "BH501",
+            "Notes": "é 😀   \x00\x1f \"quoted\" \\ /",
+            "Depth": 12.5,
+            "Tiny": 2.25e-05,
+            "Huge": 1e16,
+            "Wide": 2 ** 70,
+            "Flags": [True, False, None],
+            "Nested": {"a": [1, 2.0, -0.0]},
+        },
+    },
+    {"id": "rec2", "fields": {}},
+]
+
+
+def validated_body(content):
+    """Bytes produced by the response_model path: validate, dump, JSONResponse."""
+    return JSONResponse(AirtableTablePage.model_validate(content).model_dump(mode="json")).body
+
+
+def test_fast_path_is_byte_identical_to_the_validated_path():
+    assert TimedJSONResponse(shape_page(RECORDS)).body == validated_body({"records": RECORDS})
+    assert TimedJSONResponse(shape_page(RECORDS, "cursor")).body == validated_body(
+        {"records": RECORDS, "next_cursor": "cursor"}
+    )
+
+
+def test_dumps_matches_json_dumps_for_plain_values():
+    content = {"records": [{"id": "rec1", "fields": {"Depth": 3.75, "Zone": "Zone5"}}]}
+    assert dumps(content) == JSONResponse(content).body
+
+
+def test_dumps_matches_json_dumps_across_float_magnitudes():
+    values = [sign * mantissa * 10.0 ** exponent
+              for exponent in range(-25, 25) for mantissa in (1, 2.25, 9.999) for sign in (1, -1)]
+    assert dumps(values) == JSONResponse(values).body
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+
+from app.utils.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_sync_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+    results = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.05)
+        return ["rec1"]
+
+    threads = [threading.Thread(target=lambda: results.append(flights.do("key", fetch))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [["rec1"]] * 5
+    assert flights.shared == 4
+    # Nothing is kept after the call completes
+    flights.do("key", fetch)
+    assert len(calls) == 2
+
+
+def test_sync_errors_reach_every_caller():
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+    errors = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        raise RuntimeError("upstream failed")
+
+    def caller():
+        try:
+            flights.do("key", fetch)
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=caller) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    # Fail only once every caller is waiting on the call in flight
+    deadline = time.monotonic() + 5
+    while flights.shared < 4 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(errors) == 5
+    assert all(str(error) == "upstream failed" for error in errors)
+
+
+def test_concurrent_async_calls_share_one_execution():
+    flights = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ["rec1"]
+
+    async def run():
+        same = await asyncio.gather(*(flights.do("key", fetch) for _ in range(5)))
+        other = await flights.do("other", fetch)
+        return same, other
+
+    same, other = asyncio.run(run())
+    assert same == [["rec1"]] * 5
+    assert other == ["rec1"]
+    assert len(calls) == 2
+    assert flights.shared == 4
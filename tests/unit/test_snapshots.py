@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+import httpx
+
+from app.services.airtable_async_services import AsyncAirtableService
+from app.utils.file_lock import FileLock
+from app.utils.snapshot_store import SnapshotStore
+from app.utils.table_cache import TableCache, make_cache_key
+
+RECORDS = [{"id": "rec1", "fields": {"name": "a"}}]
+
+
+def make_service(snapshots, calls, records=RECORDS):
+    def handler(request: httpx.Request):
+        calls.append(request.url.params)
+        return httpx.Response(200, json={"records": records})
+
+    client = httpx.AsyncClient(base_url="https://airtable.test/v0", transport=httpx.MockTransport(handler))
+    # A fresh TableCache per service, like a separate worker process
+    return AsyncAirtableService(client, cache=TableCache(ttl_seconds=60), snapshots=snapshots)
+
+
+def test_workers_share_fresh_snapshots(tmp_path):
+    path = str(tmp_path / "snapshots.sqlite3")
+    calls = []
+
+    async def run():
+        first = await make_service(SnapshotStore(path), calls).get_table("base", "table")
+        second = await make_service(SnapshotStore(path), calls).get_table("base", "table")
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second == RECORDS
+    assert len(calls) == 1
+
+
+def test_stale_snapshot_is_served_then_refreshed(tmp_path, monkeypatch):
+    path = str(tmp_path / "snapshots.sqlite3")
+    store = SnapshotStore(path)
+    key = make_cache_key("base", "table")
+    stored_at = time.time() - 3600
+    monkeypatch.setattr(time, "time", lambda: stored_at)
+    store.put(key, RECORDS)
+    monkeypatch.undo()
+    calls = []
+    updated = [{"id": "rec1", "fields": {"name": "b"}}]
+
+    async def run():
+        service = make_service(SnapshotStore(path), calls, updated)
+        served = await service.get_table("base", "table")
+        await asyncio.gather(*service._refreshes)
+        return served
+
+    assert asyncio.run(run()) == RECORDS
+    assert len(calls) == 1
+    age, records = store.get(key)
+    assert age < 60 and records == updated
+
+
+def test_writes_invalidate_snapshots(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    store.put(make_cache_key("base", "table"), RECORDS)
+    store.put(make_cache_key("base", "other"), RECORDS)
+
+    def handler(request: httpx.Request):
+        return httpx.Response(200, json={"id": "rec1", "deleted": True})
+
+    service = AsyncAirtableService(
+        httpx.AsyncClient(base_url="https://airtable.test/v0", transport=httpx.MockTransport(handler)),
+        cache=TableCache(ttl_seconds=60),
+        snapshots=store,
+    )
+    asyncio.run(service.delete_record("base", "table", "rec1"))
+    assert store.get(make_cache_key("base", "table")) is None
+    assert store.get(make_cache_key("base", "other")) is not None
+
+
+def test_put_is_dropped_after_another_process_invalidates(tmp_path):
+    path = str(tmp_path / "snapshots.sqlite3")
+    reader, writer = SnapshotStore(path), SnapshotStore(path)
+    key = make_cache_key("base", "table")
+    version = reader.version("base", "table")
+    writer.invalidate_table("base", "table")
+    assert not reader.put(key, RECORDS, version)
+    assert reader.get(key) is None
+    assert reader.put(key, RECORDS, reader.version("base", "table"))
+
+
+def test_read_racing_another_workers_write_is_not_shared(tmp_path):
+    path = str(tmp_path / "snapshots.sqlite3")
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def handler(request: httpx.Request):
+        if request.method == "GET":
+            started.set()
+            await release.wait()
+            return httpx.Response(200, json={"records": RECORDS})
+        return httpx.Response(200, json={"id": "rec1", "fields": {"name": "b"}})
+
+    def make(handler):
+        client = httpx.AsyncClient(base_url="https://airtable.test/v0", transport=httpx.MockTransport(handler))
+        return AsyncAirtableService(client, cache=TableCache(ttl_seconds=60), snapshots=SnapshotStore(path))
+
+    async def run():
+        reader, writer = make(handler), make(handler)
+        read = asyncio.create_task(reader.get_table("base", "table"))
+        await started.wait()
+        await writer.update_record("base", "table", "rec1", {"name": "b"})
+        release.set()
+        await read
+
+    asyncio.run(run())
+    assert SnapshotStore(path).get(make_cache_key("base", "table")) is None
+
+
+def test_file_lock_has_one_holder(tmp_path):
+    path = str(tmp_path / "worker.lock")
+    first, second = FileLock(path), FileLock(path)
+    assert first.acquire() and first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    second.release()
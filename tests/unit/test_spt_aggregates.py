@@ -0,0 +1,94 @@
+import random
+
+import httpx
+
+from app.services.airtable_async_services import AsyncAirtableService
+from app.services.replica_store import ReplicaStore
+from app.services.spt_aggregates import SptAggregates
+from app.utils.table_cache import TableCache
+
+
+def make_record(record_id, **fields):
+    return {"id": record_id, "fields": fields}
+
+
+RECORDS = [
+    make_record("rec1", POINT_ID="BH1", Zone="Zone1", Depth=0.5, N_Value=10, Material="Clay"),
+    make_record("rec2", POINT_ID="BH1", Zone="Zone1", Depth=1.5, N_Value=20, Material="Sand"),
+    make_record("rec3", POINT_ID="BH1", Zone="Zone2", Depth=1.2, N_Value=30, Material="Sand"),
+    make_record("rec4", POINT_ID="BH2", Zone="Zone2", Depth=2.0, Material="Gravel"),
+]
+
+
+def test_summary_by_group_and_depth():
+    aggregates = SptAggregates()
+    aggregates.load(RECORDS)
+
+    point = aggregates.summary({"POINT_ID": "BH1"})
+    assert point["count"] == 3
+    assert point["n_value"] == {"count": 3, "mean": 20.0, "std": (200 / 3) ** 0.5, "min": 10, "max": 30}
+    assert [(band["depth_from"], band["count"], band["mean"]) for band in point["by_depth"]] == [(0.0, 1, 10.0), (1.0, 2, 25.0)]
+    assert point["materials"] == {"Sand": 2, "Clay": 1}
+
+    assert aggregates.summary({"POINT_ID": "BH1", "Zone": "Zone2"})["count"] == 1
+    assert aggregates.summary()["count"] == 4
+    assert aggregates.summary({"POINT_ID": "missing"})["count"] == 0
+    assert {zone: summary["count"] for zone, summary in aggregates.groups("Zone").items()} == {"Zone1": 2, "Zone2": 2}
+    assert set(aggregates.groups("Zone", {"POINT_ID": "BH2"})) == {"Zone2"}
+
+
+def test_incremental_updates_match_a_full_rebuild():
+    rng = random.Random(7)
+    records = [
+        make_record(
+            f"rec{i}", POINT_ID=f"BH{rng.randrange(40)}", Zone=f"Zone{rng.randrange(5)}",
+            Depth=round(rng.uniform(0, 30), 2), N_Value=rng.randrange(60), Material=rng.choice(["Clay", "Sand", "Silt"]),
+        )
+        for i in range(2_000)
+    ]
+    incremental = SptAggregates()
+    incremental.load(records[:1_500])
+    changed = [
+        {**record, "fields": {**record["fields"], "N_Value": record["fields"]["N_Value"] + 5, "Zone": "Zone0"}}
+        for record in records[:300]
+    ]
+    incremental.upsert(changed + records[1_500:])
+    incremental.delete(record["id"] for record in records[300:600])
+
+    rebuilt = SptAggregates()
+    rebuilt.load(changed + records[600:])
+    for filters in ({}, {"Zone": "Zone0"}, {"POINT_ID": "BH3"}, {"POINT_ID": "BH3", "Zone": "Zone0"}):
+        assert incremental.summary(filters) == rebuilt.summary(filters)
+    assert incremental.groups("POINT_ID") == rebuilt.groups("POINT_ID")
+
+
+def test_replica_keeps_aggregates_current():
+    store = ReplicaStore(":memory:")
+    store.replace_table("base", "spt", RECORDS[:2], "2024-01-01T00:00:00.000Z")
+    aggregates = SptAggregates()
+    store.add_aggregates("base", "spt", aggregates)
+    assert aggregates.summary()["count"] == 2
+
+    store.upsert_records("base", "spt", [make_record("rec2", POINT_ID="BH2", N_Value=40)])
+    store.delete_records("base", "spt", ["rec1"])
+    summary = aggregates.summary({"POINT_ID": "BH2"})
+    assert (summary["count"], summary["n_value"]["max"]) == (1, 40)
+    assert aggregates.summary({"POINT_ID": "BH1"})["count"] == 0
+    store.close()
+
+
+def test_summary_endpoint_rolls_up_unreplicated_table(test_client):
+    seen = []
+
+    def handler(request: httpx.Request):
+        seen.append(request.url.params)
+        return httpx.Response(200, json={"records": RECORDS[:3]})
+
+    test_client.app.state.async_airtable_service = AsyncAirtableService(
+        httpx.AsyncClient(base_url="https://airtable.test/v0", transport=httpx.MockTransport(handler)),
+        cache=TableCache(ttl_seconds=0),
+    )
+    response = test_client.get("/api/geo/spt/summary?point_id=BH1&group_by=Zone")
+    assert response.status_code == 200
+    assert seen[0]["filterByFormula"] == "AND({POINT_ID} = 'BH1')"
+    assert {zone: summary["count"] for zone, summary in response.json()["groups"].items()} == {"Zone1": 2, "Zone2": 1}
@@ -0,0 +1,100 @@
+import time
+
+from app.utils.table_cache import TableCache, make_cache_key
+
+
+def make_record(record_id, **fields):
+    return {"id": record_id, "fields": fields}
+
+
+def test_cache_hit_and_miss():
+    cache = TableCache(ttl_seconds=60, max_entries=10)
+    key = make_cache_key("base", "table")
+    assert cache.get(key) is None
+    cache.set(key, [make_record("rec1")])
+    assert cache.get(key) == [make_record("rec1")]
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_entries_expire():
+    cache = TableCache(ttl_seconds=0.01, max_entries=10)
+    key = make_cache_key("base", "table")
+    cache.set(key, [make_record("rec1")])
+    time.sleep(0.02)
+    assert cache.get(key) is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TableCache(ttl_seconds=60, max_entries=2)
+    first = make_cache_key("base", "first")
+    second = make_cache_key("base", "second")
+    third = make_cache_key("base", "third")
+    cache.set(first, [])
+    cache.set(second, [])
+    cache.get(first)
+    cache.set(third, [])
+    assert cache.get(second) is None
+    assert cache.get(first) == []
+    assert cache.get(third) == []
+
+
+def test_upsert_patches_unfiltered_and_drops_filtered_reads():
+    cache = TableCache(ttl_seconds=60, max_entries=10)
+    full = make_cache_key("base", "table")
+    filtered = make_cache_key("base", "table", "AND({Zone} = 'Zone5')", ["Material"])
+    original = [make_record("rec1", name="a")]
+    cache.set(full, original)
+    cache.set(filtered, original)
+
+    cache.upsert_record("base", "table", make_record("rec1", name="b"))
+    cache.upsert_record("base", "table", make_record("rec2", name="c"))
+
+    assert cache.get(full) == [make_record("rec1", name="b"), make_record("rec2", name="c")]
+    assert cache.get(filtered) is None
+    assert original == [make_record("rec1", name="a")]
+
+
+def test_remove_record_from_all_reads():
+    cache = TableCache(ttl_seconds=60, max_entries=10)
+    full = make_cache_key("base", "table")
+    filtered = make_cache_key("base", "table", "AND({Zone} = 'Zone5')", ["Material"])
+    cache.set(full, [make_record("rec1"), make_record("rec2")])
+    cache.set(filtered, [make_record("rec2")])
+
+    cache.remove_record("base", "table", "rec2")
+
+    assert cache.get(full) == [make_record("rec1")]
+    assert cache.get(filtered) == []
+
+
+def test_zero_ttl_disables_cache():
+    cache = TableCache(ttl_seconds=0, max_entries=10)
+    key = make_cache_key("base", "table")
+    cache.set(key, [make_record("rec1")])
+    assert cache.get(key) is None
+
+
+def test_generation_changes_when_reads_of_the_table_change():
+    cache = TableCache(ttl_seconds=60, max_entries=10)
+    key = make_cache_key("base", "table")
+    first = cache.generation("base", "table")
+    cache.set(key, [make_record("rec1")])
+    stored = cache.generation("base", "table")
+    assert stored != first
+    cache.get(key)
+    assert cache.generation("base", "table") == stored
+    cache.upsert_record("base", "table", make_record("rec2"))
+    assert cache.generation("base", "table") != stored
+    assert cache.generation("base", "other") != TableCache().generation("base", "other")
+
+
+def test_reads_older_than_a_write_are_not_stored():
+    cache = TableCache(ttl_seconds=60, max_entries=10)
+    key = make_cache_key("base", "table")
+    version = cache.write_version("base", "table")
+    cache.upsert_record("base", "table", make_record("rec2"))
+    cache.set(key, [make_record("rec1")], write_version=version)
+    assert cache.get(key) is None
+    cache.set(key, [make_record("rec1")], write_version=cache.write_version("base", "table"))
+    assert cache.get(key) == [make_record("rec1")]
@@ -0,0 +1,97 @@
+import asyncio
+
+import httpx
+
+from app.services.airtable_async_services import AsyncAirtableService
+from app.services.write_behind import Outbox, WriteBehind
+from app.utils.table_cache import TableCache
+from benchmarks.mock_airtable import MockAirtable
+
+
+def make_write_behind(mock: MockAirtable, **options) -> WriteBehind:
+    client = httpx.AsyncClient(base_url="http://mock-airtable/v0", transport=httpx.ASGITransport(mock.app))
+    return WriteBehind(AsyncAirtableService(client, cache=TableCache(ttl_seconds=0)), Outbox(":memory:"), **options)
+
+
+def test_flush_coalesces_updates_and_batches_creates():
+    mock = MockAirtable({("base", "table"): [{"id": "rec1", "fields": {"a": 1, "b": 1}}]})
+    write_behind = make_write_behind(mock)
+
+    async def run():
+        created = [await write_behind.submit("base", "table", "create", {"n": i}) for i in range(12)]
+        updates = [
+            await write_behind.submit("base", "table", "update", fields, "rec1")
+            for fields in ({"a": 2}, {"b": 3}, {"a": 4})
+        ]
+        completed = await write_behind.flush()
+        statuses = [await write_behind.status(item["tracking_id"]) for item in created + updates]
+        return completed, statuses
+
+    completed, statuses = asyncio.run(run())
+    assert completed == 15
+    assert all(status["status"] == "done" for status in statuses)
+    assert statuses[0]["record_id"] in mock.tables[("base", "table")]
+    assert mock.tables[("base", "table")]["rec1"]["fields"] == {"a": 4, "b": 3}
+    # 12 creates in two 10-record calls, three updates in one
+    assert mock.requests["POST"] == 2
+    assert mock.requests["PATCH"] == 1
+
+
+def test_failed_mutations_are_retried_then_marked_failed():
+    mock = MockAirtable(throttle_rate=1.0)
+    write_behind = make_write_behind(mock, max_attempts=2)
+
+    async def run():
+        queued = await write_behind.submit("base", "table", "create", {"n": 1})
+        await write_behind.flush()
+        first = await write_behind.status(queued["tracking_id"])
+        await write_behind.flush()
+        return first, await write_behind.status(queued["tracking_id"])
+
+    first, second = asyncio.run(run())
+    assert (first["status"], first["attempts"]) == ("pending", 1)
+    assert (second["status"], second["attempts"]) == ("failed", 2)
+    assert "429" in second["error"]
+
+
+def test_creates_are_not_resent_after_a_server_error():
+    posts = []
+
+    def handler(request: httpx.Request):
+        posts.append(request)
+        return httpx.Response(500, json={"error": "SERVER_ERROR"})
+
+    client = httpx.AsyncClient(base_url="https://airtable.test/v0", transport=httpx.MockTransport(handler))
+    write_behind = WriteBehind(AsyncAirtableService(client, cache=TableCache(ttl_seconds=0)), Outbox(":memory:"))
+
+    async def run():
+        queued = await write_behind.submit("base", "table", "create", {"n": 1})
+        await write_behind.flush()
+        await write_behind.flush()
+        return await write_behind.status(queued["tracking_id"])
+
+    status = asyncio.run(run())
+    # The create may have been committed before the error, so it is left for the caller to reconcile
+    assert len(posts) == 1
+    assert (status["status"], status["attempts"]) == ("failed", 1)
+    assert "500" in status["error"]
+
+
+def test_create_is_acknowledged_with_tracking_id(test_client):
+    mock = MockAirtable()
+    write_behind = make_write_behind(mock)
+    test_client.app.state.write_behind = write_behind
+    try:
+        response = test_client.post("/api/base/table/create", json={"name": "pile", "value": 3})
+        assert response.status_code == 202
+        tracking_id = response.json()["tracking_id"]
+        assert mock.requests["POST"] == 0
+        assert test_client.get(f"/api/writes/{tracking_id}").json()["status"] == "pending"
+
+        asyncio.run(write_behind.flush())
+        status = test_client.get(f"/api/writes/{tracking_id}").json()
+        assert status["status"] == "done"
+        assert mock.tables[("base", "table")][status["record_id"]]["fields"] == {"name": "pile", "value": 3}
+        assert test_client.get("/api/writes/unknown").status_code == 404
+    finally:
+        test_client.app.state.write_behind = None